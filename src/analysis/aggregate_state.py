@@ -0,0 +1,241 @@
+"""
+aggregate_state.py
+Persisted aggregates of every annotated post merged so far, so the SDG
+distribution and the per-trend responses can be updated from a new batch
+alone instead of recomputed over the full history:
+- the global SDG counter (the SDG distribution),
+- per normalized trend: SDG counts and per-SDG emotion counts (TrendStats),
+- the current responses of every trend,
+- a cursor per input file: its size and mtime (an unchanged file is not
+  read again) and, for `.jsonl`, the byte offset read up to, so a file that
+  is only appended to is read from there on,
+- hashes of the posts already merged (normalized trend + text), kept in a
+  SQLite file next to the state (`<state>.seen.sqlite3`), so a rewritten
+  file only adds the posts it has not seen and the same post in another
+  batch counts once. New keys are appended on `save`, never rewritten.
+
+Counters keep their insertion order on disk, so ties resolve the same as in a
+full rebuild. The state file is rewritten through a temporary file on `save`;
+its size grows with the number of trends, not of posts.
+
+    state = AggregateState.load(AGGREGATE_STATE_PATH)
+    touched = state.merge_file("new_batch.jsonl")  # None when unchanged since the last merge
+    state.save(AGGREGATE_STATE_PATH)
+    state.close()
+"""
+
+import hashlib
+import json
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from src.modules.responders.generate_response import TrendStats, is_failed_response, update_trend_index
+from src.schemas.models import Post, ResponseForTrend
+from src.utils.record_io import is_jsonl, iter_records
+
+PathLike = Union[str, Path]
+
+STATE_VERSION = 3
+# Bytes before a `.jsonl` cursor that must be unchanged for the file to count as appended to
+TAIL_BYTES = 4096
+
+
+def post_key(post: Post) -> str:
+    """Identity of a post across batches: its normalized trend and text."""
+    return hashlib.sha1(f"{post.trend.strip().lower()}\x1f{post.text}".encode("utf-8")).hexdigest()[:16]
+
+
+def seen_path(state_path: PathLike) -> Path:
+    state_path = Path(state_path)
+    return state_path.with_name(state_path.stem + ".seen.sqlite3")
+
+
+def _tail_digest(path: Path, offset: int) -> str:
+    with open(path, "rb") as f:
+        f.seek(max(0, offset - TAIL_BYTES))
+        return hashlib.sha256(f.read(min(offset, TAIL_BYTES))).hexdigest()
+
+
+class SeenPosts:
+    """
+    Set of merged post keys in SQLite (in memory when `path` is None).
+
+    Keys are tagged with the generation of the save that commits them; the
+    state file records the last committed generation, and keys of a later
+    one (a save that crashed before the state file was replaced) are dropped
+    on open, so the keys always match the counters.
+    """
+
+    def __init__(self, path: Optional[Path] = None, generation: int = 0):
+        self.path = path
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(":memory:" if path is None else path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+        self._conn.execute("DELETE FROM seen WHERE generation > ?", (generation,))
+        self._conn.commit()
+        self.generation = generation + 1  # of the keys added until the next commit
+
+    def add(self, key: str) -> bool:
+        """Record `key`; False if it was already there."""
+        cursor = self._conn.execute("INSERT OR IGNORE INTO seen (key, generation) VALUES (?, ?)", (key, self.generation))
+        return cursor.rowcount == 1
+
+    def commit(self) -> int:
+        """Persist the keys added so far; returns their generation."""
+        self._conn.commit()
+        self.generation += 1
+        return self.generation - 1
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class JsonlTail:
+    """Records of a `.jsonl` file from byte `offset` on; `offset` follows the last complete line read."""
+
+    def __init__(self, path: Path, offset: int = 0):
+        self.path = path
+        self.offset = offset
+
+    def __iter__(self) -> Iterator[dict]:
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # still being written; read from here next time
+                self.offset += len(line)
+                if line.strip():
+                    yield json.loads(line)
+
+
+class AggregateState:
+    def __init__(self, top_k_sdgs: Optional[int] = None, seen: Optional[SeenPosts] = None):
+        self.top_k_sdgs = top_k_sdgs  # the responses were planned with this top-k
+        self.posts = 0
+        self.sdg_counts: Counter = Counter()
+        self.trends: Dict[str, TrendStats] = {}
+        self.responses: Dict[str, List[ResponseForTrend]] = {}  # normalized trend -> its responses
+        self.inputs: Dict[str, dict] = {}  # resolved input path -> its cursor
+        self.seen = seen if seen is not None else SeenPosts()  # post_key of every merged post
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: PathLike) -> "AggregateState":
+        """The saved state, or an empty one when there is none yet."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(seen=SeenPosts(seen_path(path)))
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported aggregate state version in '{path}': {data.get('version')}")
+
+        state = cls(data["top_k_sdgs"], seen=SeenPosts(seen_path(path), data["generation"]))
+        state.posts = data["posts"]
+        state.sdg_counts = Counter(data["sdg_counts"])
+        for trend, entry in data["trends"].items():
+            stats = state.trends[trend] = TrendStats()
+            stats.sdg_counts = Counter(entry["sdg_counts"])
+            stats.emotions_by_sdg = {sdg: Counter(counts) for sdg, counts in entry["emotions_by_sdg"].items()}
+        state.responses = {
+            trend: [ResponseForTrend(**item) for item in items] for trend, items in data["responses"].items()
+        }
+        state.inputs = data["inputs"]
+        return state
+
+    def save(self, path: PathLike) -> None:
+        path = Path(path)
+        if self.seen.path != seen_path(path):
+            raise ValueError(f"This state keeps its merged posts in {self.seen.path}, not next to '{path}'")
+        data = {
+            "version": STATE_VERSION,
+            "generation": self.seen.commit(),  # before the state file, see SeenPosts
+            "top_k_sdgs": self.top_k_sdgs,
+            "posts": self.posts,
+            "sdg_counts": self.sdg_counts,
+            "trends": {
+                trend: {"sdg_counts": stats.sdg_counts, "emotions_by_sdg": stats.emotions_by_sdg}
+                for trend, stats in self.trends.items()
+            },
+            "responses": {trend: [item.model_dump() for item in items] for trend, items in self.responses.items()},
+            "inputs": self.inputs,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp.replace(path)
+
+    def close(self) -> None:
+        self.seen.close()
+
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+
+    def merge(self, posts: Iterable[Post]) -> List[str]:
+        """Add annotated posts not merged before; returns the normalized trends they touched."""
+        def counted(posts: Iterable[Post]) -> Iterable[Post]:
+            for post in posts:
+                if not self.seen.add(post_key(post)):
+                    continue
+                self.posts += 1
+                self.sdg_counts.update(post.sdg)
+                yield post
+
+        return update_trend_index(self.trends, counted(posts))
+
+    def merge_file(self, path: PathLike) -> Optional[List[str]]:
+        """
+        Merge what is new in a batch file: returns the touched trends, or None
+        if the file is unchanged since it was last merged (it is not read).
+        A `.jsonl` file that was only appended to is read from where the last
+        merge stopped; any other change re-reads the file, and `seen` skips
+        the posts merged before.
+        """
+        path = Path(path)
+        stat = path.stat()
+        key = str(path.resolve())
+        cursor = self.inputs.get(key)
+        if cursor is not None and (cursor["size"], cursor["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return None
+
+        if is_jsonl(path):
+            offset = cursor.get("offset", 0) if cursor is not None else 0
+            if offset and (stat.st_size < offset or _tail_digest(path, offset) != cursor["tail"]):
+                offset = 0  # rewritten, not appended to
+            records = JsonlTail(path, offset)
+            touched = self.merge(Post(**item) for item in records)
+            position = {"offset": records.offset, "tail": _tail_digest(path, records.offset)}
+        else:
+            touched = self.merge(Post(**item) for item in iter_records(path))
+            position = {}
+        self.inputs[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, **position}
+        return touched
+
+    def set_responses(self, trends: Iterable[str], responses: Iterable[ResponseForTrend]) -> None:
+        """Replace the responses of `trends` (normalized) with `responses`; other trends keep theirs."""
+        for trend in trends:
+            self.responses[trend] = []
+        for item in responses:
+            self.responses.setdefault(item.trend.strip().lower(), []).append(item)
+
+    def failed_trends(self) -> List[str]:
+        """Trends with at least one response whose generation failed (to be retried)."""
+        return [
+            trend for trend, items in self.responses.items()
+            if any(is_failed_response(item.response) for item in items)
+        ]
+
+    def all_responses(self) -> List[ResponseForTrend]:
+        """Responses in trend order of first appearance, as a full rebuild would list them."""
+        return [item for trend in self.trends for item in self.responses.get(trend, ())]
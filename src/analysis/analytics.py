@@ -0,0 +1,265 @@
+"""
+analytics.py
+Dashboard views over the annotated posts, all computed from one load:
+- SDG and emotion frequencies,
+- trend x SDG x emotion cross-tab,
+- SDG co-occurrence matrix (posts carry up to 2 SDGs),
+- SDG and emotion counts per time bucket, using the `Timestamp` column of
+  twitter_dataset.csv (joined on the normalized post text; generated posts
+  have no timestamp and are reported as unmatched).
+
+The file is read once into integer label codes (`EncodedPosts`); every view is
+then a `np.bincount` / `np.unique` over combined codes instead of a Python
+loop or one pandas group-by per view. A `.parquet` input is read column-wise
+without materializing records.
+
+Run from the repository root:
+    python -m src.analysis.analytics [D|W|M]
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.configs.paths import ANALYTICS_DASHBOARD_PATH, EMOTION_OUTPUT_PATH, TWITTER_CSV_PATH
+from src.schemas.emotion_output import VALID_EMOTIONS
+from src.schemas.sdg_output import SDG_TITLES
+from src.utils import columnar
+from src.utils.record_io import iter_records
+from src.utils.text_normalizer import clean_texts
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+PathLike = Union[str, Path]
+
+TIME_BUCKET = "M"  # pandas period alias: "D", "W" or "M"
+TEXT_COLUMN = "Text"
+TIMESTAMP_COLUMN = "Timestamp"
+CSV_CHUNK_SIZE = 50_000
+
+
+def _encode(values: Sequence, known: Sequence[str] = ()) -> Tuple["np.ndarray", List[str]]:
+    """
+    Integer codes of `values` and their labels: `known` labels first in their
+    order, then any other label in order of appearance. Missing values are -1.
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    known_set = set(known)
+    labels = list(known) + [label for label in uniques if label not in known_set]
+    position = {label: i for i, label in enumerate(labels)}
+    remap = np.array([position[label] for label in uniques] + [-1], dtype=np.int64)
+    return remap[codes], labels  # code -1 indexes the trailing -1
+
+
+class EncodedPosts:
+    """
+    Annotated posts as parallel integer arrays: one trend and emotion code per
+    post, and the (post, SDG) pairs of the flattened sdg lists.
+    """
+
+    __slots__ = ("trends", "trend_labels", "emotions", "emotion_labels", "sdg_post", "sdgs", "sdg_labels", "texts")
+
+    def __init__(self, trends, emotions, sdg_lengths, flat_sdgs, texts=None):
+        import numpy as np
+
+        self.trends, self.trend_labels = _encode(trends)
+        self.emotions, self.emotion_labels = _encode(emotions, VALID_EMOTIONS)
+        self.sdgs, self.sdg_labels = _encode(flat_sdgs, SDG_TITLES)
+        self.sdg_post = np.repeat(np.arange(len(self.trends)), np.asarray(sdg_lengths, dtype=np.int64))
+        self.texts = texts
+
+    def __len__(self) -> int:
+        return len(self.trends)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], keep_text: bool = False) -> "EncodedPosts":
+        trends, emotions, sdg_lengths, flat_sdgs = [], [], [], []
+        texts = [] if keep_text else None
+        for record in records:
+            trends.append(str(record.get("trend") or "").strip().lower())
+            emotions.append(record.get("emotion"))
+            sdgs = record.get("sdg") or []
+            sdg_lengths.append(len(sdgs))
+            flat_sdgs.extend(sdgs)
+            if keep_text:
+                texts.append(record.get("text") or "")
+        return cls(trends, emotions, sdg_lengths, flat_sdgs, texts)
+
+    @classmethod
+    def from_parquet(cls, path: PathLike, keep_text: bool = False) -> "EncodedPosts":
+        columns = ["trend", "sdg", "emotion"] + (["text"] if keep_text else [])
+        if not set(columns) <= set(columnar.column_names(path)):  # e.g. an empty file, which has no columns
+            return cls.from_records(columnar.iter_records(path), keep_text)
+        table = columnar.read_table(path, columns)
+        import pyarrow.compute as pc  # pyarrow is there: read_table would have raised
+
+        sdg = table["sdg"]
+        trends = pc.utf8_lower(pc.utf8_trim_whitespace(pc.fill_null(table["trend"].cast("string"), "")))
+        return cls(
+            trends.to_numpy(zero_copy_only=False),
+            table["emotion"].cast("string").to_numpy(zero_copy_only=False),
+            pc.fill_null(pc.list_value_length(sdg), 0).to_numpy(zero_copy_only=False),
+            pc.list_flatten(sdg).cast("string").to_numpy(zero_copy_only=False),
+            table["text"].to_pylist() if keep_text else None,
+        )
+
+    @classmethod
+    def load(cls, path: PathLike, keep_text: bool = False) -> "EncodedPosts":
+        if columnar.is_parquet(path):
+            return cls.from_parquet(path, keep_text)
+        return cls.from_records(iter_records(path), keep_text)
+
+
+def _unique_counts(keys: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Sorted distinct keys and their counts (a sort and a diff; np.unique's hashing is slower here)."""
+    import numpy as np
+
+    keys = np.sort(keys)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.int64)
+    return keys[starts], np.diff(np.r_[starts, len(keys)])
+
+
+def _counts(codes: "np.ndarray", labels: List[str], key: str) -> List[dict]:
+    import numpy as np
+
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+    order = sorted(range(len(labels)), key=lambda i: -counts[i])  # stable: ties keep label order
+    return [{key: labels[i], "count": int(counts[i])} for i in order if counts[i]]
+
+
+def cross_tab(posts: EncodedPosts) -> List[dict]:
+    """Posts per (trend, SDG, emotion), a post counting once for each of its SDGs."""
+    import numpy as np
+
+    trends = posts.trends[posts.sdg_post]
+    emotions = posts.emotions[posts.sdg_post]
+    valid = (posts.sdgs >= 0) & (emotions >= 0)
+    n_sdgs, n_emotions = len(posts.sdg_labels), len(posts.emotion_labels)
+    combined = (trends[valid] * n_sdgs + posts.sdgs[valid]) * n_emotions + emotions[valid]
+    keys, counts = _unique_counts(combined)
+    trend, rest = np.divmod(keys, n_sdgs * n_emotions)
+    sdg, emotion = np.divmod(rest, n_emotions)
+    return [
+        {
+            "trend": posts.trend_labels[t],
+            "sdg": posts.sdg_labels[s],
+            "emotion": posts.emotion_labels[e],
+            "count": int(c),
+        }
+        for t, s, e, c in zip(trend.tolist(), sdg.tolist(), emotion.tolist(), counts.tolist())
+    ]
+
+
+def sdg_co_occurrence(posts: EncodedPosts) -> dict:
+    """
+    Symmetric SDG x SDG matrix: [i][j] posts tagged with both i and j, and the
+    diagonal [i][i] all posts tagged with i.
+    """
+    import numpy as np
+
+    n = len(posts.sdg_labels)
+    valid = posts.sdgs >= 0
+    # Distinct (post, SDG) pairs, sorted by post: a post's SDGs are adjacent
+    pair, _ = _unique_counts(posts.sdg_post[valid] * n + posts.sdgs[valid])
+    post, sdg = np.divmod(pair, n)
+    matrix = np.bincount(sdg * (n + 1), minlength=n * n)  # diagonal
+    offset = 1
+    while offset < len(pair):
+        same = post[:-offset] == post[offset:]
+        if not same.any():
+            break
+        first, second = sdg[:-offset][same], sdg[offset:][same]
+        matrix += np.bincount(first * n + second, minlength=n * n) + np.bincount(second * n + first, minlength=n * n)
+        offset += 1
+    matrix = matrix.reshape(n, n)
+    return {"labels": posts.sdg_labels, "matrix": matrix.tolist()}
+
+
+def load_timestamps(csv_path: PathLike = TWITTER_CSV_PATH) -> "pd.Series":
+    """Normalized post text -> timestamp from the raw CSV export (first occurrence of a text wins)."""
+    import pandas as pd
+
+    chunks = []
+    for chunk in pd.read_csv(csv_path, usecols=[TEXT_COLUMN, TIMESTAMP_COLUMN], chunksize=CSV_CHUNK_SIZE):
+        chunks.append(pd.Series(
+            pd.to_datetime(chunk[TIMESTAMP_COLUMN], errors="coerce").to_numpy(),
+            index=clean_texts(chunk[TEXT_COLUMN]),
+        ))
+    timestamps = pd.concat(chunks) if chunks else pd.Series(dtype="datetime64[ns]")
+    return timestamps[~timestamps.index.duplicated()]
+
+
+def time_buckets(posts: EncodedPosts, timestamps: "pd.Series", bucket: str = TIME_BUCKET) -> dict:
+    """SDG and emotion counts per period of `bucket`, for the posts found in `timestamps`."""
+    import numpy as np
+    import pandas as pd
+
+    if posts.texts is None:
+        raise ValueError("Time buckets need the post texts: load the posts with keep_text=True")
+    when = pd.DatetimeIndex(timestamps.reindex(clean_texts(posts.texts)).to_numpy())
+    periods = when.to_period(bucket)
+    codes, uniques = pd.factorize(periods, sort=True)
+    labels = [str(period) for period in uniques]
+    n_periods = len(labels)
+
+    def per_period(period_codes: "np.ndarray", label_codes: "np.ndarray", label_names: List[str], key: str):
+        valid = (period_codes >= 0) & (label_codes >= 0)
+        counts = np.bincount(
+            period_codes[valid] * len(label_names) + label_codes[valid],
+            minlength=n_periods * len(label_names),
+        ).reshape(n_periods, len(label_names))
+        return [
+            {"period": labels[p], key: label_names[i], "count": int(counts[p, i])}
+            for p, i in zip(*np.nonzero(counts))
+        ]
+
+    return {
+        "bucket": bucket,
+        "periods": labels,
+        "posts": np.bincount(codes[codes >= 0], minlength=n_periods).tolist(),
+        "sdg": per_period(codes[posts.sdg_post], posts.sdgs, posts.sdg_labels, "sdg"),
+        "emotion": per_period(codes, posts.emotions, posts.emotion_labels, "emotion"),
+        "unmatched": int(np.count_nonzero(codes < 0)),
+    }
+
+
+def build_dashboard(posts: EncodedPosts, timestamps: Optional["pd.Series"] = None, bucket: str = TIME_BUCKET) -> dict:
+    dashboard = {
+        "posts": len(posts),
+        "sdg_counts": _counts(posts.sdgs, posts.sdg_labels, "sdg"),
+        "emotion_counts": _counts(posts.emotions, posts.emotion_labels, "emotion"),
+        "trend_sdg_emotion": cross_tab(posts),
+        "sdg_co_occurrence": sdg_co_occurrence(posts),
+    }
+    if timestamps is not None:
+        dashboard["time_buckets"] = time_buckets(posts, timestamps, bucket)
+    return dashboard
+
+
+def main(bucket: str = TIME_BUCKET) -> None:
+    input_path = EMOTION_OUTPUT_PATH
+    output_path = ANALYTICS_DASHBOARD_PATH
+
+    with_timestamps = TWITTER_CSV_PATH.exists()
+    posts = EncodedPosts.load(input_path, keep_text=with_timestamps)
+    timestamps = load_timestamps(TWITTER_CSV_PATH) if with_timestamps else None
+    dashboard = build_dashboard(posts, timestamps, bucket)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(dashboard, f, indent=2, ensure_ascii=False)
+    print(f"📊 {len(posts)} posts, {len(posts.trend_labels)} trends, {len(dashboard['trend_sdg_emotion'])} cross-tab cells")
+    if "time_buckets" in dashboard:
+        buckets = dashboard["time_buckets"]
+        print(f"🕒 {len(buckets['periods'])} periods ({bucket}), {buckets['unmatched']} posts without a timestamp")
+    print(f"💾 Dashboard saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else TIME_BUCKET)
@@ -1,7 +1,10 @@
 import json
 from collections import Counter
 from typing import List
+from src.configs.paths import EMOTION_OUTPUT_PATH, SDG_DISTRIBUTION_PATH
 from src.schemas.emotion_output import EmotionAnnotatedPost
+from src.utils import columnar
+from src.utils.record_io import iter_records
 
 
 def load_posts(path: str) -> List[EmotionAnnotatedPost]:
@@ -17,6 +20,20 @@ def count_sdgs(posts: List[EmotionAnnotatedPost]) -> Counter:
     return counter
 
 
+def count_sdgs_in_file(path) -> Counter:
+    """
+    SDG frequencies straight from an annotated-posts file. A `.parquet` file
+    only has its sdg column read and counted over dictionary codes; other
+    formats are streamed without building a model per post.
+    """
+    if columnar.is_parquet(path):
+        return columnar.value_counts(path, "sdg")
+    counter = Counter()
+    for record in iter_records(path):
+        counter.update(record.get("sdg") or [])
+    return counter
+
+
 def save_results(counter: Counter, path: str):
     sorted_items = sorted(counter.items(), key=lambda x: x[1], reverse=True)
     data = [{"sdg": sdg, "count": count} for sdg, count in sorted_items]
@@ -31,11 +48,10 @@ def print_results(counter: Counter):
 
 
 def main():
-    INPUT_PATH = "../data/output/emotion_output.json"
-    OUTPUT_PATH = "../data/output/sdg_distribution.json"
+    INPUT_PATH = EMOTION_OUTPUT_PATH
+    OUTPUT_PATH = SDG_DISTRIBUTION_PATH
 
-    posts = load_posts(INPUT_PATH)
-    counter = count_sdgs(posts)
+    counter = count_sdgs_in_file(INPUT_PATH)
 
     print_results(counter)
     save_results(counter, OUTPUT_PATH)
@@ -0,0 +1,74 @@
+"""
+bench_analytics.py
+The one-load dashboard of `analysis.analytics` against the per-view approach
+it replaces: a separate Python pass over the records for every view (SDG
+counts, emotion counts, trend x SDG x emotion, SDG co-occurrence), as
+analyze_sdg_distribution does for the SDG counts. Both produce the same
+numbers. Time buckets are left out: the synthetic posts have no timestamps.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_analytics [n_posts]
+"""
+
+import sys
+import time
+from collections import Counter
+from typing import List
+
+from src.analysis.analytics import EncodedPosts, build_dashboard
+from src.benchmarks.bench_columnar import make_records
+
+N_POSTS = 1_000_000
+
+
+def per_view(records: List[dict]) -> dict:
+    sdg_counts, emotion_counts, cross, co = Counter(), Counter(), Counter(), Counter()
+    for record in records:
+        sdg_counts.update(record["sdg"])
+    for record in records:
+        emotion_counts[record["emotion"]] += 1
+    for record in records:
+        for sdg in record["sdg"]:
+            cross[(record["trend"].strip().lower(), sdg, record["emotion"])] += 1
+    for record in records:
+        for first in record["sdg"]:
+            for second in record["sdg"]:
+                co[(first, second)] += 1
+    return {"sdg": sdg_counts, "emotion": emotion_counts, "cross": cross, "co": co}
+
+
+def main(n_posts: int = N_POSTS) -> None:
+    records = list(make_records(n_posts))
+    print(f"📊 Dashboard over {n_posts:,} annotated posts")
+
+    start = time.perf_counter()
+    expected = per_view(records)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    posts = EncodedPosts.from_records(records)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    dashboard = build_dashboard(posts)
+    views_time = time.perf_counter() - start
+
+    cross = {(c["trend"], c["sdg"], c["emotion"]): c["count"] for c in dashboard["trend_sdg_emotion"]}
+    labels, matrix = dashboard["sdg_co_occurrence"]["labels"], dashboard["sdg_co_occurrence"]["matrix"]
+    co = {(a, b): matrix[i][j] for i, a in enumerate(labels) for j, b in enumerate(labels) if matrix[i][j]}
+    if (
+        cross != expected["cross"]
+        or co != expected["co"]
+        or {c["sdg"]: c["count"] for c in dashboard["sdg_counts"]} != expected["sdg"]
+        or {c["emotion"]: c["count"] for c in dashboard["emotion_counts"]} != expected["emotion"]
+    ):
+        raise AssertionError("dashboard disagrees with the per-view passes")
+
+    total = encode_time + views_time
+    print(f"  per-view Python passes   {baseline:7.2f}s")
+    print(f"  encode (one pass)        {encode_time:7.2f}s")
+    print(f"  all views over codes     {views_time:7.2f}s")
+    print(f"  dashboard total          {total:7.2f}s  {baseline / total:5.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_POSTS)
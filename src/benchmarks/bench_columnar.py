@@ -0,0 +1,64 @@
+"""
+bench_columnar.py
+Size on disk and SDG-frequency query time of one annotated-posts dataset
+stored as a `.json` array, as `.jsonl` and as `.parquet` (needs pyarrow).
+
+The row formats are parsed record by record; the Parquet query reads only the
+dictionary-encoded sdg column. All three must produce the same counts.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_columnar [n_posts]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.analysis.analyze_sdg_distribution import count_sdgs_in_file
+from src.schemas.emotion_output import VALID_EMOTIONS
+from src.schemas.sdg_output import SDG_TITLES
+from src.utils.record_io import write_records
+
+N_POSTS = 1_000_000
+N_TRENDS = 10_000
+SUFFIXES = [".json", ".jsonl", ".parquet"]
+
+
+def make_records(n_posts: int, n_trends: int = N_TRENDS, seed: int = 7):
+    rng = random.Random(seed)
+    trends = [f"trend {i}" for i in range(n_trends)]
+    for i in range(n_posts):
+        yield {
+            "trend": rng.choice(trends),
+            "text": f"synthetic post {i} about the trend, long enough to look like a tweet",
+            "sdg": rng.sample(SDG_TITLES, rng.randint(1, 2)),
+            "emotion": rng.choice(VALID_EMOTIONS),
+        }
+
+
+def main(n_posts: int = N_POSTS) -> None:
+    print(f"📊 SDG frequencies over {n_posts:,} annotated posts")
+    expected = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for suffix in SUFFIXES:
+            path = Path(tmp) / f"emotion_output{suffix}"
+            start = time.perf_counter()
+            write_records(path, make_records(n_posts))
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            counts = count_sdgs_in_file(path)
+            query_time = time.perf_counter() - start
+
+            if expected is None:
+                expected = counts
+            elif counts != expected:
+                raise AssertionError(f"{suffix} counts differ from {SUFFIXES[0]}")
+            size_mb = path.stat().st_size / 1e6
+            print(f"  {suffix:9} {size_mb:8.1f} MB  write {write_time:6.2f}s  query {query_time * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_POSTS)
@@ -0,0 +1,65 @@
+"""
+bench_import_time.py
+Import cost of every entry point, measured with `python -X importtime` in a
+clean interpreter with OPENROUTER_API_KEY unset, which also proves that
+importing has no env/network side effects.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_import_time
+"""
+
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+ENTRY_POINTS = [
+    "src.modules.fetchers.trend_fetcher",
+    "src.utils.cleaner_posts",
+    "src.pipelines.run_generate_posts",
+    "src.pipelines.run_sdg_classification",
+    "src.pipelines.run_emotion_detection",
+    "src.pipelines.run_combined_classification",
+    "src.pipelines.run_response_generation",
+    "src.pipelines.run_pipeline",
+    "src.analysis.analyze_sdg_distribution",
+]
+HEAVY_MODULES = ("pandas", "numpy", "httpx", "pydantic", "dotenv", "tqdm")
+TOP_N = 3
+
+
+def measure(module: str) -> Tuple[int, List[Tuple[int, str]]]:
+    """Return (cumulative µs for `module`, heaviest top-level third-party imports)."""
+    env = {k: v for k, v in os.environ.items() if k != "OPENROUTER_API_KEY"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.splitlines()[-1]}")
+
+    total, heavy = 0, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        name = name.rstrip()
+        if name.strip() == module:
+            total = int(cumulative)
+        if name.strip() in HEAVY_MODULES:
+            heavy.append((int(cumulative), name.strip()))
+    return total, sorted(heavy, reverse=True)[:TOP_N]
+
+
+def main() -> None:
+    print(f"{'entry point':48} {'import ms':>10}  heaviest third-party imports")
+    for module in ENTRY_POINTS:
+        total, heavy = measure(module)
+        heavy_text = ", ".join(f"{name} {us / 1000:.0f}ms" for us, name in heavy) or "-"
+        print(f"{module:48} {total / 1000:10.1f}  {heavy_text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+bench_pipelines.py
+End-to-end throughput and tail latency of the LLM stages against the offline
+mock server (src/benchmarks/mock_openrouter.py); no API key or money needed.
+
+For each size, synthetic posts (10 per trend) are pushed through
+run_sdg_classification -> run_emotion_detection -> generate_responses_batch,
+and run_generate_posts generates the same number of posts. Everything is
+written to a temporary directory; the LLM cache is disabled and the
+per-model rate limits are lifted (the mock answers instantly, only its
+simulated latency counts).
+
+Run from the repository root:
+    python -m src.benchmarks.bench_pipelines
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from src.benchmarks.mock_openrouter import MockServerProcess
+
+SIZES = [1_000, 10_000, 100_000]
+POSTS_PER_TREND = 10
+MOCK_SETTINGS = {
+    "latency_median": 0.05,
+    "latency_sigma": 0.5,
+    "error_rate": 0.005,
+    "rate_limit_rate": 0.005,
+    "retry_after": 0.2,
+}
+CONCURRENCY = 64  # per-model scheduler window while benchmarking
+VOCABULARY = (
+    "water energy climate school jobs health city ocean forest food rights women "
+    "poverty trade data privacy ai housing transport heat flood drought vaccine "
+    "wages justice peace plastic recycling solar farming fish"
+).split()
+
+
+def make_posts(n_posts: int, seed: int = 11) -> List[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "trend": f"trend {i // POSTS_PER_TREND}",
+            "text": f"post {i} about " + " ".join(rng.choices(VOCABULARY, k=rng.randint(8, 20))),
+        }
+        for i in range(n_posts)
+    ]
+
+
+def _prepare_environment(base_url: str) -> None:
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ["OPENROUTER_API_KEY"] = "mock-key"
+    os.environ["LLM_CACHE_DISABLED"] = "1"
+
+    from src.configs.model_selector import get_model_and_params
+    from src.utils.request_scheduler import RequestScheduler, set_scheduler
+
+    for task in ("sdg_classification", "classification", "generation", "response_generation"):
+        model, _ = get_model_and_params(task)
+        set_scheduler(model, RequestScheduler(
+            initial_concurrency=CONCURRENCY, max_concurrency=CONCURRENCY,
+            base_backoff=0.05, max_backoff=1.0, name=model,
+        ))
+
+
+def _latency_summary() -> str:
+    from src.utils.metrics import Histogram, metrics
+
+    merged = Histogram()
+    for histogram in metrics.histograms.get("llm_call_seconds", {}).values():
+        merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+        merged.count += histogram.count
+        merged.sum += histogram.sum
+        merged.min, merged.max = min(merged.min, histogram.min), max(merged.max, histogram.max)
+    if not merged.count:
+        return "no LLM calls"
+    requests = sum(metrics.counters.get("llm_requests_total", {}).values())
+    retries = sum(metrics.counters.get("llm_retries_total", {}).values())
+    return (
+        f"{merged.count:>6} calls / {int(requests):>6} requests, {int(retries):>4} retries, "
+        f"p50 {merged.quantile(0.5):.3f}s p95 {merged.quantile(0.95):.3f}s p99 {merged.quantile(0.99):.3f}s"
+    )
+
+
+def _timed(label: str, n_posts: int, run: Callable[[], None], failed_path: Optional[Path] = None) -> None:
+    from src.utils.metrics import metrics
+    from src.utils.record_io import iter_records
+
+    metrics.reset()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        run()
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for _ in iter_records(failed_path)) if failed_path else 0
+    print(
+        f"  {label:10} {elapsed:8.2f}s {n_posts / elapsed:9,.0f} posts/s {failed:>5} failed"
+        f" | {_latency_summary()}"
+    )
+
+
+def bench_size(n_posts: int, workdir: Path) -> None:
+    from src.modules.responders.generate_response import generate_responses_batch
+    from src.pipelines import run_emotion_detection, run_generate_posts, run_sdg_classification
+    from src.schemas.models import Post
+    from src.utils.record_io import iter_records, write_records
+
+    cleaned = workdir / "cleaned_posts.jsonl"
+    write_records(cleaned, make_posts(n_posts))
+
+    sdg = run_sdg_classification
+    sdg.INPUT_PATH, sdg.OUTPUT_PATH = cleaned, workdir / "sdg_output.jsonl"
+    sdg.FAILED_PATH, sdg.CHECKPOINT_PATH = workdir / "sdg_failed.jsonl", workdir / "sdg_progress.jsonl"
+    sdg.METRICS_PATH, sdg.RESUME = workdir / "sdg_metrics", False
+    _timed("sdg", n_posts, lambda: asyncio.run(sdg.main()), sdg.FAILED_PATH)
+
+    emotion = run_emotion_detection
+    emotion.INPUT_PATH, emotion.OUTPUT_PATH = sdg.OUTPUT_PATH, workdir / "emotion_output.jsonl"
+    emotion.FAILED_PATH, emotion.CHECKPOINT_PATH = workdir / "emotion_failed.jsonl", workdir / "emotion_progress.jsonl"
+    emotion.METRICS_PATH, emotion.RESUME = workdir / "emotion_metrics", False
+    _timed("emotion", n_posts, lambda: asyncio.run(emotion.main()), emotion.FAILED_PATH)
+
+    posts = [Post(**item) for item in iter_records(emotion.OUTPUT_PATH)]
+    _timed("response", n_posts, lambda: generate_responses_batch(data=posts, top_k_sdgs=1, use_llm=True))
+
+    trends = workdir / "trend_titles.json"
+    with open(trends, "w", encoding="utf-8") as f:
+        json.dump([f"trend {i}" for i in range(max(1, n_posts // POSTS_PER_TREND))], f)
+    generate = run_generate_posts
+    generate.INPUT_PATH, generate.OUTPUT_PATH = trends, workdir / "generated_posts.jsonl"
+    generate.METRICS_PATH = workdir / "generation_metrics"
+    generate.CHECKPOINT_PATH, generate.RESUME = workdir / "generation_progress.jsonl", False
+    _timed("generation", n_posts, lambda: asyncio.run(generate.main()))
+
+
+def main(sizes: List[int] = SIZES) -> None:
+    with MockServerProcess(**MOCK_SETTINGS) as base_url:
+        _prepare_environment(base_url)
+        logging.getLogger("httpx").setLevel(logging.WARNING)  # run_emotion_detection logs at INFO
+        print(f"🧪 Mock server {base_url} {MOCK_SETTINGS}, concurrency {CONCURRENCY}")
+        for n_posts in sizes:
+            print(f"📊 {n_posts:,} posts ({n_posts // POSTS_PER_TREND:,} trends)")
+            with tempfile.TemporaryDirectory() as workdir:
+                bench_size(n_posts, Path(workdir))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
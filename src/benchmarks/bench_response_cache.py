@@ -0,0 +1,108 @@
+"""
+bench_response_cache.py
+Latency of serving supportive responses for a stream of (trend, SDG, emotion)
+requests against the offline mock server, with:
+- no response cache (every request waits for the LLM),
+- a cold cache per key mode (only repeated keys are served from memory),
+- the generic SDG x emotion entries warmed by run_warm_response_cache and
+  `fallback_to_generic` (no request waits for the LLM).
+
+Requests draw trends from a few titles (with casing/spacing variants,
+which the "trend" key mode folds together) and SDG x emotion at random.
+Requests that reach the LLM also queue for the client's rate budget, which
+carries over from one case to the next, so compare the LLM-call counts; the
+latencies only show whether the serving path waits at all.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_response_cache
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.benchmarks.mock_openrouter import MockServerProcess
+from src.schemas.emotion_output import VALID_EMOTIONS
+from src.schemas.sdg_output import SDG_TITLES
+
+N_REQUESTS = 400
+N_TRENDS = 20
+CONCURRENCY = 16
+MOCK_SETTINGS = {"latency_median": 0.25, "latency_sigma": 0.3}
+
+
+def make_requests(seed: int = 11) -> List[Tuple[str, str, str]]:
+    rng = random.Random(seed)
+    trends = [f"trend {i}" for i in range(N_TRENDS)]
+    variants = [str.lower, str.title, lambda t: f" {t} "]
+    return [
+        (rng.choice(variants)(rng.choice(trends)), rng.choice(SDG_TITLES), rng.choice(VALID_EMOTIONS))
+        for _ in range(N_REQUESTS)
+    ]
+
+
+async def serve(requests: List[Tuple[str, str, str]], cache) -> List[float]:
+    from src.modules.responders.generate_response import _build_response_client, generate_supportive_response_async
+
+    client = _build_response_client()
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(trend: str, sdg: str, emotion: str) -> float:
+        async with sem:
+            start = time.perf_counter()
+            await generate_supportive_response_async(sdg, emotion, [trend], client=client, cache=cache)
+            return time.perf_counter() - start
+
+    try:
+        return list(await asyncio.gather(*(one(*request) for request in requests)))
+    finally:
+        await client.close()
+
+
+def _report(label: str, latencies: List[float], cache) -> None:
+    q = statistics.quantiles(latencies, n=100)
+    stats = cache.stats() if cache is not None else {"hit_rate": 0.0, "misses": len(latencies)}
+    print(
+        f"  {label:34} p50 {q[49] * 1000:7.1f}ms  p99 {q[98] * 1000:7.1f}ms"
+        f"  hit rate {stats['hit_rate']:5.1%}  LLM calls {stats['misses']:5}"
+    )
+
+
+def main() -> None:
+    from src.modules.responders.response_cache import ResponseCache
+    from src.pipelines.run_warm_response_cache import warm
+
+    requests = make_requests()
+    with MockServerProcess(**MOCK_SETTINGS) as base_url, tempfile.TemporaryDirectory() as tmp:
+        os.environ["OPENROUTER_BASE_URL"] = base_url
+        os.environ["OPENROUTER_API_KEY"] = "mock-key"
+        os.environ["LLM_CACHE_DISABLED"] = "1"
+        print(f"💬 {N_REQUESTS} response requests, {N_TRENDS} trends, {CONCURRENCY} concurrent")
+
+        cases: List[Tuple[str, Optional[ResponseCache]]] = [("no cache", None)]
+        for mode in ("exact", "trend", "sdg_emotion"):
+            cache = ResponseCache(Path(tmp) / f"{mode}.sqlite3", mode, fallback_to_generic=False)
+            cases.append((f"cold, key_mode={mode}", cache))
+        for label, cache in cases:
+            _report(label, asyncio.run(serve(requests, cache)), cache)
+            if cache is not None:
+                cache.close()
+
+        warmed = ResponseCache(Path(tmp) / "warm.sqlite3")
+        start = time.perf_counter()
+        generated = asyncio.run(warm(warmed))
+        warmed.close()
+        print(f"  warm-up: {generated} generic responses in {time.perf_counter() - start:.1f}s")
+
+        cache = ResponseCache(Path(tmp) / "warm.sqlite3", "trend", fallback_to_generic=True)  # reloaded from disk
+        _report("warm generic + fallback, trend", asyncio.run(serve(requests, cache)), cache)
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
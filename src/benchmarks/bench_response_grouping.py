@@ -0,0 +1,83 @@
+"""
+bench_response_grouping.py
+Scaling of the one-pass trend index behind `generate_responses_batch` versus
+the previous per-trend rescans of the full dataset.
+
+The new path runs up to 1M synthetic posts over 10k trends. The legacy
+O(trends x posts) path is only timed on the smaller sizes; at full size it
+would take hours.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_response_grouping
+"""
+
+import random
+import time
+from collections import Counter
+from typing import List
+
+from src.mappers.sdg_link_mapper import SDG_LINKS
+from src.schemas.emotion_output import VALID_EMOTIONS
+from src.schemas.models import Post
+from src.modules.responders.generate_response import _plan_responses, get_dominant_emotion, get_top_k_sdgs
+
+N_TRENDS = 10_000
+SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_MAX_POSTS = 10_000
+TOP_K = 2
+
+
+def make_posts(n_posts: int, n_trends: int, seed: int = 7) -> List[Post]:
+    rng = random.Random(seed)
+    sdgs = list(SDG_LINKS)
+    trends = [f"trend {i}" for i in range(n_trends)]
+    return [
+        Post.model_construct(
+            text="synthetic post",
+            trend=rng.choice(trends),
+            sdg=rng.sample(sdgs, rng.randint(1, 2)),
+            emotion=rng.choice(VALID_EMOTIONS),
+        )
+        for _ in range(n_posts)
+    ]
+
+
+def legacy_plan(data: List[Post], top_k: int):
+    """The pre-index grouping: rescan all posts per trend, then per SDG."""
+    plan = []
+    for trend in list({p.trend.strip().lower() for p in data}):
+        trend_posts = [p for p in data if p.trend.strip().lower() == trend.strip().lower()]
+        for sdg in get_top_k_sdgs(trend_posts, top_k):
+            emotion = get_dominant_emotion([p for p in trend_posts if sdg in p.sdg])
+            if emotion:
+                plan.append((trend, sdg, emotion))
+    return plan
+
+
+def main() -> None:
+    print(f"📊 Response grouping, {N_TRENDS} trends, top-{TOP_K} SDGs")
+    previous = None
+    for n_posts in SIZES:
+        posts = make_posts(n_posts, N_TRENDS)
+
+        start = time.perf_counter()
+        plan = _plan_responses(posts, None, TOP_K)
+        indexed = time.perf_counter() - start
+
+        line = f"  {n_posts:>9,} posts: index {indexed:7.2f}s ({n_posts / indexed:,.0f} posts/s)"
+        if previous:
+            prev_posts, prev_time = previous
+            line += f", x{indexed / prev_time:.1f} time for x{n_posts / prev_posts:.0f} posts"
+        if n_posts <= LEGACY_MAX_POSTS:
+            start = time.perf_counter()
+            legacy = legacy_plan(posts, TOP_K)
+            rescan = time.perf_counter() - start
+            if Counter(legacy) != Counter(plan):
+                raise AssertionError("Trend index and legacy rescans produced different plans")
+            line += f" | legacy rescans {rescan:8.2f}s ({rescan / indexed:,.0f}x slower)"
+        print(line)
+        previous = (n_posts, indexed)
+
+
+if __name__ == "__main__":
+    main()
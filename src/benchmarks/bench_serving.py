@@ -0,0 +1,145 @@
+"""
+bench_serving.py
+Latency of the serving app (src/serving/app.py) under concurrent /classify
+and /respond traffic against the offline mock server, called in-process
+through httpx's ASGI transport (no server or network needed):
+- one prompt per request (max_batch_size=1, no wait),
+- micro-batching (the app's defaults),
+then /respond on top of a warmed response cache.
+
+Texts are drawn from a small pool, so concurrent requests repeat themselves
+as they do when a trend goes viral. The per-model rate limits from
+model_configs stay in place (each case starts with a fresh budget): the
+number of LLM calls per request is what decides the tail latency once
+traffic exceeds the budget.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_serving
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from src.benchmarks.mock_openrouter import MockServerProcess
+
+N_REQUESTS = 300
+N_TEXTS = 200
+MOCK_SETTINGS = {"latency_median": 0.25, "latency_sigma": 0.3}
+
+
+def make_texts(seed: int = 5) -> List[str]:
+    rng = random.Random(seed)
+    pool = [
+        f"Post {i}: {rng.choice(['flooding', 'school fees', 'power cuts', 'fuel prices', 'clinic queues'])}"
+        f" in {rng.choice(['Lagos', 'Nairobi', 'Accra', 'Kampala'])} again"
+        for i in range(N_TEXTS)
+    ]
+    return [rng.choice(pool) for _ in range(N_REQUESTS)]
+
+
+async def fire(app, path: str, bodies: List[dict]) -> List[float]:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def one(body: dict) -> float:
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        return list(await asyncio.gather(*(one(body) for body in bodies)))
+
+
+def _fresh_schedulers() -> None:
+    from src.configs.model_selector import get_model_and_params
+    from src.utils.request_scheduler import RequestScheduler, set_scheduler
+
+    for task in ("sdg_classification", "classification", "response_generation"):
+        model, _ = get_model_and_params(task)
+        set_scheduler(model, RequestScheduler.from_model_config(model))
+
+
+def _report(label: str, latencies: List[float], elapsed: float, extra: str = "") -> None:
+    from src.utils.metrics import metrics
+
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"  {label:28} p50 {q[49] * 1000:7.1f}ms  p99 {q[98] * 1000:7.1f}ms"
+        f"  wall {elapsed:5.1f}s  LLM calls {int(metrics._total('llm_requests_total')):4}{extra}"
+    )
+
+
+def bench_classify(texts: List[str], label: str, workdir: Path, **batching) -> None:
+    from src.serving.app import ClassifyAndRespondService, ServingApp
+    from src.utils.metrics import metrics
+
+    metrics.reset()
+    _fresh_schedulers()
+    app = ServingApp(lambda: ClassifyAndRespondService(response_cache_path=workdir / "responses.sqlite3", **batching))
+
+    async def run() -> Tuple[List[float], dict]:
+        try:
+            latencies = await fire(app, "/classify", [{"text": text} for text in texts])
+            return latencies, app.service.stats()["batchers"]["sdg"]
+        finally:
+            await app.close()
+
+    start = time.perf_counter()
+    latencies, sdg = asyncio.run(run())
+    _report(label, latencies, time.perf_counter() - start, f"  coalesced {sdg['coalesced']:4}")
+
+
+def bench_respond(texts: List[str], workdir: Path) -> None:
+    from src.modules.responders.response_cache import ResponseCache
+    from src.pipelines.run_warm_response_cache import warm
+    from src.serving.app import ClassifyAndRespondService, ServingApp
+    from src.utils.metrics import metrics
+
+    cache_path = workdir / "warm.sqlite3"
+    cache = ResponseCache(cache_path)
+    start = time.perf_counter()
+    generated = asyncio.run(warm(cache))
+    cache.close()
+    print(f"  warm-up: {generated} generic responses in {time.perf_counter() - start:.1f}s")
+
+    metrics.reset()
+    _fresh_schedulers()
+    app = ServingApp(lambda: ClassifyAndRespondService(response_cache_path=cache_path))
+    bodies = [{"text": text, "trend": f"trend {i % 20}"} for i, text in enumerate(texts)]
+
+    async def run() -> Tuple[List[float], dict]:
+        try:
+            latencies = await fire(app, "/respond", bodies)
+            return latencies, app.service.stats()["response_cache"]
+        finally:
+            await app.close()
+
+    start = time.perf_counter()
+    latencies, cache_stats = asyncio.run(run())
+    _report("/respond, warmed cache", latencies, time.perf_counter() - start,
+            f"  hit rate {cache_stats['hit_rate']:5.1%}")
+
+
+def main() -> None:
+    texts = make_texts()
+    with MockServerProcess(**MOCK_SETTINGS) as base_url, tempfile.TemporaryDirectory() as tmp:
+        os.environ["OPENROUTER_BASE_URL"] = base_url
+        os.environ["OPENROUTER_API_KEY"] = "mock-key"
+        os.environ["LLM_CACHE_DISABLED"] = "1"
+        workdir = Path(tmp)
+        print(f"🌐 {N_REQUESTS} concurrent requests over {len(set(texts))} distinct texts")
+        bench_classify(texts, "/classify, one per prompt", workdir, max_batch_size=1, max_batch_wait=0.0)
+        bench_classify(texts, "/classify, micro-batched", workdir)
+        bench_respond(texts, workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+bench_streaming.py
+Time to first post / first response text, streamed vs. waiting for the whole
+completion, against the offline mock server (src/benchmarks/mock_openrouter.py).
+
+The mock is given a realistic generation speed (`token_interval` per 16-char
+delta on top of the initial latency), so a non-streamed answer arrives only
+after the whole text is "written", while a stream delivers its first delta
+right after the initial latency.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_streaming
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from src.benchmarks.mock_openrouter import MockServerProcess
+
+N_REQUESTS = 40
+CONCURRENCY = 8
+MOCK_SETTINGS = {
+    "latency_median": 0.25,  # time to the first token
+    "latency_sigma": 0.3,
+    "token_interval": 0.03,  # ~500 chars/s of generated text
+    "delta_chars": 16,
+}
+
+
+async def _measure(run: Callable[[int], Awaitable[Tuple[float, float]]]) -> Tuple[List[float], List[float]]:
+    """(first-output seconds, total seconds) for N_REQUESTS runs, CONCURRENCY at a time."""
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i: int) -> Tuple[float, float]:
+        async with sem:
+            return await run(i)
+
+    results = await asyncio.gather(*(one(i) for i in range(N_REQUESTS)))
+    return [first for first, _ in results], [total for _, total in results]
+
+
+def _report(label: str, firsts: List[float], totals: List[float]) -> None:
+    q = lambda values, p: statistics.quantiles(values, n=100)[p - 1]
+    print(
+        f"  {label:30} first output p50 {q(firsts, 50) * 1000:6.0f}ms p95 {q(firsts, 95) * 1000:6.0f}ms"
+        f" | complete p50 {q(totals, 50) * 1000:6.0f}ms"
+    )
+
+
+async def bench_responses() -> None:
+    from src.modules.responders.generate_response import (
+        _build_response_client,
+        generate_supportive_response_async,
+        stream_supportive_response,
+    )
+
+    client = _build_response_client()
+
+    async def whole(i: int) -> Tuple[float, float]:
+        start = time.perf_counter()
+        await generate_supportive_response_async("Climate Action", "Fear", [f"heatwave {i}"], client=client)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    async def streamed(i: int) -> Tuple[float, float]:
+        start = time.perf_counter()
+        first = None
+        async for _ in stream_supportive_response("Climate Action", "Fear", [f"heatwave {i}"], client=client):
+            first = first or time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    print(f"💬 Supportive responses ({client.model})")
+    _report("call (whole completion)", *await _measure(whole))
+    _report("stream_supportive_response", *await _measure(streamed))
+    await client.close()
+
+
+async def bench_posts() -> None:
+    from src.modules.generators.post_generator import PostGenerator
+
+    generator = PostGenerator()
+
+    async def whole(i: int) -> Tuple[float, float]:
+        start = time.perf_counter()
+        raw = await generator.client.call(generator.build_prompt(f"trend {i}", 10), **generator.model_params)
+        generator._to_posts(raw, f"trend {i}")
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    async def streamed(i: int) -> Tuple[float, float]:
+        start = time.perf_counter()
+        first = None
+        async for _ in generator.stream_posts_for_trend(f"trend {i}", 10):
+            first = first or time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    print(f"📝 Post generation, 10 posts per trend ({generator.model_name})")
+    _report("call (whole completion)", *await _measure(whole))
+    _report("stream_posts_for_trend", *await _measure(streamed))
+    await generator.client.close()
+
+
+def main() -> None:
+    with MockServerProcess(**MOCK_SETTINGS) as base_url:
+        os.environ["OPENROUTER_BASE_URL"] = base_url
+        os.environ["OPENROUTER_API_KEY"] = "mock-key"
+        os.environ["LLM_CACHE_DISABLED"] = "1"
+        print(f"🧪 Mock OpenRouter at {base_url} ({MOCK_SETTINGS})")
+        asyncio.run(bench_responses())
+        asyncio.run(bench_posts())
+
+
+if __name__ == "__main__":
+    main()
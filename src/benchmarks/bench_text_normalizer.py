@@ -0,0 +1,82 @@
+"""
+bench_text_normalizer.py
+Compare the shared `text_normalizer.clean_text` with the two implementations
+it replaced, on the Text column of the bundled twitter_dataset.csv:
+- the five sequential `re.sub` passes of utilities.clean_text,
+- the single fused pattern of trend_fetcher.clean_text.
+
+The CSV is plain ASCII prose, so it is measured twice: as is, and with every
+post decorated with a URL, a mention, a hashtag and an emoji to exercise the
+slower paths. All implementations must produce identical output.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_text_normalizer
+"""
+
+import re
+import time
+from typing import Callable, List
+
+import pandas as pd
+
+from src.configs.paths import TWITTER_CSV_PATH
+from src.utils.text_normalizer import clean_text, clean_texts
+
+TEXT_COLUMN = "Text"
+REPEAT = 5
+DECORATIONS = ["🌍 https://t.co/{i} @user{i}", "#Climate{i} www.example.org/{i} 🙌", "@ngo_{i} “quoted” café #SDG{i}"]
+
+
+def sequential_clean_text(text: str) -> str:
+    text = text.lower()
+    text = re.sub(r'http\S+|www\S+', '', text)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'#(\w+)', r'\1', text)
+    text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+_FUSED = re.compile(r"http\S+|www\S+|@(?:(?!http\S|www\S)\w)+|[^a-z0-9\s]")
+
+
+def fused_clean_text(text: str) -> str:
+    return " ".join(_FUSED.sub("", str(text).lower()).split())
+
+
+def _time(func: Callable[[], List[str]]) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(label: str, texts: List[str]) -> None:
+    expected = [sequential_clean_text(text) for text in texts]
+    for name, func in (("fused", fused_clean_text), ("clean_text", clean_text)):
+        if [func(text) for text in texts] != expected:
+            raise AssertionError(f"{name} disagrees with the sequential passes on {label}")
+
+    size_mb = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+    baseline = _time(lambda: [sequential_clean_text(text) for text in texts])
+    print(f"📊 {label}: {len(texts):,} posts, {size_mb:.1f} MB")
+    for name, seconds in (
+        ("5x re.sub (utilities)", baseline),
+        ("fused re.sub (trend_fetcher)", _time(lambda: [fused_clean_text(text) for text in texts])),
+        ("clean_text", _time(lambda: [clean_text(text) for text in texts])),
+        ("clean_texts (batch)", _time(lambda: clean_texts(texts))),
+    ):
+        print(f"  {name:30} {seconds * 1000:8.1f}ms  {size_mb / seconds:6.1f} MB/s  {baseline / seconds:5.1f}x")
+
+
+def main() -> None:
+    texts = pd.read_csv(TWITTER_CSV_PATH, usecols=[TEXT_COLUMN])[TEXT_COLUMN].astype(str).tolist()
+    bench("twitter_dataset.csv", texts)
+    decorated = [f"{text} {DECORATIONS[i % len(DECORATIONS)].format(i=i)}" for i, text in enumerate(texts)]
+    bench("decorated (URLs, mentions, hashtags, emojis)", decorated)
+
+
+if __name__ == "__main__":
+    main()
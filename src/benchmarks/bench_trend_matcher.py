@@ -0,0 +1,55 @@
+"""
+bench_trend_matcher.py
+Compare the linear `assign_trend` scan against the precompiled `TrendIndex`
+on the bundled twitter_dataset.csv scaled up 100x.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_trend_matcher
+"""
+
+import time
+
+import pandas as pd
+
+from src.modules.fetchers.trend_fetcher import (
+    INPUT_CSV_PATH,
+    TEXT_COLUMN,
+    TREND_LIST_PATH,
+    TrendIndex,
+    assign_trend,
+    parse_trend_list,
+)
+from src.utils.text_normalizer import clean_texts
+
+SCALE = 100
+
+
+def main() -> None:
+    trends = parse_trend_list(TREND_LIST_PATH)
+    base_texts = clean_texts(pd.read_csv(INPUT_CSV_PATH, usecols=[TEXT_COLUMN])[TEXT_COLUMN])
+    texts = base_texts * SCALE
+    print(f"📊 {len(texts)} posts x {len(trends)} trends")
+
+    start = time.perf_counter()
+    index = TrendIndex(trends)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.match(t) for t in texts]
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear = [assign_trend(t, trends) for t in texts]
+    linear_time = time.perf_counter() - start
+
+    if indexed != linear:
+        mismatches = sum(1 for a, b in zip(indexed, linear) if a != b)
+        raise AssertionError(f"TrendIndex disagrees with assign_trend on {mismatches} posts")
+
+    print(f"  assign_trend : {linear_time:8.2f}s  ({len(texts) / linear_time:,.0f} posts/s)")
+    print(f"  TrendIndex   : {index_time:8.2f}s  ({len(texts) / index_time:,.0f} posts/s, build {build_time * 1000:.1f}ms)")
+    print(f"  speedup      : {linear_time / index_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+mock_openrouter.py
+Offline stand-in for the OpenRouter `chat/completions` endpoint.
+
+Speaks just enough HTTP/1.1 (keep-alive, Content-Length or chunked bodies) for
+httpx, and answers every prompt the project sends with deterministic canned JSON:
+SDG / emotion / combined classifications (single and numbered batch prompts),
+generated posts and supportive responses. Labels are derived from a hash of
+the post text, so repeated runs produce identical outputs. Latency follows a
+log-normal distribution, and a configurable share of requests fails with 429
+(with Retry-After) or 500 to exercise the retry paths. Requests with
+`"stream": true` get server-sent events: the completion split into small
+deltas, one every `token_interval` seconds after the initial latency; a
+non-streamed answer waits for the same generation time before it is sent.
+
+Point the pipelines at it with
+    OPENROUTER_BASE_URL=http://127.0.0.1:8787/api/v1
+
+Run standalone from the repository root:
+    python -m src.benchmarks.mock_openrouter
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import random
+import re
+from typing import List, Optional, Tuple
+
+from src.schemas.emotion_output import VALID_EMOTIONS
+from src.schemas.sdg_output import SDG_TITLES
+
+HOST = "127.0.0.1"
+PORT = 8787
+DEFAULT_SETTINGS = {
+    "latency_median": 0.05,  # seconds
+    "latency_sigma": 0.5,  # log-normal shape; 0 gives a constant latency
+    "error_rate": 0.0,  # share of requests answered with HTTP 500
+    "rate_limit_rate": 0.0,  # share of requests answered with HTTP 429
+    "retry_after": 1.0,  # Retry-After seconds sent with a 429
+    "token_interval": 0.0,  # seconds of generation per streamed delta
+    "delta_chars": 16,  # characters per streamed delta
+    "seed": 0,
+}
+
+_NUMBERED = re.compile(r"^(\d+)\. \"?(.*?)\"?$")
+_SINGLE_POST = re.compile(r"Post: \"?(.*?)\"?\n\n", re.S)
+_TREND = re.compile(r"Trend: (.*)")
+_N_POSTS = re.compile(r"Generate (\d+) realistic")
+_PERSPECTIVE = re.compile(r"point of view of (.*?)\.\n")
+_RESPONSE_CONTEXT = re.compile(r"feeling (\w+) in response to topics like: (.*?)\.\n.*Goal: '(.*?)'", re.S)
+
+
+def _pick(text: str, options: List[str], salt: str = "") -> str:
+    digest = hashlib.md5((salt + text).encode("utf-8")).digest()
+    return options[int.from_bytes(digest[:4], "big") % len(options)]
+
+
+def _sdgs(text: str) -> List[str]:
+    first = _pick(text, SDG_TITLES)
+    second = _pick(text, SDG_TITLES, salt="2")
+    return [first] if second == first or len(text) % 2 else [first, second]
+
+
+def _posts_of(prompt: str) -> Tuple[List[str], bool]:
+    """(post texts, is batch) from a single-post or numbered batch prompt."""
+    if "Posts:\n" in prompt:
+        block = prompt.split("Posts:\n", 1)[1].split("\n\n", 1)[0]
+        texts = [m.group(2) for m in map(_NUMBERED.match, block.splitlines()) if m]
+        return texts, True
+    match = _SINGLE_POST.search(prompt)
+    return [match.group(1) if match else prompt], False
+
+
+def canned_completion(prompt: str) -> str:
+    """Deterministic completion text for any prompt the project sends."""
+    if "JSON list of strings" in prompt:
+        trend = (_TREND.search(prompt) or [None, "this trend"])[1].strip()
+        n_posts = int((_N_POSTS.search(prompt) or [None, 10])[1])
+        voice = (_PERSPECTIVE.search(prompt) or [None, "someone online"])[1]
+        feelings = ["hopeful", "frustrated", "worried", "excited", "confused"]
+        return json.dumps([
+            f"As {voice}, honestly {_pick(f'{trend}{voice}{i}', feelings)} about {trend} today, post number {i + 1}"
+            for i in range(n_posts)
+        ])
+
+    if "supportive assistant" in prompt:
+        match = _RESPONSE_CONTEXT.search(prompt)
+        emotion, trends, sdg = match.groups() if match else ("uncertain", "recent trends", "the SDGs")
+        return (
+            f"It is understandable to feel {emotion} about {trends}. "
+            f"Small steps toward '{sdg}' add up, and you are not alone in caring about this."
+        )
+
+    texts, batch = _posts_of(prompt)
+    if "dominant emotion" in prompt:
+        make = lambda text: {"sdg": _sdgs(text), "emotion": _pick(text, VALID_EMOTIONS)}
+    elif "Sustainable Development Goals" in prompt:
+        make = lambda text: {"sdg": _sdgs(text)}
+    else:
+        make = lambda text: {"emotion": _pick(text, VALID_EMOTIONS)}
+
+    if batch:
+        return json.dumps([{"id": i, **make(text)} for i, text in enumerate(texts, start=1)])
+    return json.dumps(make(texts[0]))
+
+
+class MockOpenRouter:
+    def __init__(self, host: str = HOST, port: int = PORT, **settings):
+        unknown = set(settings) - set(DEFAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown mock settings: {sorted(unknown)}")
+        self.host = host
+        self.port = port
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        self.rng = random.Random(self.settings["seed"])
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    def _latency(self) -> float:
+        median, sigma = self.settings["latency_median"], self.settings["latency_sigma"]
+        return median * math.exp(self.rng.gauss(0, sigma)) if sigma else median
+
+    def respond(self, body: bytes) -> Tuple[int, dict, dict]:
+        """(status, JSON body, extra headers) for one request body."""
+        self.requests += 1
+        roll = self.rng.random()
+        if roll < self.settings["rate_limit_rate"]:
+            return 429, {"error": {"message": "Rate limit exceeded (mock)"}}, {
+                "Retry-After": str(self.settings["retry_after"])
+            }
+        if roll < self.settings["rate_limit_rate"] + self.settings["error_rate"]:
+            return 500, {"error": {"message": "Internal error (mock)"}}, {}
+
+        try:
+            payload = json.loads(body)
+            prompt = payload["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return 400, {"error": {"message": "Malformed chat/completions request"}}, {}
+
+        content = canned_completion(prompt)
+        prompt_tokens, completion_tokens = len(prompt) // 4 + 1, len(content) // 4 + 1
+        return 200, {
+            "id": f"mock-{self.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, {}
+
+    def _deltas(self, content: str) -> List[str]:
+        size = self.settings["delta_chars"]
+        return [content[i:i + size] for i in range(0, len(content), size)] or [""]
+
+    async def _stream(self, writer: asyncio.StreamWriter, data: dict) -> None:
+        """Send a completion as `chat.completion.chunk` server-sent events over a chunked body."""
+
+        def send(event: str) -> None:
+            encoded = event.encode("utf-8")
+            writer.write(f"{len(encoded):x}\r\n".encode("latin-1") + encoded + b"\r\n")
+
+        base = {"id": data["id"], "object": "chat.completion.chunk", "model": data["model"]}
+        for delta in self._deltas(data["choices"][0]["message"]["content"]):
+            chunk = {**base, "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]}
+            send(f"data: {json.dumps(chunk)}\n\n")
+            await writer.drain()
+            await asyncio.sleep(self.settings["token_interval"])
+        send(f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], 'usage': data['usage']})}\n\n")
+        send("data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                await asyncio.sleep(self._latency())
+                status, data, extra = self.respond(body)
+                streamed = status == 200 and json.loads(body).get("stream") is True
+                if status == 200 and not streamed and self.settings["token_interval"]:
+                    content = data["choices"][0]["message"]["content"]
+                    await asyncio.sleep(len(self._deltas(content)) * self.settings["token_interval"])
+                if streamed:
+                    payload = b""
+                    response_headers = {"Content-Type": "text/event-stream", "Transfer-Encoding": "chunked"}
+                else:
+                    payload = json.dumps(data).encode("utf-8")
+                    response_headers = {"Content-Type": "application/json", "Content-Length": str(len(payload))}
+                response_headers.update({"Connection": "keep-alive", **extra})
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n".encode("latin-1")
+                    + "".join(f"{k}: {v}\r\n" for k, v in response_headers.items()).encode("latin-1")
+                    + b"\r\n" + payload
+                )
+                if streamed:
+                    await self._stream(writer, data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # client closed the keep-alive connection
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]  # resolves port=0
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"🧪 Mock OpenRouter listening on {self.base_url} ({self.settings})")
+        await self._server.serve_forever()
+
+
+def _serve_in_child(connection, host: str, settings: dict) -> None:
+    async def run():
+        server = MockOpenRouter(host=host, port=0, **settings)
+        connection.send(await server.start())
+        await server._server.serve_forever()
+
+    asyncio.run(run())
+
+
+class MockServerProcess:
+    """
+    Run the mock in a child process so its event loop does not compete with
+    the client under test:
+
+        with MockServerProcess(latency_median=0.02) as base_url:
+            os.environ["OPENROUTER_BASE_URL"] = base_url
+    """
+
+    def __init__(self, host: str = HOST, **settings):
+        self.host = host
+        self.settings = settings
+        self.process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> str:
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve_in_child, args=(child, self.host, self.settings), daemon=True
+        )
+        self.process.start()
+        if not parent.poll(30):
+            self.process.terminate()
+            raise RuntimeError("Mock OpenRouter server did not start")
+        return parent.recv()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+
+if __name__ == "__main__":
+    asyncio.run(MockOpenRouter().serve_forever())
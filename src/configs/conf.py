@@ -1,9 +1,22 @@
 import os
-from dotenv import load_dotenv
 
-load_dotenv()  # Automatically loads from ../..env when running from src
+_api_key = None
 
-API_KEY_OAI = os.getenv("OPENROUTER_API_KEY")
 
-if API_KEY_OAI is None:
-    raise ValueError("API_KEY_OAI not found. Please set OPENROUTER_API_KEY in your ..env file.")
+def get_api_key() -> str:
+    """Load .env on first use and return OPENROUTER_API_KEY; importing this module has no side effects."""
+    global _api_key
+    if _api_key is None:
+        from dotenv import load_dotenv
+        load_dotenv()  # Automatically loads from ../..env when running from src
+        _api_key = os.getenv("OPENROUTER_API_KEY")
+        if _api_key is None:
+            raise ValueError("API_KEY_OAI not found. Please set OPENROUTER_API_KEY in your ..env file.")
+    return _api_key
+
+
+def __getattr__(name: str):
+    # `conf.API_KEY_OAI` still works, but is resolved lazily on access
+    if name == "API_KEY_OAI":
+        return get_api_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,10 @@
-from src.utils.model_loader import get_model_config
-
 # Model selection for different tasks
 MODELS = {
     "generation": "openai/gpt-4.1-mini",
     "sdg_classification":"anthropic/claude-opus-4.1",
     "classification": "openai/gpt-4.1-mini",
     "emotion_detection": "anthropic/claude-3.5-sonnet",
+    "combined_classification": "anthropic/claude-opus-4.1",  # SDG + emotion in one call
     "support": "anthropic/claude-sonnet-4",
     "response_generation": "openai/gpt-4-turbo",
     "test":"mistralai/mistral-7b-instruct"# Future module
@@ -14,11 +13,6 @@ MODELS = {
 # Default model (for backward compatibility)
 ACTIVE_MODEL = MODELS["response_generation"]
 
-# Get configurations for all models
-MODEL_CONFIGS = {
-    task: get_model_config(model)
-    for task, model in MODELS.items()
-}
 
 # Task-specific parameters
 TASK_PARAMS = {
@@ -43,6 +37,11 @@ TASK_PARAMS = {
         "max_tokens": 100,
         "response_format": "json"
     },
+    "combined_classification": {
+        "temperature": 0.1,
+        "top_p": 0.95,
+        "max_tokens": 150
+    },
     "support": {
         "temperature": 0.7,
         "max_tokens": 500,
@@ -68,3 +67,9 @@ def get_model_and_params(task: str):
     return MODELS[task], TASK_PARAMS.get(task, {})
 
 
+def __getattr__(name: str):
+    # Configurations for all models, loaded on first access instead of at import time
+    if name == "MODEL_CONFIGS":
+        from src.utils.model_loader import get_model_config
+        return {task: get_model_config(model) for task, model in MODELS.items()}
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
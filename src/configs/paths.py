@@ -0,0 +1,58 @@
+"""
+paths.py
+Single source of truth for data file locations.
+
+Everything is resolved from this file, so entry points behave the same
+whether they are started from the repository root, from src/ or as a module.
+"""
+
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = SRC_DIR / "data"
+INPUT_DIR = DATA_DIR / "input"
+OUTPUT_DIR = DATA_DIR / "output"
+LOGS_DIR = DATA_DIR / "logs"
+CACHE_DIR = DATA_DIR / "cache"
+MODELS_DIR = DATA_DIR / "models"
+
+# fetch: raw CSV export + trend list -> trend-tagged posts
+TWITTER_CSV_PATH = INPUT_DIR / "twitter_dataset.csv"
+TREND_LIST_PATH = INPUT_DIR / "flat_trends_list.json"
+FETCHED_POSTS_PATH = INPUT_DIR / "twitter_dataset.json"
+
+# generate: trend titles -> synthetic posts
+TREND_TITLES_PATH = INPUT_DIR / "trend_titles.json"
+GENERATED_POSTS_PATHS = [
+    INPUT_DIR / "generated_posts.json",
+    INPUT_DIR / "generate_post_output_gpt-4.1-mini.json",
+]
+
+# clean -> SDG -> emotion -> response / analysis
+# The posts that get cleaned and annotated, for the cleaner script and run_pipeline alike
+CLEAN_INPUT_PATHS = GENERATED_POSTS_PATHS
+# ".jsonl" streams records between stages; ".parquet" stores them columnar
+# for fast aggregates (needs pyarrow, see utils/columnar.py)
+POSTS_SUFFIX = ".json"
+CLEANED_POSTS_PATH = INPUT_DIR / f"cleaned_posts{POSTS_SUFFIX}"
+NEAR_DUPLICATES_PATH = INPUT_DIR / "near_duplicates.jsonl"  # dropped posts -> their cluster representative
+SDG_OUTPUT_PATH = OUTPUT_DIR / f"sdg_output{POSTS_SUFFIX}"
+SDG_FAILED_PATH = LOGS_DIR / "sdg_failed.json"
+SDG_CHECKPOINT_PATH = LOGS_DIR / "sdg_progress.jsonl"
+EMOTION_OUTPUT_PATH = OUTPUT_DIR / f"emotion_output{POSTS_SUFFIX}"
+EMOTION_FAILED_PATH = LOGS_DIR / "emotion_failed.json"
+EMOTION_CHECKPOINT_PATH = LOGS_DIR / "emotion_progress.jsonl"
+COMBINED_FAILED_PATH = LOGS_DIR / "combined_failed.json"
+COMBINED_CHECKPOINT_PATH = LOGS_DIR / "combined_progress.jsonl"
+RESPONSE_OUTPUT_PATH = OUTPUT_DIR / "final_response.json"
+SDG_DISTRIBUTION_PATH = OUTPUT_DIR / "sdg_distribution.json"
+ANALYTICS_DASHBOARD_PATH = OUTPUT_DIR / "analytics_dashboard.json"
+
+# run_incremental_update: aggregates of every merged batch + current responses
+AGGREGATE_STATE_PATH = CACHE_DIR / "aggregate_state.json"
+
+# response generation: memoized responses (see responders/response_cache.py)
+RESPONSE_CACHE_PATH = CACHE_DIR / "response_cache.sqlite3"
+
+# run_pipeline: fingerprints of the last successful run of every stage
+PIPELINE_MANIFEST_PATH = CACHE_DIR / "pipeline_manifest.json"
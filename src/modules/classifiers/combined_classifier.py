@@ -0,0 +1,117 @@
+import asyncio
+from typing import List, Optional
+from src.schemas.emotion_output import EmotionAnnotatedPost, VALID_EMOTIONS
+from src.schemas.sdg_output import SDGClassificationResult, SDG_TITLES
+from src.utils.llm_cache import get_default_cache
+from src.utils.llm_client import LLMClient
+from src.utils.llm_parser import align_batch_items, check_complete, extract_json_array, extract_json_object
+from src.configs.conf import get_api_key
+from src.configs.model_selector import get_model_and_params
+
+PROMPT_HEADER = (
+    "You are an expert analyst of social media posts, specializing in UN Sustainable Development Goals (SDGs) "
+    "and emotional tone.\n"
+    "For each post, identify the SDGs it relates to and its dominant emotion.\n\n"
+    "**IMPORTANT: Return ONLY valid JSON in the specified format. No additional text or explanations.**\n\n"
+    "**Choose only from the lists shown below. Do not create new labels.**\n\n"
+    " 17 UN SDGs Reference:\n"
+    + "".join(f"- {title}\n" for title in SDG_TITLES)
+    + "\nEmotions (pick exactly one):\n"
+    + ", ".join(VALID_EMOTIONS) + "\n\n"
+    "Classification Rules:\n"
+    "- Consider implicit meanings and emotional undertones\n"
+    "- Focus on core issues mentioned in the text\n"
+    "- One post can map to multiple SDGs (maximum 2)\n"
+    "- Do not include any explanatory text\n\n"
+)
+
+# Output tokens budgeted per post in a batched request
+BATCH_TOKENS_PER_POST = 64
+
+
+class CombinedClassifier:
+    """Single-pass SDG + emotion classifier: one LLM call instead of two per post."""
+
+    def __init__(self):
+        self.model_name, self.model_params = get_model_and_params("combined_classification")
+        self.client = LLMClient(model=self.model_name, api_key=get_api_key(), cache=get_default_cache())
+
+    def build_prompt(self, text: str) -> str:
+        return (
+            PROMPT_HEADER
+            + f"Post: \"{text}\"\n\n"
+            "Required output format (ONLY this, no other text):\n"
+            "{\"sdg\": [\"SDG Title 1\", \"SDG Title 2\"], \"emotion\": \"Emotion\"}"
+        )
+
+    def build_batch_prompt(self, texts: List[str]) -> str:
+        numbered = "\n".join(f"{i}. \"{text}\"" for i, text in enumerate(texts, start=1))
+        return (
+            PROMPT_HEADER
+            + f"Posts:\n{numbered}\n\n"
+            f"Required output format (ONLY this, no other text): a JSON array with exactly {len(texts)} "
+            "objects, one per post, in the same order, each with the post number as \"id\":\n"
+            "[{\"id\": 1, \"sdg\": [\"SDG Title 1\", \"SDG Title 2\"], \"emotion\": \"Emotion\"}, "
+            "{\"id\": 2, \"sdg\": [\"SDG Title\"], \"emotion\": \"Emotion\"}]"
+        )
+
+    @staticmethod
+    def _to_post(post: dict, item) -> EmotionAnnotatedPost:
+        if not isinstance(item, dict):
+            raise ValueError(f"Expected a JSON object, got: {item!r}")
+        # Without the key the answer would read as "no SDG" and be checkpointed as such
+        if "sdg" not in item:
+            raise ValueError(f"Missing 'sdg' in: {item!r}")
+        sdg = SDGClassificationResult.model_validate({"sdg": item["sdg"]}).sdg
+        return EmotionAnnotatedPost(
+            trend=post["trend"],
+            text=post["text"],
+            sdg=sdg,
+            emotion=item.get("emotion"),
+        )
+
+    @classmethod
+    def _batch_results(cls, posts: List[dict], response) -> List[Optional[EmotionAnnotatedPost]]:
+        results: List[Optional[EmotionAnnotatedPost]] = []
+        for post, item in zip(posts, align_batch_items(extract_json_array(response) or [], len(posts))):
+            try:
+                results.append(cls._to_post(post, item) if item else None)
+            except Exception:
+                results.append(None)
+        return results
+
+    async def classify(self, post: dict) -> Optional[EmotionAnnotatedPost]:
+        """Classify one `{"trend", "text"}` post into an EmotionAnnotatedPost."""
+        response = await self.client.call(
+            prompt=self.build_prompt(post["text"]),
+            validate=lambda response: self._to_post(post, extract_json_object(response)),
+            **self.model_params
+        )
+        try:
+            return self._to_post(post, extract_json_object(response))
+        except Exception as e:
+            print(f"❌ Validation failed for response: {response}")
+            print(f"⚠️ Error: {e}")
+            return None
+
+    async def classify_batch(self, posts: List[dict]) -> List[Optional[EmotionAnnotatedPost]]:
+        """Classify several posts in one request, re-sending only items that fail validation."""
+        if len(posts) <= 1:
+            return [await self.classify(post) for post in posts]
+
+        params = dict(self.model_params)
+        params["max_tokens"] = max(params.get("max_tokens", 0), BATCH_TOKENS_PER_POST * len(posts))
+        texts = [post["text"] for post in posts]
+        response = await self.client.call(
+            prompt=self.build_batch_prompt(texts),
+            validate=lambda response: check_complete(self._batch_results(posts, response)),
+            **params
+        )
+        results = self._batch_results(posts, response)
+
+        retry = [i for i, result in enumerate(results) if result is None]
+        if retry:
+            fallback = await asyncio.gather(*(self.classify(posts[i]) for i in retry))
+            for i, result in zip(retry, fallback):
+                results[i] = result
+        return results
@@ -1,21 +1,31 @@
-from typing import Optional
-import os
-from dotenv import load_dotenv
+from typing import List, Optional
+import asyncio
+from src.configs.conf import get_api_key
 from src.schemas.emotion_output import EmotionClassificationResult
+from src.utils.llm_cache import get_default_cache
 from src.utils.llm_client import LLMClient
+from src.utils.llm_parser import align_batch_items, check_complete, extract_json_array
 from src.configs.model_selector import get_model_and_params
 
-# Load environment variables
-load_dotenv()
-
 model_name, model_params = get_model_and_params("classification")
 
-# Get API key from environment variable
-api_key = os.getenv("OPENROUTER_API_KEY")
-if not api_key:
-    raise ValueError("OPENROUTER_API_KEY environment variable is not set")
+_client: Optional[LLMClient] = None
+
+
+def get_client() -> LLMClient:
+    """Module-wide client, created on first use so importing this module stays cheap and offline."""
+    global _client
+    if _client is None:
+        _client = LLMClient(model=model_name, api_key=get_api_key(), cache=get_default_cache())
+    return _client
+
+
+def __getattr__(name: str):
+    # Backward compatible `emotion_detector.client`
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-client = LLMClient(model=model_name, api_key=api_key)
 
 async def detect_emotion(text: str) -> Optional[EmotionClassificationResult]:
     prompt = (
@@ -27,7 +37,9 @@ async def detect_emotion(text: str) -> Optional[EmotionClassificationResult]:
         '{"emotion": "YourChosenEmotion"}'
     )
 
-    response = await client.call(prompt=prompt, structured=True)
+    response = await get_client().call(
+        prompt=prompt, validate=lambda response: EmotionClassificationResult(**response), structured=True
+    )
 
     if isinstance(response, dict):
         try:
@@ -35,3 +47,56 @@ async def detect_emotion(text: str) -> Optional[EmotionClassificationResult]:
         except Exception:
             return None
     return None
+
+
+# Output tokens budgeted per post in a batched request
+BATCH_TOKENS_PER_POST = 16
+
+
+def build_batch_prompt(texts: List[str]) -> str:
+    numbered = "\n".join(f"{i}. {text}" for i, text in enumerate(texts, start=1))
+    return (
+        "Analyze the emotional tone of each of the following social media posts "
+        "and assign each post only one of these emotions:\n\n"
+        "Joy, Sadness, Anger, Fear, Disgust, Anxiety, Frustration, Hope, Confusion\n\n"
+        f"Posts:\n{numbered}\n\n"
+        f"Return only a JSON array with exactly {len(texts)} objects, one per post, in the same order:\n"
+        '[{"id": 1, "emotion": "YourChosenEmotion"}, {"id": 2, "emotion": "YourChosenEmotion"}]'
+    )
+
+
+def _batch_results(response, size: int) -> List[Optional[EmotionClassificationResult]]:
+    results: List[Optional[EmotionClassificationResult]] = []
+    for item in align_batch_items(extract_json_array(response) or [], size):
+        try:
+            results.append(EmotionClassificationResult.model_validate(item) if item else None)
+        except Exception:
+            results.append(None)
+    return results
+
+
+async def detect_emotion_batch(texts: List[str]) -> List[Optional[EmotionClassificationResult]]:
+    """
+    Detect the emotion of several posts with a single request.
+
+    Elements of the returned array are validated individually; posts whose
+    element is missing or invalid fall back to `detect_emotion`.
+    """
+    if len(texts) <= 1:
+        return [await detect_emotion(text) for text in texts]
+
+    params = dict(model_params)
+    params["max_tokens"] = max(params.get("max_tokens", 0), BATCH_TOKENS_PER_POST * len(texts))
+    response = await get_client().call(
+        prompt=build_batch_prompt(texts),
+        validate=lambda response: check_complete(_batch_results(response, len(texts))),
+        **params
+    )
+    results = _batch_results(response, len(texts))
+
+    retry = [i for i, result in enumerate(results) if result is None]
+    if retry:
+        fallback = await asyncio.gather(*(detect_emotion(texts[i]) for i in retry))
+        for i, result in zip(retry, fallback):
+            results[i] = result
+    return results
@@ -0,0 +1,305 @@
+"""
+local_classifier.py
+CPU-only first classification tier in front of the LLM classifiers.
+
+A multinomial logistic regression over hashed unigram + bigram features is
+trained from the labels we already paid the LLM for (sdg_output.json /
+emotion_output.json). Posts it is confident about are
+answered locally in microseconds; everything below the confidence threshold
+is escalated to `SDGClassifier` / `detect_emotion`.
+
+Train both models (and print coverage/accuracy on a holdout split):
+    python -m src.modules.classifiers.local_classifier
+"""
+
+import json
+import math
+import random
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.configs.paths import EMOTION_OUTPUT_PATH, MODELS_DIR, SDG_OUTPUT_PATH
+from src.schemas.emotion_output import EmotionClassificationResult
+from src.schemas.sdg_output import SDGClassificationResult
+from src.utils.record_io import iter_records
+
+SDG_MODEL_PATH = MODELS_DIR / "local_sdg.json"
+EMOTION_MODEL_PATH = MODELS_DIR / "local_emotion.json"
+SDG_TRAIN_PATH = SDG_OUTPUT_PATH
+EMOTION_TRAIN_PATH = EMOTION_OUTPUT_PATH
+
+N_FEATURES = 2 ** 18
+DEFAULT_THRESHOLD = 0.9
+# A second SDG is returned when its probability is at least this share of the top one
+SECOND_SDG_RATIO = 0.5
+
+
+def extract_features(text: str, n_features: int = N_FEATURES) -> Dict[int, int]:
+    """Hashed unigram + bigram counts (crc32, so ids are stable across processes)."""
+    tokens = text.lower().split()
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    features: Dict[int, int] = defaultdict(int)
+    for gram in grams:
+        features[zlib.crc32(gram.encode("utf-8")) % n_features] += 1
+    return features
+
+
+class HashedLogisticRegression:
+    """
+    Multinomial logistic regression over hashed n-grams, trained with plain SGD.
+
+    Multi-label posts (up to 2 SDGs) are trained against a soft target that
+    splits the probability mass evenly across their labels.
+    """
+
+    def __init__(
+        self,
+        n_features: int = N_FEATURES,
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 13,
+    ):
+        self.n_features = n_features
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.seed = seed
+        self.labels: List[str] = []
+        self.weights: Dict[int, List[float]] = {}
+        self.bias: List[float] = []
+
+    def _vectorize(self, text: str) -> Dict[int, float]:
+        features = extract_features(text, self.n_features)
+        norm = math.sqrt(sum(count * count for count in features.values())) or 1.0
+        return {idx: count / norm for idx, count in features.items()}
+
+    def _softmax(self, x: Dict[int, float]) -> List[float]:
+        scores = list(self.bias)
+        for idx, value in x.items():
+            row = self.weights.get(idx)
+            if row is not None:
+                for k, w in enumerate(row):
+                    scores[k] += w * value
+        top = max(scores)
+        exp_scores = [math.exp(score - top) for score in scores]
+        total = sum(exp_scores)
+        return [value / total for value in exp_scores]
+
+    def fit(self, texts: Sequence[str], labels: Sequence[Sequence[str]]) -> "HashedLogisticRegression":
+        self.labels = sorted({label for text_labels in labels for label in text_labels})
+        index = {label: k for k, label in enumerate(self.labels)}
+        n_classes = len(self.labels)
+        self.weights = {}
+        self.bias = [0.0] * n_classes
+
+        samples = []
+        for text, text_labels in zip(texts, labels):
+            unique = list(dict.fromkeys(text_labels))
+            if not unique:
+                continue
+            target = [0.0] * n_classes
+            for label in unique:
+                target[index[label]] = 1.0 / len(unique)
+            samples.append((self._vectorize(text), target))
+
+        rng = random.Random(self.seed)
+        for epoch in range(self.epochs):
+            rng.shuffle(samples)
+            lr = self.learning_rate / (1 + epoch * 0.1)
+            for x, target in samples:
+                proba = self._softmax(x)
+                grad = [p - t for p, t in zip(proba, target)]
+                for k in range(n_classes):
+                    self.bias[k] -= lr * grad[k]
+                for idx, value in x.items():
+                    row = self.weights.setdefault(idx, [0.0] * n_classes)
+                    for k in range(n_classes):
+                        row[k] -= lr * (grad[k] * value + self.l2 * row[k])
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        if not self.labels:
+            return {}
+        return dict(zip(self.labels, self._softmax(self._vectorize(text))))
+
+    def to_dict(self) -> dict:
+        return {
+            "n_features": self.n_features,
+            "labels": self.labels,
+            "bias": self.bias,
+            "weights": {str(idx): [round(w, 6) for w in row] for idx, row in self.weights.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HashedLogisticRegression":
+        model = cls(n_features=data["n_features"])
+        model.labels = data["labels"]
+        model.bias = data["bias"]
+        model.weights = {int(idx): row for idx, row in data["weights"].items()}
+        return model
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: Path) -> "HashedLogisticRegression":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def predict_sdgs(model: HashedLogisticRegression, text: str) -> Tuple[List[str], float]:
+    """
+    Top SDG, plus a close second (max 2 like the LLM prompt), and the confidence.
+
+    Two-SDG posts are trained against a 0.5/0.5 target, so a confident
+    two-label answer looks like 0.46/0.44: its confidence is the mass on the
+    pair. A single label's confidence is its own probability.
+    """
+    ranked = sorted(model.predict_proba(text).items(), key=lambda x: x[1], reverse=True)
+    if not ranked:
+        return [], 0.0
+    chosen = ranked[:1]
+    if len(ranked) > 1 and ranked[1][1] >= SECOND_SDG_RATIO * ranked[0][1]:
+        chosen = ranked[:2]
+    return [label for label, _ in chosen], sum(p for _, p in chosen)
+
+
+def predict_emotion(model: HashedLogisticRegression, text: str) -> Tuple[Optional[str], float]:
+    proba = model.predict_proba(text)
+    if not proba:
+        return None, 0.0
+    label = max(proba, key=proba.get)
+    return label, proba[label]
+
+
+class TierStats:
+    def __init__(self):
+        self.local = 0
+        self.escalated = 0
+
+    def report(self) -> dict:
+        total = self.local + self.escalated
+        return {
+            "answered_locally": self.local,
+            "escalated_to_llm": self.escalated,
+            "llm_calls_avoided_pct": round(100 * self.local / total, 1) if total else 0.0,
+        }
+
+
+class TieredSDGClassifier:
+    """
+    Drop-in for `SDGClassifier` (`classify` / `classify_batch` / `client`):
+    answers confident posts locally and escalates the rest to the LLM.
+    """
+
+    def __init__(self, llm_classifier, model: HashedLogisticRegression, threshold: float = DEFAULT_THRESHOLD):
+        self.llm_classifier = llm_classifier
+        self.client = llm_classifier.client
+        self.model = model
+        self.threshold = threshold
+        self.stats = TierStats()
+
+    def _local(self, text: str) -> Optional[SDGClassificationResult]:
+        labels, confidence = predict_sdgs(self.model, text)
+        if labels and confidence >= self.threshold:
+            self.stats.local += 1
+            return SDGClassificationResult(sdg=labels)
+        self.stats.escalated += 1
+        return None
+
+    async def classify(self, text: str) -> Optional[SDGClassificationResult]:
+        return self._local(text) or await self.llm_classifier.classify(text)
+
+    async def classify_batch(self, texts: List[str]) -> List[Optional[SDGClassificationResult]]:
+        results = [self._local(text) for text in texts]
+        escalate = [i for i, result in enumerate(results) if result is None]
+        if escalate:
+            llm_results = await self.llm_classifier.classify_batch([texts[i] for i in escalate])
+            for i, result in zip(escalate, llm_results):
+                results[i] = result
+        return results
+
+
+class TieredEmotionDetector:
+    """Local-first wrapper around `detect_emotion` / `detect_emotion_batch`."""
+
+    def __init__(self, model: HashedLogisticRegression, threshold: float = DEFAULT_THRESHOLD):
+        self.model = model
+        self.threshold = threshold
+        self.stats = TierStats()
+
+    def _local(self, text: str) -> Optional[EmotionClassificationResult]:
+        label, confidence = predict_emotion(self.model, text)
+        if label and confidence >= self.threshold:
+            self.stats.local += 1
+            return EmotionClassificationResult(emotion=label)
+        self.stats.escalated += 1
+        return None
+
+    async def detect(self, text: str) -> Optional[EmotionClassificationResult]:
+        from src.modules.classifiers.emotion_detector import detect_emotion
+        return self._local(text) or await detect_emotion(text)
+
+    async def detect_batch(self, texts: List[str]) -> List[Optional[EmotionClassificationResult]]:
+        from src.modules.classifiers.emotion_detector import detect_emotion_batch
+        results = [self._local(text) for text in texts]
+        escalate = [i for i, result in enumerate(results) if result is None]
+        if escalate:
+            llm_results = await detect_emotion_batch([texts[i] for i in escalate])
+            for i, result in zip(escalate, llm_results):
+                results[i] = result
+        return results
+
+
+def _evaluate(name: str, records: List[dict], label_key: str, thresholds: Sequence[float]) -> None:
+    """Holdout coverage / accuracy per threshold, so the knob can be tuned before use."""
+    records = list(records)
+    random.Random(13).shuffle(records)
+    split = max(1, int(len(records) * 0.8))
+    train, test = records[:split], records[split:]
+    labels_of = (lambda r: r[label_key]) if label_key == "sdg" else (lambda r: [r[label_key]])
+    model = HashedLogisticRegression().fit([r["text"] for r in train], [labels_of(r) for r in train])
+
+    predictions = []
+    for record in test:
+        if label_key == "sdg":
+            predicted, confidence = predict_sdgs(model, record["text"])
+            hit = bool(predicted) and set(predicted) <= set(record["sdg"])  # both SDGs of a pair must be right
+        else:
+            label, confidence = predict_emotion(model, record["text"])
+            hit = label == record["emotion"]
+        predictions.append((confidence, hit))
+
+    for threshold in thresholds:
+        confident = [hit for confidence, hit in predictions if confidence >= threshold]
+        coverage = len(confident) / len(test) if test else 0.0
+        accuracy = sum(confident) / len(confident) if confident else 0.0
+        print(f"  {name:8} threshold {threshold:.2f}: {coverage:4.0%} answered locally, {accuracy:4.0%} of those correct")
+
+
+def train_models(thresholds: Sequence[float] = (0.5, 0.7, DEFAULT_THRESHOLD)) -> None:
+    sdg_records = [r for r in iter_records(SDG_TRAIN_PATH) if r.get("sdg")]
+    emotion_records = [r for r in iter_records(EMOTION_TRAIN_PATH) if r.get("emotion")]
+
+    HashedLogisticRegression().fit(
+        [r["text"] for r in sdg_records], [r["sdg"] for r in sdg_records]
+    ).save(SDG_MODEL_PATH)
+    HashedLogisticRegression().fit(
+        [r["text"] for r in emotion_records], [[r["emotion"]] for r in emotion_records]
+    ).save(EMOTION_MODEL_PATH)
+
+    print(f"✅ Trained SDG model on {len(sdg_records)} posts -> {SDG_MODEL_PATH}")
+    print(f"✅ Trained emotion model on {len(emotion_records)} posts -> {EMOTION_MODEL_PATH}")
+    print("📊 Holdout (80/20) coverage vs. accuracy:")
+    _evaluate("SDG", sdg_records, "sdg", thresholds)
+    _evaluate("emotion", emotion_records, "emotion", thresholds)
+
+
+if __name__ == "__main__":
+    train_models()
@@ -1,60 +1,124 @@
-from typing import Optional
+import asyncio
+from typing import List, Optional
 from src.schemas.sdg_output import SDGClassificationResult
+from src.utils.llm_cache import get_default_cache
 from src.utils.llm_client import LLMClient
-from src.configs.conf import API_KEY_OAI
+from src.utils.llm_parser import align_batch_items, check_complete, extract_json_array
+from src.configs.conf import get_api_key
 from src.configs.model_selector import get_model_and_params
 
+PROMPT_HEADER = (
+    "You are an expert analyst specializing in UN Sustainable Development Goals (SDGs).\n"
+    "Analyze social media posts and classify them according to the 17 SDGs.\n\n"
+    "**IMPORTANT: Return ONLY a valid JSON object with the specified format. No additional text or explanations.**\n\n"
+    "**Choose only from the list of goals shown below. Do not create new labels.**\n\n"
+    " 17 UN SDGs Reference:\n"
+    "- No Poverty\n- Zero Hunger\n- Good Health and Well-being\n- Quality Education\n"
+    "- Gender Equality\n- Clean Water and Sanitation\n- Affordable and Clean Energy\n"
+    "- Decent Work and Economic Growth\n- Industry, Innovation and Infrastructure\n"
+    "- Reduced Inequality\n- Sustainable Cities and Communities\n"
+    "- Responsible Consumption and Production\n- Climate Action\n- Life Below Water\n"
+    "- Life on Land\n- Peace, Justice and Strong Institutions\n- Partnerships for the Goals\n\n"
+    "Classification Rules:\n"
+    "- Consider implicit meanings and emotional undertones\n"
+    "- Focus on core issues mentioned in the text\n"
+    "- One post can map to multiple SDGs (maximum 2)\n"
+    "- Only output the exact JSON format specified\n"
+    "- Do not include any explanatory text\n\n"
+)
+
+# Output tokens budgeted per post in a batched request
+BATCH_TOKENS_PER_POST = 48
+
 
 class SDGClassifier:
     def __init__(self):
         self.model_name, self.model_params = get_model_and_params("sdg_classification")
-        self.client = LLMClient(model=self.model_name, api_key=API_KEY_OAI)
+        self.client = LLMClient(model=self.model_name, api_key=get_api_key(), cache=get_default_cache())
 
     def build_prompt(self, text: str) -> str:
         return (
-            "You are an expert analyst specializing in UN Sustainable Development Goals (SDGs).\n"
-            "Analyze social media posts and classify them according to the 17 SDGs.\n\n"
-            "**IMPORTANT: Return ONLY a valid JSON object with the specified format. No additional text or explanations.**\n\n"
-            "**Choose only from the list of goals shown below. Do not create new labels.**\n\n"
-            " 17 UN SDGs Reference:\n"
-            "- No Poverty\n- Zero Hunger\n- Good Health and Well-being\n- Quality Education\n"
-            "- Gender Equality\n- Clean Water and Sanitation\n- Affordable and Clean Energy\n"
-            "- Decent Work and Economic Growth\n- Industry, Innovation and Infrastructure\n"
-            "- Reduced Inequality\n- Sustainable Cities and Communities\n"
-            "- Responsible Consumption and Production\n- Climate Action\n- Life Below Water\n"
-            "- Life on Land\n- Peace, Justice and Strong Institutions\n- Partnerships for the Goals\n\n"
-            "Classification Rules:\n"
-            "- Consider implicit meanings and emotional undertones\n"
-            "- Focus on core issues mentioned in the text\n"
-            "- One post can map to multiple SDGs (maximum 2)\n"
-            "- Only output the exact JSON format specified\n"
-            "- Do not include any explanatory text\n\n"
-            f"Post: \"{text}\"\n\n"
+            PROMPT_HEADER
+            + f"Post: \"{text}\"\n\n"
             "Required output format (ONLY this, no other text):\n"
             "{\"sdg\": [\"SDG Title 1\", \"SDG Title 2\"]}\n"
             "or for single SDG:\n"
             "{\"sdg\": [\"SDG Title\"]}"
         )
 
+    def build_batch_prompt(self, texts: List[str]) -> str:
+        """One prompt for several posts: the SDG reference list is sent once instead of per post."""
+        numbered = "\n".join(f"{i}. \"{text}\"" for i, text in enumerate(texts, start=1))
+        return (
+            PROMPT_HEADER.replace("a valid JSON object", "a valid JSON array")
+            + f"Posts:\n{numbered}\n\n"
+            f"Required output format (ONLY this, no other text): a JSON array with exactly {len(texts)} "
+            "objects, one per post, in the same order, each with the post number as \"id\":\n"
+            "[{\"id\": 1, \"sdg\": [\"SDG Title 1\", \"SDG Title 2\"]}, {\"id\": 2, \"sdg\": [\"SDG Title\"]}]"
+        )
+
+    @staticmethod
+    def _to_result(response) -> SDGClassificationResult:
+        if isinstance(response, dict):
+            return SDGClassificationResult.model_validate(response)
+
+        # Strip any potential explanatory text, keep only JSON
+        response = response.strip()
+        if not response.startswith('{'):
+            # Find the first JSON-like structure
+            start = response.find('{')
+            end = response.rfind('}') + 1
+            if start >= 0 and end > start:
+                response = response[start:end]
+            else:
+                raise ValueError("No JSON structure found in response")
+
+        return SDGClassificationResult.model_validate_json(response)
+
     async def classify(self, text: str) -> Optional[SDGClassificationResult]:
         prompt = self.build_prompt(text)
-        response = await self.client.call(prompt=prompt, **self.model_params)
+        response = await self.client.call(prompt=prompt, validate=self._to_result, **self.model_params)
 
         try:
-            # Strip any potential explanatory text, keep only JSON
-            response = response.strip()
-            if not response.startswith('{'):
-                # Find the first JSON-like structure
-                start = response.find('{')
-                end = response.rfind('}') + 1
-                if start >= 0 and end > start:
-                    response = response[start:end]
-                else:
-                    raise ValueError("No JSON structure found in response")
-
-            result = SDGClassificationResult.model_validate_json(response)
-            return result
+            return self._to_result(response)
         except Exception as e:
             print(f"❌ Validation failed for response: {response}")
             print(f"⚠️ Error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _batch_results(response, size: int) -> List[Optional[SDGClassificationResult]]:
+        results: List[Optional[SDGClassificationResult]] = []
+        for item in align_batch_items(extract_json_array(response) or [], size):
+            try:
+                # `sdg` defaults to [], so an element without it would pass as "no SDG"
+                results.append(SDGClassificationResult.model_validate(item) if item and "sdg" in item else None)
+            except Exception:
+                results.append(None)
+        return results
+
+    async def classify_batch(self, texts: List[str]) -> List[Optional[SDGClassificationResult]]:
+        """
+        Classify several posts with a single request.
+
+        Each element of the returned JSON array is validated on its own; only the
+        posts whose element is missing or invalid are re-sent one by one.
+        """
+        if len(texts) <= 1:
+            return [await self.classify(text) for text in texts]
+
+        params = dict(self.model_params)
+        params["max_tokens"] = max(params.get("max_tokens", 0), BATCH_TOKENS_PER_POST * len(texts))
+        response = await self.client.call(
+            prompt=self.build_batch_prompt(texts),
+            validate=lambda response: check_complete(self._batch_results(response, len(texts))),
+            **params
+        )
+        results = self._batch_results(response, len(texts))
+
+        retry = [i for i, result in enumerate(results) if result is None]
+        if retry:
+            fallback = await asyncio.gather(*(self.classify(texts[i]) for i in retry))
+            for i, result in zip(retry, fallback):
+                results[i] = result
+        return results
@@ -4,45 +4,42 @@ Clean posts, map to trends, and write JSON.
 """
 
 import json
-import re
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
 
-import pandas as pd
+from src.configs.paths import INPUT_DIR, TREND_LIST_PATH, TWITTER_CSV_PATH
+from src.utils.record_io import RecordWriter
+from src.utils.text_normalizer import clean_texts
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # -----------------------------------------------------------------------------
 # Configuration
 # -----------------------------------------------------------------------------
 
-# NOTE: This file lives at: src/modules/fetchers/trend_fetcher.py
-# -> __file__.resolve().parents[2] takes us back to: src/
-SRC_DIR = Path(__file__).resolve().parents[2]
-
-# Centralize commonly used directories under src/
-DATA_INPUT_DIR = (SRC_DIR / "data" / "input").resolve()   # <-- changed: single source of truth for input dir
-OUTPUT_DIR = DATA_INPUT_DIR                                # <-- changed: write outputs next to inputs
+# All locations come from src/configs/paths.py (single source of truth)
+DATA_INPUT_DIR = INPUT_DIR
+OUTPUT_DIR = DATA_INPUT_DIR  # write outputs next to inputs
 
-# Use Path objects for files that live under data/input/
-INPUT_CSV_FILENAME = "twitter_dataset.csv"  # change if your CSV name differs
-INPUT_CSV_PATH = (DATA_INPUT_DIR / INPUT_CSV_FILENAME).resolve()  # build absolute path safely
+INPUT_CSV_PATH = TWITTER_CSV_PATH
+INPUT_CSV_FILENAME = INPUT_CSV_PATH.name
 
 TEXT_COLUMN: str = "Text"  # change if your CSV uses a different column name
 
-# Trend list is stored in src/data/input/flat_trends_list.json
-TREND_LIST_PATH = (DATA_INPUT_DIR / "flat_trends_list.json").resolve()
+# Rows per pandas chunk; bounds memory for multi-GB exports
+CHUNK_SIZE: int = 50_000
+
+# ".json" writes an indent=2 array; ".jsonl" streams one record per line
+OUTPUT_SUFFIX: str = ".json"
 
 # -----------------------------------------------------------------------------
 # Utility functions
 # -----------------------------------------------------------------------------
 
-def clean_text(text: str) -> str:
-    text = str(text).lower()
-    text = re.sub(r"http\S+|www\S+", "", text)   # remove URLs
-    text = re.sub(r"@\w+", "", text)             # remove @mentions
-    text = re.sub(r"#(\w+)", r"\1", text)        # keep hashtag word, drop '#'
-    text = re.sub(r"[^a-z0-9\s]", "", text)      # remove non-alphanumerics (incl. emojis/punct)
-    text = re.sub(r"\s+", " ", text).strip()     # normalize spaces
-    return text
+def clean_series(texts: "pd.Series") -> List[str]:
+    """Clean a whole column (no per-row DataFrame access)."""
+    return clean_texts(texts)
 
 
 def parse_trend_list(file_path: Path) -> List[str]:
@@ -79,6 +76,57 @@ def assign_trend(text: str, trends: List[str]) -> str:
     return best_trend if best_trend is not None else "unknown"
 
 
+class TrendIndex:
+    """
+    Inverted index (token -> trend postings) over a trend list.
+
+    Built once from `parse_trend_list` and reused for every post, so overlap
+    counts are only accumulated for trends that share at least one token with
+    the post instead of scanning the whole list. Ties resolve to the earliest
+    trend in the list, exactly like `assign_trend`.
+    """
+
+    def __init__(self, trends: List[str]):
+        self.trends = list(trends)
+        self.postings: Dict[str, List[int]] = {}
+        for idx, trend in enumerate(self.trends):
+            for token in set(trend.split()):
+                self.postings.setdefault(token, []).append(idx)
+
+    def match(self, text: str) -> str:
+        counts: Dict[int, int] = {}
+        for token in set(text.split()):
+            for idx in self.postings.get(token, ()):
+                counts[idx] = counts.get(idx, 0) + 1
+        if not counts:
+            return "unknown"
+        # Highest overlap wins; on equal overlap the first trend in the list wins
+        best_idx = min(counts, key=lambda idx: (-counts[idx], idx))
+        return self.trends[best_idx]
+
+
+def iter_processed_chunks(
+    csv_path: Path,
+    trend_index: TrendIndex,
+    chunksize: int = CHUNK_SIZE,
+) -> Iterator[List[dict]]:
+    """Stream the CSV (text column only) and yield cleaned, trend-tagged posts chunk by chunk."""
+    import pandas as pd  # imported lazily to keep module import cheap
+
+    header = pd.read_csv(csv_path, nrows=0)
+    if TEXT_COLUMN not in header.columns:
+        raise ValueError(
+            f"CSV is missing expected text column '{TEXT_COLUMN}'. "
+            f"Available columns: {list(header.columns)}"
+        )
+
+    for chunk in pd.read_csv(csv_path, usecols=[TEXT_COLUMN], chunksize=chunksize):
+        yield [
+            {"trend": trend_index.match(cleaned), "text": cleaned}
+            for cleaned in clean_series(chunk[TEXT_COLUMN])
+        ]
+
+
 # -----------------------------------------------------------------------------
 # Main processing
 # -----------------------------------------------------------------------------
@@ -95,28 +143,17 @@ def main() -> None:
     if not trends:
         raise ValueError("No trend titles found; cannot assign trends")
 
-    # --- Read CSV and validate column name ---
-    df = pd.read_csv(INPUT_CSV_PATH)
-    if TEXT_COLUMN not in df.columns:
-        raise ValueError(
-            f"CSV is missing expected text column '{TEXT_COLUMN}'. "
-            f"Available columns: {list(df.columns)}"
-        )
-
-    # --- Process rows ---
-    processed_posts = []
-    for _, row in df.iterrows():
-        cleaned = clean_text(row[TEXT_COLUMN])
-        trend = assign_trend(cleaned, trends)
-        processed_posts.append({"trend": trend, "text": cleaned})
-
-    # --- Write output next to input data ---
+    # --- Stream CSV chunks straight into the output file ---
+    trend_index = TrendIndex(trends)
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)  #ensure dir exists
-    output_file = (OUTPUT_DIR / f"{Path(INPUT_CSV_FILENAME).stem}.json").resolve()
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(processed_posts, f, ensure_ascii=False, indent=2)
+    output_file = (OUTPUT_DIR / f"{Path(INPUT_CSV_FILENAME).stem}{OUTPUT_SUFFIX}").resolve()
+
+    with RecordWriter(output_file) as writer:
+        for posts in iter_processed_chunks(INPUT_CSV_PATH, trend_index):
+            writer.write_all(posts)
+    total = writer.count
 
-    print(f"✅ Processed {len(processed_posts)} posts.")
+    print(f"✅ Processed {total} posts.")
     print(f"💾 Output saved to: {output_file}")
 
 
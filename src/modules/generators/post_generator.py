@@ -1,17 +1,40 @@
 import json
-from typing import List
-from src.configs.conf import API_KEY_OAI
+import re
+from typing import AsyncIterator, List, Optional
+from src.configs.conf import get_api_key
 from src.configs.model_selector import get_model_and_params
 from src.schemas.generated_post import GeneratedPost
+from src.utils.concurrency import merge
 from src.utils.llm_client import LLMClient
+from src.utils.llm_parser import JSONStringArrayStream
+
+
+# Larger requests are split into parallel sub-requests of at most this many posts
+MAX_POSTS_PER_REQUEST = 10
+# Extra rounds asked for when de-duplication leaves a trend short of num_posts
+MAX_TOP_UP_ROUNDS = 2
+# Each sub-request gets its own voice so parallel requests paraphrase each other less
+PERSPECTIVES = [
+    "a local resident", "a university student", "a worried parent", "a small business owner",
+    "an activist", "a sceptic", "a healthcare worker", "a retiree", "a teacher", "a recent graduate",
+]
+
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def _dedup_key(text: str) -> str:
+    # Unicode-aware: posts in any script keep a key (ASCII folding is left to the cleaner)
+    return " ".join(_NON_WORD.sub("", text.lower()).split())
 
 
 class PostGenerator:
     def __init__(self):
         self.model_name, self.model_params = get_model_and_params("generation")
-        self.client = LLMClient(model=self.model_name, api_key=API_KEY_OAI)
+        self.client = LLMClient(model=self.model_name, api_key=get_api_key())
 
-    async def generate_posts_for_trend(self, trend: str, num_posts: int = 10) -> List[GeneratedPost]:
+    @staticmethod
+    def build_prompt(trend: str, num_posts: int, perspective: Optional[str] = None) -> str:
         prompt = (
             f"You are an expert social media observer and simulator.\n\n"
             f"Generate {num_posts} realistic, diverse, concise, and emotionally expressive social media posts "
@@ -24,8 +47,12 @@ class PostGenerator:
             f"- DO NOT number or label the posts.\n"
             f"- Return the result as a **JSON list of strings**.\n"
         )
+        if perspective:
+            prompt += f"- Write every post from the point of view of {perspective}.\n"
+        return prompt
 
-        raw_response = await self.client.call(prompt=prompt, **self.model_params)
+    @staticmethod
+    def _to_posts(raw_response, trend: str) -> List[GeneratedPost]:
         # Expecting LLM to return a list of strings (posts)
         if isinstance(raw_response, list):
             return [GeneratedPost(trend=trend, text=post) for post in raw_response]
@@ -35,6 +62,70 @@ class PostGenerator:
         else:
             raise ValueError("Unexpected format in LLM response while generating posts.")
 
+    async def _stream_request(
+        self, trend: str, num_posts: int, perspective: Optional[str] = None
+    ) -> AsyncIterator[GeneratedPost]:
+        """One request; each post is yielded as soon as its JSON string element closes."""
+        parser = JSONStringArrayStream()
+        parts = []
+        emitted = 0
+        prompt = self.build_prompt(trend, num_posts, perspective)
+        async for delta in self.client.stream(prompt=prompt, **self.model_params):
+            parts.append(delta)
+            for text in parser.feed(delta):
+                emitted += 1
+                yield GeneratedPost(trend=trend, text=text)
+        if not emitted:
+            # Not a JSON list after all: same fallbacks as for a non-streamed answer
+            for post in self._to_posts(LLMClient._parse_content("".join(parts)), trend):
+                yield post
+
+    async def stream_posts_for_trend(self, trend: str, num_posts: int = 10) -> AsyncIterator[GeneratedPost]:
+        """
+        Yield up to `num_posts` posts for `trend` while the model is still writing
+        them. More than MAX_POSTS_PER_REQUEST are requested as parallel
+        sub-requests (one perspective each) whose streams are merged;
+        near-identical posts across them are dropped and the shortfall is
+        re-requested.
+        """
+        if num_posts <= MAX_POSTS_PER_REQUEST:
+            async for post in self._stream_request(trend, num_posts):
+                yield post
+            return
+
+        seen = set()
+        errors = []
+        emitted = 0
+        n_requests = 0
+        for _ in range(1 + MAX_TOP_UP_ROUNDS):
+            missing = num_posts - emitted
+            if missing <= 0:
+                break
+            sizes = [MAX_POSTS_PER_REQUEST] * (missing // MAX_POSTS_PER_REQUEST)
+            if missing % MAX_POSTS_PER_REQUEST:
+                sizes.append(missing % MAX_POSTS_PER_REQUEST)
+            streams = [
+                self._stream_request(trend, size, PERSPECTIVES[(n_requests + i) % len(PERSPECTIVES)])
+                for i, size in enumerate(sizes)
+            ]
+            n_requests += len(sizes)
+            async for result in merge(streams, return_exceptions=True):
+                if isinstance(result, Exception):
+                    errors.append(result)
+                    continue
+                key = _dedup_key(result.text)
+                if key and key not in seen and emitted < num_posts:
+                    seen.add(key)
+                    emitted += 1
+                    yield result
+
+        if not emitted and errors:
+            raise errors[0]
+
+    async def generate_posts_for_trend(self, trend: str, num_posts: int = 10) -> List[GeneratedPost]:
+        """All posts of `stream_posts_for_trend`, in arrival order."""
+        return [post async for post in self.stream_posts_for_trend(trend, num_posts)]
+
     @staticmethod
     def _try_parse_response(raw_response: str, trend: str) -> List[GeneratedPost]:
         try:
@@ -1,94 +1,360 @@
-from src.configs.conf import API_KEY_OAI
+import asyncio
+from src.configs.conf import get_api_key
 from src.mappers.tone_templates import get_emotion_template
 from src.mappers.sdg_link_mapper import get_sdg_link
 from src.utils.llm_client import LLMClient
 from src.configs.model_selector import get_model_and_params
 from collections import Counter
-from typing import List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
 from src.schemas.models import Post, ResponseForTrend
 from src.schemas.response import Response
 
+if TYPE_CHECKING:
+    from src.modules.responders.response_cache import ResponseCache
+
+
+class TrendStats:
+    """SDG counts and per-SDG emotion counts for one trend."""
+
+    __slots__ = ("sdg_counts", "emotions_by_sdg")
+
+    def __init__(self):
+        self.sdg_counts: Counter = Counter()
+        self.emotions_by_sdg: Dict[str, Counter] = {}
 
-def extract_trends(posts: List[Post]) -> List[str]:
-    """Extract unique trends from the dataset."""
-    trends = set()
-    for post in posts:
-        trends.add(post.trend.strip().lower())
-    return list(trends)
+
+def build_trend_index(posts: List[Post]) -> Dict[str, TrendStats]:
+    """
+    Single pass over the dataset: normalized trend -> SDG counter and
+    SDG -> emotion counter. Counters are filled in post order, so ties in
+    `most_common` resolve exactly as when each trend's posts are rescanned.
+    """
+    index: Dict[str, TrendStats] = {}
+    update_trend_index(index, posts)
+    return index
 
 
-def get_top_k_sdgs(posts: List[Post], k: int) -> List[str]:
-    """Count SDGs across posts and return top-k most frequent ones."""
-    sdg_counts = Counter()
+def update_trend_index(index: Dict[str, TrendStats], posts: Iterable[Post]) -> List[str]:
+    """
+    Add `posts` to an existing index in place and return the normalized trends
+    they touched (in order of first appearance). Merging batches one after the
+    other gives the same index, ties included, as building it over all of them.
+    """
+    touched: Dict[str, None] = {}
     for post in posts:
+        key = post.trend.strip().lower()
+        touched[key] = None
+        stats = index.get(key)
+        if stats is None:
+            stats = index[key] = TrendStats()
         if post.sdg:
-            for sdg in post.sdg:
-                sdg_counts[sdg] += 1
+            stats.sdg_counts.update(post.sdg)
+            if post.emotion:
+                for sdg in dict.fromkeys(post.sdg):
+                    emotions = stats.emotions_by_sdg.get(sdg)
+                    if emotions is None:
+                        emotions = stats.emotions_by_sdg[sdg] = Counter()
+                    emotions[post.emotion] += 1
+    return list(touched)
+
+
+def extract_trends(posts: List[Post]) -> List[str]:
+    """Extract unique trends from the dataset (in order of first appearance)."""
+    return list(dict.fromkeys(post.trend.strip().lower() for post in posts))
+
+
+def get_top_k_sdgs(posts: Union[List[Post], Counter], k: int) -> List[str]:
+    """Count SDGs across posts (or take a prebuilt SDG counter) and return top-k most frequent ones."""
+    if isinstance(posts, Counter):
+        sdg_counts = posts
+    else:
+        sdg_counts = Counter()
+        for post in posts:
+            if post.sdg:
+                for sdg in post.sdg:
+                    sdg_counts[sdg] += 1
     return [sdg for sdg, _ in sdg_counts.most_common(k)]
 
 
-def get_dominant_emotion(posts: List[Post]) -> Optional[str]:
-    """Get the most common emotion among a list of posts."""
-    emotion_counts = Counter(post.emotion for post in posts if post.emotion)
+def get_dominant_emotion(posts: Union[List[Post], Counter]) -> Optional[str]:
+    """Get the most common emotion among a list of posts (or from a prebuilt emotion counter)."""
+    if isinstance(posts, Counter):
+        emotion_counts = posts
+    else:
+        emotion_counts = Counter(post.emotion for post in posts if post.emotion)
     if emotion_counts:
         return emotion_counts.most_common(1)[0][0]
     return None
 
 
+# Max (trend, SDG) responses requested from the LLM at the same time
+RESPONSE_CONCURRENCY = 16
+
+EMOTIONAL_SUPPORT_EMOTIONS = ["Fear", "Anxiety", "Sadness", "Confusion"]
+
+# Message of a response whose generation failed; such responses are never reused or cached
+FAILED_RESPONSE_MESSAGE = "Sorry, something went wrong generating a response."
+
+
+def is_failed_response(response: Response) -> bool:
+    return response.message == FAILED_RESPONSE_MESSAGE
+
+
+def _plan_responses(
+    data: Union[List[Post], Dict[str, TrendStats]],
+    trends: Optional[List[str]],
+    top_k_sdgs: int
+) -> List[Tuple[str, str, str]]:
+    """Work out every (trend, sdg, dominant emotion) that needs a response (from posts or a prebuilt index)."""
+    plan = []
+    index = data if isinstance(data, dict) else build_trend_index(data)
+    selected_trends = trends or list(index)
+
+    for trend in selected_trends:
+        stats = index.get(trend.strip().lower())
+        if stats is None:
+            continue
+
+        top_sdgs = get_top_k_sdgs(stats.sdg_counts, top_k_sdgs)
+        for sdg in top_sdgs:
+            dominant_emotion = get_dominant_emotion(stats.emotions_by_sdg.get(sdg, Counter()))
+            if not dominant_emotion:
+                continue
+            plan.append((trend, sdg, dominant_emotion))
+
+    return plan
+
+
+def _reusable(previous: Optional[Iterable[ResponseForTrend]]) -> Dict[Tuple[str, str, str], ResponseForTrend]:
+    """Previous successful responses by (normalized trend, sdg, emotion); failed ones are generated again."""
+    return {
+        (item.trend.strip().lower(), item.sdg, item.emotion): item
+        for item in previous or ()
+        if not is_failed_response(item.response)
+    }
+
+
 def generate_responses_batch(
-    data: List[Post],
+    data: Union[List[Post], Dict[str, TrendStats]],
     trends: Optional[List[str]] = None,
     top_k_sdgs: int = 1,
-    use_llm: bool = True
+    use_llm: bool = True,
+    previous: Optional[Iterable[ResponseForTrend]] = None,
+    cache: Optional["ResponseCache"] = None
 ) -> List[ResponseForTrend]:
     """
     Generates supportive responses per trend for top-k SDGs.
 
     Parameters:
-    - data: Full dataset already parsed into Post objects.
+    - data: Full dataset already parsed into Post objects, or a trend index
+      from `build_trend_index` / `update_trend_index`.
     - trends: Optional list of trends to process. If None, extract from data.
     - top_k_sdgs: Number of top SDGs to generate responses for per trend.
     - use_llm: Whether to use LLM or fallback template-based response.
+    - previous: Optional earlier responses; one whose trend, SDG and dominant
+      emotion are unchanged is returned as is instead of being regenerated.
+    - cache: Optional ResponseCache consulted before every LLM request.
 
     Returns:
     - List of ResponseForTrend objects (validated with Pydantic).
     """
-    result = []
-    selected_trends = trends or extract_trends(data)
+    if use_llm:
+        # LLM requests run concurrently over one pooled client
+        return asyncio.run(
+            generate_responses_batch_async(data, trends, top_k_sdgs, use_llm=True, previous=previous, cache=cache)
+        )
 
-    for trend in selected_trends:
-        trend_posts = [p for p in data if p.trend.strip().lower() == trend.strip().lower()]
-        if not trend_posts:
-            continue
+    reusable = _reusable(previous)
+    return [
+        reusable.get((trend.strip().lower(), sdg, emotion)) or ResponseForTrend(
+            trend=trend,
+            sdg=sdg,
+            emotion=emotion,
+            response=generate_supportive_response(sdg=sdg, emotion=emotion, trends=[trend], use_llm=False)
+        )
+        for trend, sdg, emotion in _plan_responses(data, trends, top_k_sdgs)
+    ]
 
-        top_sdgs = get_top_k_sdgs(trend_posts, top_k_sdgs)
-        for sdg in top_sdgs:
-            sdg_posts = [p for p in trend_posts if sdg in p.sdg]
-            dominant_emotion = get_dominant_emotion(sdg_posts)
-            if not dominant_emotion:
-                continue
 
-            response = generate_supportive_response(
+async def generate_responses_batch_async(
+    data: Union[List[Post], Dict[str, TrendStats]],
+    trends: Optional[List[str]] = None,
+    top_k_sdgs: int = 1,
+    use_llm: bool = True,
+    max_concurrency: int = RESPONSE_CONCURRENCY,
+    previous: Optional[Iterable[ResponseForTrend]] = None,
+    cache: Optional["ResponseCache"] = None
+) -> List[ResponseForTrend]:
+    """
+    Async version of `generate_responses_batch`: one shared LLMClient, with up to
+    `max_concurrency` (trend, SDG) requests in flight. Results keep the same order.
+    """
+    plan = _plan_responses(data, trends, top_k_sdgs)
+    reusable = _reusable(previous)
+    client = _build_response_client() if use_llm and any(
+        (trend.strip().lower(), sdg, emotion) not in reusable for trend, sdg, emotion in plan
+    ) else None
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def respond(trend: str, sdg: str, emotion: str) -> ResponseForTrend:
+        reused = reusable.get((trend.strip().lower(), sdg, emotion))
+        if reused is not None:
+            return reused
+        async with sem:
+            response = await generate_supportive_response_async(
                 sdg=sdg,
-                emotion=dominant_emotion,
+                emotion=emotion,
                 trends=[trend],
-                use_llm=use_llm
+                use_llm=use_llm,
+                client=client,
+                cache=cache
             )
+        return ResponseForTrend(trend=trend, sdg=sdg, emotion=emotion, response=response)
 
-            result.append(ResponseForTrend(
-                trend=trend,
-                sdg=sdg,
-                emotion=dominant_emotion,
-                response=response
-            ))
+    try:
+        return list(await asyncio.gather(*(respond(*item) for item in plan)))
+    finally:
+        if client is not None:
+            await client.close()
+
+
+def _build_response_client() -> LLMClient:
+    model_name, _ = get_model_and_params("response_generation")
+    return LLMClient(model=model_name, api_key=get_api_key())
+
+
+def _response_type(emotion: str) -> str:
+    return "emotional_support" if emotion in EMOTIONAL_SUPPORT_EMOTIONS else "motivational"
+
+
+def build_response_prompt(sdg: str, emotion: str, trends_text: str) -> str:
+    return (
+        f"You are a supportive assistant helping users cope with emotional reactions to social trends.\n"
+        f"Users are feeling {emotion.lower()} in response to topics like: {trends_text}.\n"
+        f"The context is related to the Sustainable Development Goal: '{sdg}'.\n"
+        f"Craft a short, empathetic message that either provides emotional support, helpful information, or reassurance—"
+        f"whichever is most appropriate for someone experiencing {emotion.lower()}.\n"
+        f"Your tone should always be human, kind, and appropriate to the emotion."
+        f"The message should be helpful, actionable, or emotionally supportive, based on the user's emotional needs.\n"
+
+    )
+
+
+async def generate_supportive_response_async(
+    sdg: str,
+    emotion: str,
+    trends: List[str],
+    use_llm: bool = True,
+    client: Optional[LLMClient] = None,
+    cache: Optional["ResponseCache"] = None
+) -> Response:
+    """
+    Async counterpart of `generate_supportive_response`. Pass a shared `client`
+    to reuse its connection pool; otherwise a temporary one is created and closed.
+    With a `cache`, a cached response is returned without calling the LLM and
+    a successfully generated one is stored.
+    """
+    if not use_llm:
+        return generate_supportive_response(sdg=sdg, emotion=emotion, trends=trends, use_llm=False)
+    if cache is not None:
+        cached = cache.get(sdg, emotion, trends)
+        if cached is not None:
+            return cached
+
+    sdg_link = get_sdg_link(sdg)
+    trends_text = ", ".join(trends[:2]) if trends else "recent trends"
+    prompt = build_response_prompt(sdg, emotion, trends_text)
+
+    _, params = get_model_and_params("response_generation")
+    owns_client = client is None
+    if owns_client:
+        client = _build_response_client()
+    failed = False
+    try:
+        response_text = (await client.call(prompt=prompt, **params)).strip()
+    except Exception:
+        response_text = FAILED_RESPONSE_MESSAGE
+        failed = True
+    finally:
+        if owns_client:
+            await client.close()
+
+    response = Response(
+        message=response_text,
+        type=_response_type(emotion),
+        sdg_link=sdg_link
+    )
+    if cache is not None and not failed:
+        cache.set(sdg, emotion, trends, response)
+    return response
+
+
+async def stream_supportive_response(
+    sdg: str,
+    emotion: str,
+    trends: List[str],
+    use_llm: bool = True,
+    client: Optional[LLMClient] = None,
+    cache: Optional["ResponseCache"] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of `generate_supportive_response_async` for live
+    display: yields the message text piece by piece as the model writes it,
+    so the first words show up long before the full response is done. Join
+    the pieces for the final `Response.message`; type and link come from
+    `_response_type` / `get_sdg_link` as usual. A `cache` hit is yielded in
+    one piece; a completed stream is stored in the cache. A failure before
+    any text yields the usual apology; one after it raises (typically
+    StreamInterruptedError), so truncated text is never passed off as whole.
+    """
+    if not use_llm:
+        yield generate_supportive_response(sdg=sdg, emotion=emotion, trends=trends, use_llm=False).message
+        return
+    if cache is not None:
+        cached = cache.get(sdg, emotion, trends)
+        if cached is not None:
+            yield cached.message
+            return
+
+    trends_text = ", ".join(trends[:2]) if trends else "recent trends"
+    prompt = build_response_prompt(sdg, emotion, trends_text)
+
+    _, params = get_model_and_params("response_generation")
+    owns_client = client is None
+    if owns_client:
+        client = _build_response_client()
+    started = False
+    pieces = []
+    try:
+        async for delta in client.stream(prompt=prompt, **params):
+            if not started:
+                delta = delta.lstrip()  # like the stripped non-streamed message
+                started = bool(delta)
+            if delta:
+                pieces.append(delta)
+                yield delta
+    except Exception:
+        if started:
+            raise  # part of the message is out already: the caller must learn it is incomplete
+        pieces = None
+        yield FAILED_RESPONSE_MESSAGE
+    finally:
+        if owns_client:
+            await client.close()
+    if cache is not None and pieces:
+        cache.set(sdg, emotion, trends, Response(
+            message="".join(pieces).strip(),
+            type=_response_type(emotion),
+            sdg_link=get_sdg_link(sdg)
+        ))
 
-    return result
 
 def generate_supportive_response(
     sdg: str,
     emotion: str,
     trends: List[str],
-    use_llm: bool = False
+    use_llm: bool = False,
+    cache: Optional["ResponseCache"] = None
 ) -> Response:
     """
     Generate a supportive message based on sdg, emotion, and trend context.
@@ -99,30 +365,9 @@ def generate_supportive_response(
     trends_text = ", ".join(trends[:2]) if trends else "recent trends"
 
     if use_llm:
-        # 🔹 Use LLM model
-        prompt = (
-            f"You are a supportive assistant helping users cope with emotional reactions to social trends.\n"
-            f"Users are feeling {emotion.lower()} in response to topics like: {trends_text}.\n"
-            f"The context is related to the Sustainable Development Goal: '{sdg}'.\n"
-            f"Craft a short, empathetic message that either provides emotional support, helpful information, or reassurance—"
-            f"whichever is most appropriate for someone experiencing {emotion.lower()}.\n"
-            f"Your tone should always be human, kind, and appropriate to the emotion."
-            f"The message should be helpful, actionable, or emotionally supportive, based on the user's emotional needs.\n"
-
-        )
-
-        model_name, params = get_model_and_params("response_generation")
-        client = LLMClient(model=model_name,api_key=API_KEY_OAI)
-        try:
-            response_text = client.call_sync(prompt=prompt, **params).strip()
-        except Exception as e:
-            response_text = "Sorry, something went wrong generating a response."
-        response_type = "emotional_support" if emotion in ["Fear", "Anxiety", "Sadness", "Confusion"] else "motivational"
-
-        return Response(
-            message=response_text,
-            type=response_type,
-            sdg_link=sdg_link
+        # 🔹 Use LLM model (sync wrapper; prefer the async version inside an event loop)
+        return asyncio.run(
+            generate_supportive_response_async(sdg=sdg, emotion=emotion, trends=trends, use_llm=True, cache=cache)
         )
 
     else:
@@ -136,11 +381,8 @@ def generate_supportive_response(
             f"Explore ways to contribute or learn more here: {sdg_link if sdg_link else 'https://sdgs.un.org'}"
         )
 
-        response_type = "emotional_support" if emotion in ["Fear", "Anxiety", "Sadness", "Confusion"] else "motivational"
-
         return Response(
             message=message,
-            type=response_type,
+            type=_response_type(emotion),
             sdg_link=sdg_link
         )
-
@@ -0,0 +1,209 @@
+"""
+response_cache.py
+Memoized supportive responses, keyed by (SDG, emotion, trends).
+
+The response space is small: 17 SDGs x 9 emotions, with the trend text as the
+only free variable. How much of that variable goes into the key is chosen with
+`key_mode`:
+- "exact": the trend text exactly as it goes into the prompt,
+- "trend": the normalized (clean_text), de-duplicated and sorted trends,
+- "sdg_emotion": no trends at all, one response per SDG x emotion.
+
+Responses generated without trends ("recent trends") are stored under the
+generic SDG x emotion key, which is the same in every mode. With
+`fallback_to_generic` a miss on the finer key is served from that generic
+entry, so once `run_warm_response_cache` has filled all 153 combinations the
+serving path practically never waits for the LLM.
+
+Entries live in an in-memory LRU of `max_entries`, written through to SQLite
+so they survive restarts; hits only touch memory, and the access order is
+written back on `flush` / `close`.
+
+Set RESPONSE_CACHE_DISABLED=1 (or pass enabled=False) to bypass the cache.
+"""
+
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.configs.paths import RESPONSE_CACHE_PATH
+from src.schemas.response import Response
+from src.utils.metrics import metrics
+from src.utils.text_normalizer import clean_text
+
+KEY_MODES = ("exact", "trend", "sdg_emotion")
+DEFAULT_KEY_MODE = "trend"
+DEFAULT_MAX_ENTRIES = 50_000
+MAX_PROMPT_TRENDS = 2  # the response prompt only mentions the first two trends
+
+
+def response_key(sdg: str, emotion: str, trends: Optional[List[str]], key_mode: str = DEFAULT_KEY_MODE) -> str:
+    """Cache key of a response; without trends it is the generic SDG x emotion key in every mode."""
+    if key_mode not in KEY_MODES:
+        raise ValueError(f"Unknown response cache key_mode '{key_mode}', expected one of {KEY_MODES}")
+    trends = list(trends or [])[:MAX_PROMPT_TRENDS]
+    if key_mode == "sdg_emotion" or not trends:
+        trends_part = ""
+    elif key_mode == "exact":
+        trends_part = ", ".join(trends)
+    else:
+        trends_part = "\x1e".join(sorted({clean_text(trend) for trend in trends}))
+    return f"{sdg}\x1f{emotion}\x1f{trends_part}"
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: Path = RESPONSE_CACHE_PATH,
+        key_mode: str = DEFAULT_KEY_MODE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        fallback_to_generic: bool = True,
+        enabled: Optional[bool] = None,
+    ):
+        if key_mode not in KEY_MODES:
+            raise ValueError(f"Unknown response cache key_mode '{key_mode}', expected one of {KEY_MODES}")
+        self.path = Path(path)
+        self.key_mode = key_mode
+        self.max_entries = max_entries
+        self.fallback_to_generic = fallback_to_generic
+        if enabled is None:
+            enabled = os.getenv("RESPONSE_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self.hits = 0
+        self.generic_hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._entries: "OrderedDict[str, Response]" = OrderedDict()  # least recently used first
+        self._accessed: Dict[str, float] = {}  # key -> last hit time, not yet persisted
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT key, response FROM (SELECT * FROM responses ORDER BY last_access DESC LIMIT ?)"
+                " ORDER BY last_access ASC",
+                (self.max_entries,),
+            ).fetchall()
+            for key, response in rows:
+                self._entries[key] = Response.model_validate_json(response)
+        return self._conn
+
+    def key(self, sdg: str, emotion: str, trends: Optional[List[str]]) -> str:
+        return response_key(sdg, emotion, trends, self.key_mode)
+
+    def _touch(self, key: str) -> Optional[Response]:
+        response = self._entries.get(key)
+        if response is not None:
+            self._entries.move_to_end(key)
+            self._accessed[key] = time.time()
+        return response
+
+    def get(self, sdg: str, emotion: str, trends: Optional[List[str]]) -> Optional[Response]:
+        if not self.enabled:
+            return None
+        self._connect()
+        response = self._touch(self.key(sdg, emotion, trends))
+        if response is not None:
+            self.hits += 1
+            metrics.inc("response_cache_lookups_total", result="hit")
+            return response
+        if self.fallback_to_generic:
+            response = self._touch(response_key(sdg, emotion, None))
+            if response is not None:
+                self.generic_hits += 1
+                metrics.inc("response_cache_lookups_total", result="generic")
+                return response
+        self.misses += 1
+        metrics.inc("response_cache_lookups_total", result="miss")
+        return None
+
+    def set(self, sdg: str, emotion: str, trends: Optional[List[str]], response: Response) -> None:
+        if not self.enabled:
+            return
+        conn = self._connect()
+        key = self.key(sdg, emotion, trends)
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        self._accessed.pop(key, None)
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, last_access) VALUES (?, ?, ?)",
+            (key, response.model_dump_json(), time.time()),
+        )
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._accessed.pop(old_key, None)
+            evicted.append((old_key,))
+        if evicted:
+            conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        conn.commit()
+
+    def contains(self, sdg: str, emotion: str, trends: Optional[List[str]] = None) -> bool:
+        """Whether the exact key is cached (no fallback, no LRU update)."""
+        if not self.enabled:
+            return False
+        self._connect()
+        return self.key(sdg, emotion, trends) in self._entries
+
+    def flush(self) -> None:
+        """Persist the access order of entries that were hit since the last flush."""
+        if self._conn is None or not self._accessed:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET last_access = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()],
+        )
+        self._conn.commit()
+        self._accessed.clear()
+
+    def clear(self) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+        self._entries.clear()
+        self._accessed.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.generic_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "key_mode": self.key_mode,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "generic_hits": self.generic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.generic_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+            self._entries.clear()
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_default_response_cache() -> ResponseCache:
+    """Process-wide response cache (default key mode) for callers that opt in."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
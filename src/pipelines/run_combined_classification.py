@@ -0,0 +1,99 @@
+"""
+Single-pass pipeline: cleaned posts -> SDG + emotion in one LLM call per batch
+-> emotion output (same records as run_sdg_classification + run_emotion_detection).
+"""
+
+import asyncio
+import time
+from typing import List
+from tqdm import tqdm
+from src.configs.paths import (
+    CLEANED_POSTS_PATH,
+    COMBINED_CHECKPOINT_PATH,
+    COMBINED_FAILED_PATH,
+    EMOTION_OUTPUT_PATH,
+    LOGS_DIR,
+    NEAR_DUPLICATES_PATH,
+)
+from src.modules.classifiers.combined_classifier import PROMPT_HEADER, CombinedClassifier
+from src.utils.checkpoint import Checkpoint, fingerprint
+from src.utils.concurrency import batched, map_ordered
+from src.utils.metrics import metrics
+from src.utils.near_duplicates import propagate_labels
+from src.utils.record_io import RecordWriter, aiter_records
+
+
+# Suffix picks the format: ".jsonl" streams one record per line, ".json" writes an array
+INPUT_PATH = CLEANED_POSTS_PATH
+OUTPUT_PATH = EMOTION_OUTPUT_PATH
+FAILED_PATH = COMBINED_FAILED_PATH
+CHECKPOINT_PATH = COMBINED_CHECKPOINT_PATH
+METRICS_PATH = LOGS_DIR / "combined_metrics"  # -> .json + .prom
+N_PARALLEL = None  # None: as many in flight as the model's scheduler may ever admit
+FOLLOW_INPUT = False  # tail a .jsonl input while the upstream stage is still writing it
+RESUME = True  # skip posts already classified in CHECKPOINT_PATH (with the same settings); False starts from scratch
+BATCH_SIZE = 10  # posts packed into one prompt; 1 sends one request per post
+# Give the cleaner's near duplicates (NEAR_DUPLICATES_PATH) their representative's labels; False leaves them out
+PROPAGATE_NEAR_DUPLICATES = True
+
+
+async def classify_batch(classifier: CombinedClassifier, checkpoint: Checkpoint, posts: List[dict]) -> List[dict]:
+    records = [checkpoint.get(post) for post in posts]
+    pending = [i for i, record in enumerate(records) if record is None]
+
+    results = await classifier.classify_batch([posts[i] for i in pending])
+    for i, result in zip(pending, results):
+        post = posts[i]
+        if result:
+            records[i] = result.model_dump()
+            checkpoint.add(post, records[i])  # failed posts are retried on resume
+        else:
+            records[i] = {"trend": post["trend"], "text": post["text"], "sdg": None, "emotion": None}
+    return records
+
+
+async def main():
+    print(f"📥 Loading posts from {INPUT_PATH}...")
+    start = time.perf_counter()
+    classifier = CombinedClassifier()
+    posts = aiter_records(INPUT_PATH, follow=FOLLOW_INPUT)
+
+    print("🔍 Classifying SDG + emotion in a single pass...")
+    settings = fingerprint(model=classifier.model_name, params=classifier.model_params, prompt=PROMPT_HEADER)
+    with Checkpoint(CHECKPOINT_PATH, resume=RESUME, fingerprint=settings) as checkpoint, \
+            RecordWriter(OUTPUT_PATH) as output, \
+            RecordWriter(FAILED_PATH) as failed, \
+            tqdm(unit="post") as progress:
+        if checkpoint.done:
+            print(f"♻️ Resuming: {len(checkpoint.done)} posts already classified")
+        n_parallel = N_PARALLEL or classifier.client.scheduler.max_concurrency
+        batches = batched(posts, BATCH_SIZE)
+
+        async def classified():
+            async for records in map_ordered(lambda batch: classify_batch(classifier, checkpoint, batch), batches, n_parallel):
+                for result in records:
+                    yield result
+
+        results = classified()
+        if PROPAGATE_NEAR_DUPLICATES:
+            results = propagate_labels(results, NEAR_DUPLICATES_PATH)
+        async for result in results:
+            if result["emotion"] is not None:
+                output.write(result)
+            else:
+                failed.write(result)
+            progress.update(1)
+
+    print(f"\n✅ {output.count} posts classified")
+    print(f"❌ {failed.count} posts failed to classify")
+    print(f"📁 Output saved to: {OUTPUT_PATH}")
+    print(f"📁 Failed saved to: {FAILED_PATH}")
+    print(f"🗄️ LLM cache: {classifier.client.cache.stats()}")
+    print(f"🚦 Scheduler: {classifier.client.scheduler.stats()}")
+    metrics.record_stage("combined", output.count + failed.count, time.perf_counter() - start)
+    metrics.report(METRICS_PATH)
+    await classifier.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
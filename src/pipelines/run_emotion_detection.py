@@ -1,9 +1,23 @@
-import json
 import asyncio
-from pathlib import Path
-from tqdm.asyncio import tqdm_asyncio
-from src.modules.classifiers.emotion_detector import detect_emotion
-from src.utils.utilities import load_json_data
+import time
+from typing import AsyncIterable, AsyncIterator, List
+from tqdm import tqdm
+from src.configs.paths import (
+    EMOTION_CHECKPOINT_PATH,
+    EMOTION_FAILED_PATH,
+    EMOTION_OUTPUT_PATH,
+    LOGS_DIR,
+    NEAR_DUPLICATES_PATH,
+    SDG_OUTPUT_PATH,
+)
+from src.modules.classifiers import emotion_detector
+from src.modules.classifiers.emotion_detector import detect_emotion_batch, get_client
+from src.modules.classifiers.local_classifier import EMOTION_MODEL_PATH, HashedLogisticRegression, TieredEmotionDetector
+from src.utils.checkpoint import Checkpoint, fingerprint
+from src.utils.concurrency import batched, map_ordered
+from src.utils.metrics import metrics
+from src.utils.near_duplicates import propagate_labels
+from src.utils.record_io import RecordWriter, aiter_records
 import logging
 
 
@@ -13,47 +27,98 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-INPUT_PATH = "../data/output/sdg_output.json"
-OUTPUT_PATH = "../data/output/emotion_output.json"
-FAILED_PATH = "../data/logs/emotion_failed.json"
-N_PARALLEL = 5
+# Suffix picks the format: ".jsonl" streams one record per line, ".json" writes an array
+INPUT_PATH = SDG_OUTPUT_PATH
+OUTPUT_PATH = EMOTION_OUTPUT_PATH
+FAILED_PATH = EMOTION_FAILED_PATH
+N_PARALLEL = None  # None: as many in flight as the model's scheduler may ever admit
+FOLLOW_INPUT = False  # tail a .jsonl input while the upstream stage is still writing it
+CHECKPOINT_PATH = EMOTION_CHECKPOINT_PATH
+METRICS_PATH = LOGS_DIR / "emotion_metrics"  # -> .json + .prom
+RESUME = True  # skip posts already labelled in CHECKPOINT_PATH (with the same settings); False starts from scratch
+BATCH_SIZE = 10  # posts packed into one prompt; 1 sends one request per post
+# e.g. 0.9: answer posts the local model is this confident about without the LLM
+# (train it first: python -m src.modules.classifiers.local_classifier); None disables the tier
+LOCAL_TIER_THRESHOLD = None
+# Give the cleaner's near duplicates (NEAR_DUPLICATES_PATH) their representative's labels; False leaves them out
+PROPAGATE_NEAR_DUPLICATES = True
 
-async def process_post(sem, post: dict):
-    async with sem:
-        result = await detect_emotion(post["text"])
+async def process_batch(detect_batch, checkpoint: Checkpoint, posts: List[dict]) -> List[dict]:
+    records = [checkpoint.get(post) for post in posts]
+    pending = [i for i, record in enumerate(records) if record is None]
+
+    results = await detect_batch([posts[i]["text"] for i in pending])
+    for i, result in zip(pending, results):
+        post = posts[i]
         if result:
             post["emotion"] = result.emotion
-            return post
+            checkpoint.add(post, post)  # failed posts are retried on resume
+            records[i] = post
         else:
-            return {"trend": post["trend"], "text": post["text"], "emotion": None}
-
-async def main():
-    print(f"📥 Loading posts from {INPUT_PATH}...")
-    data = load_json_data(INPUT_PATH)
-    print(f"🔍 Processing {len(data)} posts for emotion detection...")
+            records[i] = {"trend": post["trend"], "text": post["text"], "emotion": None}
+    return records
 
-    sem = asyncio.Semaphore(N_PARALLEL)
-    tasks = [process_post(sem, post) for post in data]
-    results = await tqdm_asyncio.gather(*tasks)
+def checkpoint_fingerprint() -> str:
+    """Records in CHECKPOINT_PATH are reused only for the same model, params, prompt and local tier."""
+    return fingerprint(
+        model=emotion_detector.model_name,
+        params=emotion_detector.model_params,
+        prompt=emotion_detector.build_batch_prompt(["{post}"]),
+        local_tier=LOCAL_TIER_THRESHOLD,
+    )
 
-    successful = [r for r in results if r["emotion"] is not None]
-    failed = [r for r in results if r["emotion"] is None]
+def build_detector():
+    """(batch detector, local tier or None)."""
+    if LOCAL_TIER_THRESHOLD is None:
+        return detect_emotion_batch, None
+    tier = TieredEmotionDetector(HashedLogisticRegression.load(EMOTION_MODEL_PATH), LOCAL_TIER_THRESHOLD)
+    return tier.detect_batch, tier
 
-    Path(OUTPUT_PATH).parent.mkdir(parents=True, exist_ok=True)
+async def detect_posts(detect_batch, checkpoint: Checkpoint, posts: AsyncIterable[dict]) -> AsyncIterator[dict]:
+    """Yield one record per input post, in input order (`emotion` is None for failures)."""
+    n_parallel = N_PARALLEL or get_client().scheduler.max_concurrency
+    batches = batched(posts, BATCH_SIZE)
+    async for records in map_ordered(lambda batch: process_batch(detect_batch, checkpoint, batch), batches, n_parallel):
+        for record in records:
+            yield record
 
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(successful, f, indent=2, ensure_ascii=False)
+async def main():
+    print(f"📥 Loading posts from {INPUT_PATH}...")
+    start = time.perf_counter()
+    posts = aiter_records(INPUT_PATH, follow=FOLLOW_INPUT)
+    print(f"🔍 Processing posts for emotion detection...")
+    detect_batch, tier = build_detector()
 
-    with open(FAILED_PATH, "w", encoding="utf-8") as f:
-        json.dump(failed, f, indent=2, ensure_ascii=False)
+    with Checkpoint(CHECKPOINT_PATH, resume=RESUME, fingerprint=checkpoint_fingerprint()) as checkpoint, \
+            RecordWriter(OUTPUT_PATH) as successful, \
+            RecordWriter(FAILED_PATH) as failed, \
+            tqdm(unit="post") as progress:
+        if checkpoint.done:
+            print(f"♻️ Resuming: {len(checkpoint.done)} posts already labelled")
+        results = detect_posts(detect_batch, checkpoint, posts)
+        if PROPAGATE_NEAR_DUPLICATES:
+            results = propagate_labels(results, NEAR_DUPLICATES_PATH)
+        async for result in results:
+            if result["emotion"] is not None:
+                successful.write(result)
+            else:
+                failed.write(result)
+            progress.update(1)
 
-    print(f"\n✅ {len(successful)} emotions detected")
-    print(f"❌ {len(failed)} posts failed to classify")
+    print(f"\n✅ {successful.count} emotions detected")
+    print(f"❌ {failed.count} posts failed to classify")
     print(f"📁 Output saved to: {OUTPUT_PATH}")
     print(f"📁 Failed saved to: {FAILED_PATH}")
 
+    if tier is not None:
+        print(f"🧮 Local tier: {tier.stats.report()}")
+
     # Close the client connection
-    from src.modules.classifiers.emotion_detector import client
+    client = get_client()
+    print(f"🗄️ LLM cache: {client.cache.stats()}")
+    print(f"🚦 Scheduler: {client.scheduler.stats()}")
+    metrics.record_stage("emotion", successful.count + failed.count, time.perf_counter() - start)
+    metrics.report(METRICS_PATH)
     await client.close()
 
 if __name__ == "__main__":
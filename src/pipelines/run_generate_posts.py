@@ -1,22 +1,50 @@
 import asyncio
-import json
-import os
-from pathlib import Path
-from typing import List, TextIO
+import time
+from typing import List
+from tqdm import tqdm
 from src.configs.model_selector import get_model_and_params
+from src.configs.paths import INPUT_DIR, LOGS_DIR, TREND_TITLES_PATH
+from src.utils.checkpoint import Checkpoint, fingerprint
+from src.utils.concurrency import map_ordered
+from src.utils.metrics import metrics
+from src.utils.record_io import RecordWriter
 from src.utils.utilities import load_json_data, preprocess_text_list
 
 from src.modules.generators.post_generator import PostGenerator
-from src.schemas.generated_post import GeneratedPost
 
 model_name, request_params= get_model_and_params("generation")
 
-# Update paths to use absolute paths
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-INPUT_PATH = os.path.join(BASE_DIR, "..", "data", "trend_titles.json")
-OUTPUT_PATH = os.path.join(BASE_DIR, "..", "data", f"generate_post_output_{model_name.split('/')[-1]}.json")
+INPUT_PATH = TREND_TITLES_PATH
+OUTPUT_SUFFIX = ".json"  # ".jsonl" streams posts to disk as each trend completes
+METRICS_PATH = LOGS_DIR / "generation_metrics"  # -> .json + .prom
+OUTPUT_PATH = INPUT_DIR / f"generate_post_output_{model_name.split('/')[-1]}{OUTPUT_SUFFIX}"
+POSTS_PER_TREND = 10  # above 10, split into parallel sub-requests with de-duplication
+N_PARALLEL = None  # trends in flight; None: as many as the model's scheduler may ever admit
+CHECKPOINT_PATH = LOGS_DIR / "generation_progress.jsonl"
+RESUME = True  # reuse trends already generated in CHECKPOINT_PATH (with the same settings); False starts from scratch
+
+
+async def generate_trend(generator: PostGenerator, checkpoint: Checkpoint, trend: str) -> List[dict]:
+    # The post count is part of the key, so changing POSTS_PER_TREND regenerates
+    key = {"trend": trend, "text": f"posts_per_trend={POSTS_PER_TREND}"}
+    done = checkpoint.get(key)
+    if done is not None:
+        return done["posts"]
+
+    try:
+        posts = [post.model_dump() for post in await generator.generate_posts_for_trend(trend, POSTS_PER_TREND)]
+    except Exception as e:
+        print(f"❌ Failed to generate posts for trend: {trend} → {e}")
+        return []
+    if len(posts) >= POSTS_PER_TREND:
+        checkpoint.add(key, {"trend": trend, "posts": posts})  # failed or short trends are retried on resume
+    else:
+        print(f"⚠️ Only {len(posts)}/{POSTS_PER_TREND} posts for trend: {trend} (retried on resume)")
+    return posts
+
 
 async def main():
+    start = time.perf_counter()
     # Load and preprocess trend titles
     trend_list = load_json_data(INPUT_PATH)
     if not trend_list:
@@ -27,23 +55,27 @@ async def main():
     trend_list = preprocess_text_list(trend_list)
 
     generator = PostGenerator()
+    n_parallel = N_PARALLEL or generator.client.scheduler.max_concurrency
 
-    all_posts: List[GeneratedPost] = []
-
-    for trend in trend_list:
-        try:
-            posts = await generator.generate_posts_for_trend(trend)
-            all_posts.extend(posts)
-        except Exception as e:
-            print(f"❌ Failed to generate posts for trend: {trend} → {e}")
-
-    # Serialize and save results
-    output_path = Path(OUTPUT_PATH)
-    with open(output_path, "w", encoding="utf-8") as f:  # type: TextIO
-        json.dump([post.model_dump() for post in all_posts], f, ensure_ascii=False, indent=2)
+    try:
+        settings = fingerprint(model=generator.model_name, params=generator.model_params,
+                               prompt=generator.build_prompt("{trend}", POSTS_PER_TREND))
+        with Checkpoint(CHECKPOINT_PATH, resume=RESUME, fingerprint=settings) as checkpoint, \
+                RecordWriter(OUTPUT_PATH) as writer, \
+                tqdm(total=len(trend_list), unit="trend") as progress:
+            if checkpoint.done:
+                print(f"♻️ Resuming: {len(checkpoint.done)} trends already generated")
+            trend_posts = map_ordered(lambda trend: generate_trend(generator, checkpoint, trend), trend_list, n_parallel)
+            async for posts in trend_posts:
+                writer.write_all(posts)
+                progress.update(1)
+    finally:
+        await generator.client.close()
 
-    print(f"✅ Generated {len(all_posts)} posts across {len(trend_list)} trends.")
-    print(f"📁 Output saved to: {output_path}")
+    print(f"✅ Generated {writer.count} posts across {len(trend_list)} trends.")
+    print(f"📁 Output saved to: {OUTPUT_PATH}")
+    metrics.record_stage("generation", writer.count, time.perf_counter() - start)
+    metrics.report(METRICS_PATH)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""
+run_incremental_update.py
+Merge new annotated batches into the persisted aggregate state, then refresh
+the SDG distribution and the responses from it, instead of rerunning
+analyze_sdg_distribution and run_response_generation over the full history.
+
+Only the trends present in the new batches are re-planned, and of those only
+the (trend, SDG) pairs whose top-k SDGs or dominant emotion changed get a new
+response; the rest are carried over. The work therefore grows with the new
+data, not with the history. Responses whose generation failed are never
+carried over: their trends are re-planned on every run until they succeed.
+
+Pass the new annotated batches. A file merged before is not read again
+unless it changed; a `.jsonl` file that was appended to is read from where
+the last run stopped, so one append-only file can collect every batch. Posts
+already merged are skipped, so a rewritten file only adds its new posts (but
+is read in full).
+
+Run from the repository root:
+    python -m src.pipelines.run_incremental_update batch.json|batch.jsonl|batch.parquet [...]
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import List, Sequence
+
+from src.analysis.aggregate_state import AggregateState
+from src.analysis.analyze_sdg_distribution import save_results
+from src.configs.paths import AGGREGATE_STATE_PATH, LOGS_DIR, RESPONSE_OUTPUT_PATH, SDG_DISTRIBUTION_PATH
+from src.modules.responders.generate_response import generate_responses_batch
+from src.pipelines.run_response_generation import TOP_K_SDGS, USE_LLM, build_response_cache
+from src.utils.metrics import metrics
+from src.utils.record_io import write_records
+
+STATE_PATH = AGGREGATE_STATE_PATH
+METRICS_PATH = LOGS_DIR / "incremental_metrics"  # -> .json + .prom
+
+
+def main(batch_paths: Sequence[Path]) -> None:
+    state = AggregateState.load(STATE_PATH)
+    try:
+        update(state, batch_paths)
+    finally:
+        state.close()
+    metrics.report(METRICS_PATH)
+
+
+def update(state: AggregateState, batch_paths: Sequence[Path]) -> None:
+    """Merge `batch_paths` into `state`, refresh the touched trends' responses and save."""
+    start = time.perf_counter()
+    posts_before = state.posts
+
+    touched: dict = {}
+    for path in batch_paths:
+        trends = state.merge_file(path)
+        if trends is None:
+            print(f"⏭️  {path} is unchanged since it was merged, skipping")
+            continue
+        touched.update(dict.fromkeys(trends))
+    touched.update(dict.fromkeys(state.failed_trends()))  # retry responses that failed last time
+    if state.top_k_sdgs != TOP_K_SDGS:
+        touched = dict.fromkeys(state.trends)  # responses were planned for another top-k
+        state.top_k_sdgs = TOP_K_SDGS
+    new_posts = state.posts - posts_before
+    print(f"📥 {new_posts} new posts, {len(touched)} trends to re-plan ({len(state.trends)} in total)")
+
+    regenerated = 0
+    if touched:
+        trends: List[str] = list(touched)
+        previous = [item for trend in trends for item in state.responses.get(trend, ())]
+        cache = build_response_cache()
+        try:
+            responses = generate_responses_batch(
+                data=state.trends,
+                trends=trends,
+                top_k_sdgs=TOP_K_SDGS,
+                use_llm=USE_LLM,
+                previous=previous,
+                cache=cache,
+            )
+        finally:
+            if cache is not None:
+                cache.close()
+        reused = {id(item) for item in previous}
+        regenerated = sum(1 for item in responses if id(item) not in reused)
+        state.set_responses(trends, responses)
+        print(f"💬 {regenerated} responses regenerated, {len(responses) - regenerated} unchanged")
+
+        write_records(RESPONSE_OUTPUT_PATH, (item.model_dump() for item in state.all_responses()))
+        save_results(state.sdg_counts, SDG_DISTRIBUTION_PATH)
+        print(f"💾 Saved {RESPONSE_OUTPUT_PATH} and {SDG_DISTRIBUTION_PATH}")
+    state.save(STATE_PATH)
+
+    metrics.inc("incremental_responses_regenerated_total", regenerated)
+    metrics.record_stage("incremental_update", new_posts, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python -m src.pipelines.run_incremental_update BATCH_FILE [BATCH_FILE ...]")
+    main([Path(arg) for arg in sys.argv[1:]])
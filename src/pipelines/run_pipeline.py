@@ -0,0 +1,206 @@
+"""
+Unified runner: clean -> SDG -> emotion -> {response, analysis} as one DAG,
+next to fetch (CSV export -> trend-tagged posts).
+
+Records are handed from stage to stage through in-memory queues, so SDG
+classification starts on the first cleaned post and emotion detection on the
+first classified one; response generation and the SDG analysis both consume
+the emotion stream and run side by side. Each stage still writes its usual
+file (see src/configs/paths.py), and stages whose inputs did not change since
+the last successful run are skipped.
+
+Run from the repository root:
+    python -m src.pipelines.run_pipeline
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+from src.analysis.analyze_sdg_distribution import count_sdgs, print_results
+from src.configs.paths import (
+    CLEAN_INPUT_PATHS,
+    CLEANED_POSTS_PATH,
+    EMOTION_CHECKPOINT_PATH,
+    EMOTION_FAILED_PATH,
+    EMOTION_OUTPUT_PATH,
+    FETCHED_POSTS_PATH,
+    LOGS_DIR,
+    NEAR_DUPLICATES_PATH,
+    PIPELINE_MANIFEST_PATH,
+    RESPONSE_OUTPUT_PATH,
+    SDG_CHECKPOINT_PATH,
+    SDG_DISTRIBUTION_PATH,
+    SDG_FAILED_PATH,
+    SDG_OUTPUT_PATH,
+    TREND_LIST_PATH,
+    TWITTER_CSV_PATH,
+)
+from src.configs.model_selector import get_model_and_params
+from src.pipelines import run_emotion_detection, run_response_generation, run_sdg_classification
+from src.utils import cleaner_posts
+from src.utils.checkpoint import Checkpoint
+from src.utils.concurrency import iterate_in_thread
+from src.utils.dag import Pipeline, Stage
+from src.utils.metrics import metrics
+from src.utils.near_duplicates import propagate_labels
+from src.utils.record_io import RecordWriter, aiter_records
+
+# None runs every stage; e.g. ["analysis"] runs only what the analysis needs
+TARGETS = None
+# Stages to re-run even if their inputs are unchanged (their dependents re-run too)
+FORCE = []
+METRICS_PATH = LOGS_DIR / "pipeline_metrics"  # -> .json + .prom
+
+
+async def fetch_stage(source: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    from src.modules.fetchers.trend_fetcher import CHUNK_SIZE, TrendIndex, iter_processed_chunks, parse_trend_list
+
+    trends = parse_trend_list(TREND_LIST_PATH)
+    if not trends:
+        raise ValueError("No trend titles found; cannot assign trends")
+    chunks = iter_processed_chunks(TWITTER_CSV_PATH, TrendIndex(trends), CHUNK_SIZE)
+    async for posts in iterate_in_thread(chunks):  # pandas parsing stays off the event loop
+        for post in posts:
+            yield post
+
+
+async def clean_stage(source: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    # Same inputs as `python -m src.utils.cleaner_posts`, so both write the same CLEANED_POSTS_PATH
+    seen = set()
+    with cleaner_posts.NearDuplicateFilter(NEAR_DUPLICATES_PATH, cleaner_posts.NEAR_DUPLICATE_THRESHOLD) as near_duplicates:
+        for path in CLEAN_INPUT_PATHS:
+            async for item in aiter_records(path):
+                post = cleaner_posts.clean_post(item, seen, near_duplicates)
+                if post is not None:
+                    yield post.model_dump()
+    print(f"🧬 Dropped {near_duplicates.dropped} near duplicates")
+
+
+async def sdg_stage(source: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    classifier = run_sdg_classification.build_classifier()
+    try:
+        settings = run_sdg_classification.checkpoint_fingerprint(classifier)
+        with Checkpoint(SDG_CHECKPOINT_PATH, resume=run_sdg_classification.RESUME, fingerprint=settings) as checkpoint, \
+                RecordWriter(SDG_FAILED_PATH) as failed:
+            async for record in run_sdg_classification.classify_posts(classifier, checkpoint, source):
+                if record["sdg"] is not None:
+                    yield record
+                else:
+                    failed.write(record)
+    finally:
+        await classifier.client.close()
+
+
+async def emotion_stage(source: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    detect_batch, _ = run_emotion_detection.build_detector()
+    try:
+        settings = run_emotion_detection.checkpoint_fingerprint()
+        with Checkpoint(EMOTION_CHECKPOINT_PATH, resume=run_emotion_detection.RESUME, fingerprint=settings) as checkpoint, \
+                RecordWriter(EMOTION_FAILED_PATH) as failed:
+            records = run_emotion_detection.detect_posts(detect_batch, checkpoint, source)
+            if run_emotion_detection.PROPAGATE_NEAR_DUPLICATES:
+                records = propagate_labels(records, NEAR_DUPLICATES_PATH)
+            async for record in records:
+                if record["emotion"] is not None:
+                    yield record
+                else:
+                    failed.write(record)
+    finally:
+        await run_emotion_detection.get_client().close()
+
+
+async def response_stage(source: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    from src.modules.responders.generate_response import generate_responses_batch_async
+    from src.schemas.models import Post
+
+    posts = [Post(**item) async for item in source]  # top-k SDGs per trend need the whole dataset
+    cache = run_response_generation.build_response_cache()
+    try:
+        responses = await generate_responses_batch_async(
+            data=posts,
+            top_k_sdgs=run_response_generation.TOP_K_SDGS,
+            use_llm=run_response_generation.USE_LLM,
+            cache=cache,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    for item in responses:
+        yield item.model_dump()
+
+
+async def analysis_stage(source: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    from src.schemas.emotion_output import EmotionAnnotatedPost
+
+    counter = count_sdgs([EmotionAnnotatedPost(**item) async for item in source])
+    print_results(counter)
+    for sdg, count in counter.most_common():
+        yield {"sdg": sdg, "count": count}
+
+
+def _llm_config(task: str, **extra) -> dict:
+    model_name, params = get_model_and_params(task)
+    return {"model": model_name, "params": params, **extra}
+
+
+def build_pipeline() -> Pipeline:
+    return Pipeline(
+        [
+            Stage("fetch", fetch_stage, output=FETCHED_POSTS_PATH, inputs=[TWITTER_CSV_PATH, TREND_LIST_PATH]),
+            Stage(
+                "clean", clean_stage, output=CLEANED_POSTS_PATH, inputs=CLEAN_INPUT_PATHS,
+                config={"near_duplicate_threshold": cleaner_posts.NEAR_DUPLICATE_THRESHOLD},
+            ),
+            Stage(
+                "sdg", sdg_stage, deps=["clean"], output=SDG_OUTPUT_PATH,
+                config=_llm_config(
+                    "sdg_classification",
+                    batch_size=run_sdg_classification.BATCH_SIZE,
+                    local_tier=run_sdg_classification.LOCAL_TIER_THRESHOLD,
+                ),
+            ),
+            Stage(
+                "emotion", emotion_stage, deps=["sdg"], output=EMOTION_OUTPUT_PATH,
+                config=_llm_config(
+                    "emotion_detection",
+                    batch_size=run_emotion_detection.BATCH_SIZE,
+                    local_tier=run_emotion_detection.LOCAL_TIER_THRESHOLD,
+                    propagate_near_duplicates=run_emotion_detection.PROPAGATE_NEAR_DUPLICATES,
+                ),
+            ),
+            Stage(
+                "response", response_stage, deps=["emotion"], output=RESPONSE_OUTPUT_PATH,
+                config=_llm_config(
+                    "response_generation",
+                    top_k_sdgs=run_response_generation.TOP_K_SDGS,
+                    use_llm=run_response_generation.USE_LLM,
+                    response_cache=[run_response_generation.RESPONSE_CACHE_KEY_MODE, run_response_generation.RESPONSE_CACHE_FALLBACK],
+                ),
+            ),
+            Stage("analysis", analysis_stage, deps=["emotion"], output=SDG_DISTRIBUTION_PATH),
+        ],
+        manifest_path=PIPELINE_MANIFEST_PATH,
+    )
+
+
+async def main():
+    pipeline = build_pipeline()
+    run, replay = pipeline.plan(TARGETS, FORCE)
+    if not run:
+        print("✅ Everything is up to date, nothing to run.")
+        return
+    print(f"▶️ Running: {' -> '.join(run)}")
+    if replay:
+        print(f"♻️ Unchanged, replayed from disk: {', '.join(replay)}")
+
+    stats = await pipeline.run(TARGETS, FORCE)
+
+    print("\n📊 Stages:")
+    for name in pipeline.order:
+        s = stats[name]
+        print(f"  {name:10} {s['status']:9} {s['records'] or 0:>8} records {s['seconds']:8.2f}s")
+    metrics.report(METRICS_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,12 @@
 import json
-from pathlib import Path
+import time
+from typing import Optional
+from src.configs.paths import EMOTION_OUTPUT_PATH, RESPONSE_OUTPUT_PATH, TREND_TITLES_PATH, LOGS_DIR
 from src.schemas.models import Post
 from src.modules.responders.generate_response import generate_responses_batch
+from src.modules.responders.response_cache import ResponseCache
+from src.utils.metrics import metrics
+from src.utils.record_io import RecordWriter, iter_records
 
 
 '''Parameters:
@@ -12,40 +17,59 @@ from src.modules.responders.generate_response import generate_responses_batch
 
 
 
-TREND_LIST_PATH = "../data/input/trend_titles.json"  #by using trend titles
+TREND_LIST_PATH = TREND_TITLES_PATH  #by using trend titles
 USE_FILTERED_TRENDS = False  #Using the trend's title
-INPUT_PATH = "../data/output/emotion_output.json"
-OUTPUT_PATH = "../data/output"
+INPUT_PATH = EMOTION_OUTPUT_PATH  # .json or .jsonl
+OUTPUT_PATH = RESPONSE_OUTPUT_PATH
+METRICS_PATH = LOGS_DIR / "response_metrics"  # -> .json + .prom
 TOP_K_SDGS = 1
 USE_LLM = True
+# "exact", "trend" or "sdg_emotion" memoizes LLM responses across runs (see response_cache.py); None disables
+RESPONSE_CACHE_KEY_MODE: Optional[str] = None
+RESPONSE_CACHE_FALLBACK = False  # on a miss, serve the warmed generic SDG x emotion response
+
+
+def build_response_cache() -> Optional[ResponseCache]:
+    if RESPONSE_CACHE_KEY_MODE is None or not USE_LLM:
+        return None
+    return ResponseCache(key_mode=RESPONSE_CACHE_KEY_MODE, fallback_to_generic=RESPONSE_CACHE_FALLBACK)
+
 
 def main():
     print(f"Loading data from {INPUT_PATH} ...")
-    with open(INPUT_PATH, "r", encoding="utf-8") as f:
-        raw_data = json.load(f)
-
+    start = time.perf_counter()
+    trend_titles = None
     if USE_FILTERED_TRENDS:
         with open(TREND_LIST_PATH, "r", encoding="utf-8") as f:
-            trend_titles = json.load(f)
-        raw_data = [item for item in raw_data if item["trend"] in trend_titles]
+            trend_titles = set(json.load(f))
 
-    posts = [Post(**item) for item in raw_data]
+    posts = [
+        Post(**item) for item in iter_records(INPUT_PATH)
+        if trend_titles is None or item["trend"] in trend_titles
+    ]
 
     print(f" Generating responses for each trend with top {TOP_K_SDGS} SDGs ...")
-    responses = generate_responses_batch(
-        data=posts,
-        top_k_sdgs=TOP_K_SDGS,
-        use_llm=USE_LLM
-    )
-
-    final_output = [item.model_dump() for item in responses]
+    cache = build_response_cache()
+    try:
+        responses = generate_responses_batch(
+            data=posts,
+            top_k_sdgs=TOP_K_SDGS,
+            use_llm=USE_LLM,
+            cache=cache
+        )
+    finally:
+        if cache is not None:
+            print(f" Response cache: {cache.stats()}")
+            cache.close()
 
     print(f" Saving responses to {OUTPUT_PATH}")
-    Path(OUTPUT_PATH).parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(final_output, f, indent=2, ensure_ascii=False)
+    with RecordWriter(OUTPUT_PATH) as writer:
+        for item in responses:
+            writer.write(item.model_dump())
 
     print(" All done! Responses saved successfully.")
+    metrics.record_stage("response", writer.count, time.perf_counter() - start)
+    metrics.report(METRICS_PATH)
 
 
 if __name__ == "__main__":
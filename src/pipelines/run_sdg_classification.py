@@ -1,62 +1,100 @@
-import json
 import asyncio
-from pathlib import Path
-from tqdm.asyncio import tqdm_asyncio
-from src.modules.classifiers.sdg_classifier import SDGClassifier
-from src.utils.utilities import load_json_data
+import time
+from typing import AsyncIterable, AsyncIterator, List
+from tqdm import tqdm
+from src.configs.paths import CLEANED_POSTS_PATH, SDG_CHECKPOINT_PATH, SDG_FAILED_PATH, SDG_OUTPUT_PATH, LOGS_DIR
+from src.modules.classifiers.local_classifier import SDG_MODEL_PATH, HashedLogisticRegression, TieredSDGClassifier
+from src.modules.classifiers.sdg_classifier import PROMPT_HEADER, SDGClassifier
+from src.utils.checkpoint import Checkpoint, fingerprint
+from src.utils.concurrency import batched, map_ordered
+from src.utils.metrics import metrics
+from src.utils.record_io import RecordWriter, aiter_records
 
 
-INPUT_PATH = "src/data/cleaned_posts.json"
-OUTPUT_PATH = "src/data/sdg_output2.json"
-FAILED_PATH = "src/data/sdg_failed2.json"
-N_PARALLEL = 5
+# Suffix picks the format: ".jsonl" streams one record per line, ".json" writes an array
+INPUT_PATH = CLEANED_POSTS_PATH
+OUTPUT_PATH = SDG_OUTPUT_PATH
+FAILED_PATH = SDG_FAILED_PATH
+N_PARALLEL = None  # None: as many in flight as the model's scheduler may ever admit
+FOLLOW_INPUT = False  # tail a .jsonl input while the upstream stage is still writing it
+CHECKPOINT_PATH = SDG_CHECKPOINT_PATH
+METRICS_PATH = LOGS_DIR / "sdg_metrics"  # -> .json + .prom
+RESUME = True  # skip posts already classified in CHECKPOINT_PATH (with the same settings); False starts from scratch
+BATCH_SIZE = 10  # posts packed into one prompt; 1 sends one request per post
+# e.g. 0.9: answer posts the local model is this confident about without the LLM
+# (train it first: python -m src.modules.classifiers.local_classifier); None disables the tier
+LOCAL_TIER_THRESHOLD = None
 
 
-async def classify_post(sem, classifier: SDGClassifier, post: dict):
-    async with sem:
-        result = await classifier.classify(post["text"])
-        return {
+async def classify_batch(classifier, checkpoint: Checkpoint, posts: List[dict]) -> List[dict]:
+    records = [checkpoint.get(post) for post in posts]
+    pending = [i for i, record in enumerate(records) if record is None]
+
+    results = await classifier.classify_batch([posts[i]["text"] for i in pending])
+    for i, result in zip(pending, results):
+        post = posts[i]
+        records[i] = {
             "trend": post["trend"],
             "text": post["text"],
             "sdg": result.sdg if result else None
         }
+        if result:
+            checkpoint.add(post, records[i])  # failed posts are retried on resume
+    return records
 
 
-async def main():
-    print(f"Loading data from {INPUT_PATH}...")
-    data = load_json_data(INPUT_PATH)
-    print(f"Loaded {len(data)} posts for classification")
-    
-    classifier = SDGClassifier()
-    sem = asyncio.Semaphore(N_PARALLEL)
+def checkpoint_fingerprint(classifier) -> str:
+    """Records in CHECKPOINT_PATH are reused only for the same model, params, prompt and local tier."""
+    llm = getattr(classifier, "llm_classifier", classifier)
+    return fingerprint(model=llm.model_name, params=llm.model_params, prompt=PROMPT_HEADER, local_tier=LOCAL_TIER_THRESHOLD)
 
-    tasks = [
-        classify_post(sem, classifier, post)
-        for post in data
-    ]
 
-    print("Starting classification...")
-    results = await tqdm_asyncio.gather(*tasks)
+def build_classifier():
+    classifier = SDGClassifier()
+    if LOCAL_TIER_THRESHOLD is not None:
+        classifier = TieredSDGClassifier(classifier, HashedLogisticRegression.load(SDG_MODEL_PATH), LOCAL_TIER_THRESHOLD)
+    return classifier
 
-    successful = [r for r in results if r["sdg"] is not None]
-    print(f"\nProcessed {len(results)} posts")
-    
-    with open("src/data/classified_posts.json", "w", encoding="utf-8") as f:
-        json.dump(successful, f, indent=2, ensure_ascii=False)
 
-    failed = [r for r in results if r["sdg"] is None]
+async def classify_posts(classifier, checkpoint: Checkpoint, posts: AsyncIterable[dict]) -> AsyncIterator[dict]:
+    """Yield one record per input post, in input order (`sdg` is None for failures)."""
+    n_parallel = N_PARALLEL or classifier.client.scheduler.max_concurrency
+    batches = batched(posts, BATCH_SIZE)
+    async for records in map_ordered(lambda batch: classify_batch(classifier, checkpoint, batch), batches, n_parallel):
+        for record in records:
+            yield record
 
-    # Save results
-    Path(OUTPUT_PATH).parent.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(successful, f, indent=2, ensure_ascii=False)
 
-    with open(FAILED_PATH, "w", encoding="utf-8") as f:
-        json.dump(failed, f, indent=2, ensure_ascii=False)
+async def main():
+    print(f"Loading data from {INPUT_PATH}...")
+    start = time.perf_counter()
+    classifier = build_classifier()
+    posts = aiter_records(INPUT_PATH, follow=FOLLOW_INPUT)
+
+    print("Starting classification...")
+    with Checkpoint(CHECKPOINT_PATH, resume=RESUME, fingerprint=checkpoint_fingerprint(classifier)) as checkpoint, \
+            RecordWriter(OUTPUT_PATH) as output, \
+            RecordWriter(FAILED_PATH) as failed, \
+            tqdm(unit="post") as progress:
+        if checkpoint.done:
+            print(f"Resuming: {len(checkpoint.done)} posts already classified")
+        async for result in classify_posts(classifier, checkpoint, posts):
+            if result["sdg"] is not None:
+                output.write(result)
+            else:
+                failed.write(result)
+            progress.update(1)
 
-    print(f"✅ {len(successful)} classified, ❌ {len(failed)} failed.")
+    print(f"\nProcessed {output.count + failed.count} posts")
+    print(f"✅ {output.count} classified, ❌ {failed.count} failed.")
     print(f"Results saved to {OUTPUT_PATH}")
     print(f"Failed cases saved to {FAILED_PATH}")
+    if LOCAL_TIER_THRESHOLD is not None:
+        print(f"Local tier: {classifier.stats.report()}")
+    print(f"LLM cache: {classifier.client.cache.stats()}")
+    print(f"Scheduler: {classifier.client.scheduler.stats()}")
+    metrics.record_stage("sdg", output.count + failed.count, time.perf_counter() - start)
+    metrics.report(METRICS_PATH)
     await classifier.client.close()  # Close HTTP connection pool
 
 
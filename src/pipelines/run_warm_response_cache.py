@@ -0,0 +1,67 @@
+"""
+run_warm_response_cache.py
+Precompute the generic response of every SDG x emotion combination
+(17 x 9 = 153) into the response cache, offline, so that serving with
+`fallback_to_generic` practically never waits for the LLM.
+
+Combinations already cached are skipped, so the command can be rerun to fill
+gaps left by failed requests (failures are never cached).
+
+Run from the repository root:
+    python -m src.pipelines.run_warm_response_cache
+"""
+
+import asyncio
+import time
+
+from src.modules.responders.generate_response import (
+    RESPONSE_CONCURRENCY,
+    _build_response_client,
+    generate_supportive_response_async,
+)
+from src.modules.responders.response_cache import ResponseCache
+from src.schemas.emotion_output import VALID_EMOTIONS
+from src.schemas.sdg_output import SDG_TITLES
+
+
+async def warm(cache: ResponseCache, max_concurrency: int = RESPONSE_CONCURRENCY) -> int:
+    """Generate the missing generic responses; returns how many were generated."""
+    combinations = [
+        (sdg, emotion) for sdg in SDG_TITLES for emotion in VALID_EMOTIONS
+        if not cache.contains(sdg, emotion)
+    ]
+    if not combinations:
+        return 0
+
+    client = _build_response_client()
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def generate(sdg: str, emotion: str) -> None:
+        async with sem:
+            # Stored under the generic key, and only when the request succeeded
+            await generate_supportive_response_async(sdg, emotion, trends=[], client=client, cache=cache)
+
+    try:
+        await asyncio.gather(*(generate(sdg, emotion) for sdg, emotion in combinations))
+    finally:
+        await client.close()
+    return sum(1 for sdg, emotion in combinations if cache.contains(sdg, emotion))
+
+
+def main() -> None:
+    start = time.perf_counter()
+    cache = ResponseCache()  # generic entries have the same key in every key mode
+    total = len(SDG_TITLES) * len(VALID_EMOTIONS)
+    try:
+        generated = asyncio.run(warm(cache))
+        missing = sum(1 for sdg in SDG_TITLES for emotion in VALID_EMOTIONS if not cache.contains(sdg, emotion))
+    finally:
+        cache.close()
+    print(f"🔥 Generated {generated} responses in {time.perf_counter() - start:.1f}s; "
+          f"{total - missing}/{total} SDG x emotion combinations cached")
+    if missing:
+        print(f"⚠️  {missing} failed, rerun to retry them")
+
+
+if __name__ == "__main__":
+    main()
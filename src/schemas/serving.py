@@ -0,0 +1,54 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+from src.schemas.emotion_output import VALID_EMOTIONS
+from src.schemas.response import Response
+from src.schemas.sdg_output import SDG_TITLES
+
+MAX_TEXTS_PER_REQUEST = 100
+MAX_TEXT_CHARS = 2_000
+MAX_TREND_CHARS = 200
+
+
+class ClassifyRequest(BaseModel):
+    """One post (`text`) or several (`texts`)."""
+    text: Optional[str] = Field(default=None, min_length=1, max_length=MAX_TEXT_CHARS)
+    texts: Optional[List[str]] = Field(default=None, min_length=1, max_length=MAX_TEXTS_PER_REQUEST)
+
+    @model_validator(mode="after")
+    def _exactly_one(self) -> "ClassifyRequest":
+        if (self.text is None) == (self.texts is None):
+            raise ValueError("Pass exactly one of 'text' or 'texts'")
+        if self.texts is not None and any(not 0 < len(text) <= MAX_TEXT_CHARS for text in self.texts):
+            raise ValueError(f"Every text must have 1 to {MAX_TEXT_CHARS} characters")
+        return self
+
+
+class ClassifiedPost(BaseModel):
+    text: str
+    sdg: List[str]
+    emotion: Optional[str] = None
+
+
+class RespondRequest(BaseModel):
+    """
+    A post to classify and answer; pass `sdg` and `emotion` (official labels
+    only, they go into the prompt and the cache key) to skip the classification.
+    """
+    text: Optional[str] = Field(default=None, min_length=1, max_length=MAX_TEXT_CHARS)
+    trend: Optional[str] = Field(default=None, min_length=1, max_length=MAX_TREND_CHARS)
+    sdg: Optional[Literal[*SDG_TITLES]] = None
+    emotion: Optional[Literal[*VALID_EMOTIONS]] = None
+
+    @model_validator(mode="after")
+    def _text_or_labels(self) -> "RespondRequest":
+        if self.text is None and (self.sdg is None or self.emotion is None):
+            raise ValueError("Pass 'text', or both 'sdg' and 'emotion'")
+        return self
+
+
+class RespondResult(BaseModel):
+    text: Optional[str] = None
+    trend: Optional[str] = None
+    sdg: List[str]
+    emotion: Optional[str] = None
+    response: Optional[Response] = None  # None when the post has no SDG or emotion
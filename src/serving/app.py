@@ -0,0 +1,337 @@
+"""
+app.py
+Live HTTP access to the classify-and-respond pipeline for the dashboard, as
+a dependency-free ASGI app:
+
+    POST /classify  {"text": "..."} or {"texts": ["...", ...]}
+                    -> {"text", "sdg": [...], "emotion"} (or {"results": [...]})
+    POST /respond   {"text": "...", "trend": "..."}  (or "sdg" + "emotion" instead of "text")
+                    -> {"text", "trend", "sdg": [...], "emotion", "response": {...}}
+    POST /respond/stream  same body, answered as JSON lines while the model writes:
+                    {"text", "trend", "sdg", "emotion"}, then {"delta": "..."} pieces of
+                    the message, then {"response": {...}} (or {"error": "..."} if it broke)
+    GET  /metrics   request count and p50/p99 latency per endpoint, batching and
+                    cache stats (?format=prometheus for the full registry)
+    GET  /health
+
+Concurrent requests are micro-batched: the texts of requests arriving within
+MAX_BATCH_WAIT of each other share one multi-post prompt (up to
+MAX_BATCH_SIZE posts) per classifier, and identical texts (or identical
+SDG/emotion/trend responses) waiting or in flight are answered once. All
+requests share one pooled LLMClient per task. Responses go through the
+ResponseCache; with its generic entries warmed (run_warm_response_cache), /respond
+practically never waits for the response LLM. On a cache miss /respond/stream
+shows the first words of the message as soon as the model writes them, instead
+of after the full completion (streams are not coalesced).
+
+Run from the repository root (needs an ASGI server, e.g. pip install uvicorn):
+    python -m src.serving.app [port]
+"""
+
+import asyncio
+import contextlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from pydantic import ValidationError
+
+from src.configs.paths import RESPONSE_CACHE_PATH
+from src.modules.responders.response_cache import ResponseCache
+from src.schemas.response import Response
+from src.schemas.serving import ClassifiedPost, ClassifyRequest, RespondRequest, RespondResult
+from src.utils.concurrency import MicroBatcher
+from src.utils.metrics import metrics
+
+HOST = "127.0.0.1"
+PORT = 8000
+MAX_BATCH_SIZE = 10  # posts per classification prompt, as in the batch pipelines
+MAX_BATCH_WAIT = 0.02  # seconds the first request of a batch waits for company
+MAX_BODY_BYTES = 1 << 20
+RESPONSE_CACHE_KEY_MODE: Optional[str] = "trend"  # see response_cache.py; None disables the cache
+RESPONSE_CACHE_FALLBACK = True  # serve the warmed generic SDG x emotion response on a miss
+
+ASGIReceive = Callable[[], Awaitable[dict]]
+ASGISend = Callable[[dict], Awaitable[None]]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ClassifyAndRespondService:
+    """SDGClassifier, detect_emotion and the response generator behind micro-batchers."""
+
+    def __init__(
+        self,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_batch_wait: float = MAX_BATCH_WAIT,
+        response_cache_path: Path = RESPONSE_CACHE_PATH,
+    ):
+        from src.modules.classifiers import emotion_detector
+        from src.modules.classifiers.sdg_classifier import SDGClassifier
+        from src.modules.responders.generate_response import _build_response_client
+
+        self.sdg_classifier = SDGClassifier()
+        self.emotion_client = emotion_detector.get_client()
+        self.response_client = _build_response_client()
+        self.response_cache = ResponseCache(
+            response_cache_path, key_mode=RESPONSE_CACHE_KEY_MODE, fallback_to_generic=RESPONSE_CACHE_FALLBACK
+        ) if RESPONSE_CACHE_KEY_MODE else None
+
+        self.sdg = MicroBatcher(self.sdg_classifier.classify_batch, max_batch_size, max_batch_wait)
+        self.emotion = MicroBatcher(emotion_detector.detect_emotion_batch, max_batch_size, max_batch_wait)
+        self.responses = MicroBatcher(self._respond_batch, max_size=1)  # coalescing only: one prompt per response
+
+    async def classify(self, text: str) -> ClassifiedPost:
+        sdg, emotion = await asyncio.gather(self.sdg.submit(text), self.emotion.submit(text))
+        return ClassifiedPost(text=text, sdg=sdg.sdg if sdg else [], emotion=emotion.emotion if emotion else None)
+
+    async def _respond_batch(self, keys: List[Tuple[str, str, Optional[str]]]) -> list:
+        from src.modules.responders.generate_response import generate_supportive_response_async
+
+        return [
+            await generate_supportive_response_async(
+                sdg, emotion, [trend] if trend else [], client=self.response_client, cache=self.response_cache
+            )
+            for sdg, emotion, trend in keys
+        ]
+
+    async def _labels(self, request: RespondRequest) -> Tuple[List[str], Optional[str]]:
+        if request.sdg is not None and request.emotion is not None:
+            return [request.sdg], request.emotion
+        post = await self.classify(request.text)
+        return post.sdg, post.emotion
+
+    async def respond(self, request: RespondRequest) -> RespondResult:
+        sdgs, emotion = await self._labels(request)
+        response = None
+        if sdgs and emotion:
+            response = await self.responses.submit((sdgs[0], emotion, request.trend))
+        return RespondResult(text=request.text, trend=request.trend, sdg=sdgs, emotion=emotion, response=response)
+
+    async def respond_stream(self, request: RespondRequest) -> AsyncIterator[dict]:
+        """`respond` as events: the labels, then {"delta"} pieces of the message, then the full {"response"}."""
+        from src.modules.responders.generate_response import (
+            _response_type,
+            get_sdg_link,
+            stream_supportive_response,
+        )
+
+        sdgs, emotion = await self._labels(request)
+        yield RespondResult(text=request.text, trend=request.trend, sdg=sdgs, emotion=emotion).model_dump(
+            exclude={"response"}
+        )
+        if not (sdgs and emotion):
+            return
+        pieces = []
+        deltas = stream_supportive_response(
+            sdgs[0], emotion, [request.trend] if request.trend else [],
+            client=self.response_client, cache=self.response_cache
+        )
+        async with contextlib.aclosing(deltas):
+            async for delta in deltas:
+                pieces.append(delta)
+                yield {"delta": delta}
+        response = Response(message="".join(pieces).strip(), type=_response_type(emotion), sdg_link=get_sdg_link(sdgs[0]))
+        yield {"response": response.model_dump()}
+
+    def stats(self) -> dict:
+        return {
+            "batchers": {"sdg": self.sdg.stats(), "emotion": self.emotion.stats(), "response": self.responses.stats()},
+            "response_cache": self.response_cache.stats() if self.response_cache is not None else None,
+        }
+
+    async def close(self) -> None:
+        for batcher in (self.sdg, self.emotion, self.responses):
+            await batcher.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        for client in (self.sdg_classifier.client, self.emotion_client, self.response_client):
+            await client.close()
+
+
+class ServingApp:
+    """The ASGI application; the service is created at lifespan startup (or on the first request)."""
+
+    def __init__(self, service_factory: Callable[[], ClassifyAndRespondService] = ClassifyAndRespondService):
+        self.service_factory = service_factory
+        self.service: Optional[ClassifyAndRespondService] = None
+        self.routes: Dict[Tuple[str, str], Callable[[dict, dict], Awaitable[dict]]] = {
+            ("POST", "/classify"): self.classify,
+            ("POST", "/respond"): self.respond,
+            ("POST", "/respond/stream"): self.respond_stream,
+            ("GET", "/metrics"): self.metrics,
+            ("GET", "/health"): self.health,
+        }
+
+    def _service(self) -> ClassifyAndRespondService:
+        if self.service is None:
+            self.service = self.service_factory()
+        return self.service
+
+    async def close(self) -> None:
+        if self.service is not None:
+            await self.service.close()
+            self.service = None
+
+    # -------------------------------------------------------------------------
+    # Endpoints
+    # -------------------------------------------------------------------------
+
+    async def classify(self, body: dict, query: dict) -> dict:
+        request = ClassifyRequest.model_validate(body)
+        service = self._service()
+        if request.text is not None:
+            return (await service.classify(request.text)).model_dump()
+        posts = await asyncio.gather(*(service.classify(text) for text in request.texts))
+        return {"results": [post.model_dump() for post in posts]}
+
+    async def respond(self, body: dict, query: dict) -> dict:
+        return (await self._service().respond(RespondRequest.model_validate(body))).model_dump()
+
+    async def respond_stream(self, body: dict, query: dict) -> AsyncIterator[dict]:
+        events = self._service().respond_stream(RespondRequest.model_validate(body))
+        first = await anext(events)  # the labels: a failed classification still gets an error status
+
+        async def all_events() -> AsyncIterator[dict]:
+            yield first
+            async with contextlib.aclosing(events):
+                async for event in events:
+                    yield event
+
+        return all_events()
+
+    async def metrics(self, body: dict, query: dict):
+        if query.get("format") == ["prometheus"]:
+            return metrics.to_prometheus()
+        endpoints = {}
+        for key, histogram in metrics.histograms.get("http_request_seconds", {}).items():
+            summary = histogram.summary()
+            endpoints[dict(key)["endpoint"]] = {name: summary[name] for name in ("count", "mean", "p50", "p99", "max")}
+        return {"endpoints": endpoints, **(self.service.stats() if self.service is not None else {})}
+
+    async def health(self, body: dict, query: dict) -> dict:
+        return {"status": "ok"}
+
+    # -------------------------------------------------------------------------
+    # ASGI
+    # -------------------------------------------------------------------------
+
+    async def __call__(self, scope: dict, receive: ASGIReceive, send: ASGISend) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: ASGIReceive, send: ASGISend) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self._service()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: dict, receive: ASGIReceive, send: ASGISend) -> None:
+        start = time.perf_counter()
+        path = scope["path"]
+        try:
+            handler = self.routes.get((scope["method"], path))
+            if handler is None:
+                known = any(route_path == path for _, route_path in self.routes)
+                raise HTTPError(405 if known else 404, "Method not allowed" if known else "Not found")
+            body = await self._read_json(receive) if scope["method"] == "POST" else {}
+            status, payload = 200, await handler(body, parse_qs(scope.get("query_string", b"").decode("latin-1")))
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except ValidationError as e:
+            status, payload = 422, {"error": "Invalid request", "details": json.loads(e.json(include_url=False))}
+        except Exception as e:
+            status, payload = 502, {"error": f"Upstream failure: {type(e).__name__}: {e}"}
+
+        if hasattr(payload, "__aiter__"):
+            await self._send_stream(send, payload)
+        else:
+            await self._send(send, status, payload)
+
+        endpoint = path if (scope["method"], path) in self.routes else "other"
+        metrics.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+        metrics.inc("http_requests_total", endpoint=endpoint, status=str(status))
+
+    @staticmethod
+    async def _send(send: ASGISend, status: int, payload) -> None:
+        if isinstance(payload, str):
+            content_type, data = b"text/plain; version=0.0.4", payload.encode("utf-8")
+        else:
+            content_type, data = b"application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(data)).encode("latin-1"))],
+        })
+        await send({"type": "http.response.body", "body": data})
+
+    @staticmethod
+    async def _send_stream(send: ASGISend, events: AsyncIterator[dict]) -> None:
+        """One JSON line per event, each sent as soon as it is produced (chunked, no content-length)."""
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        try:
+            async with contextlib.aclosing(events):
+                async for event in events:
+                    line = json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"
+                    await send({"type": "http.response.body", "body": line, "more_body": True})
+        except Exception as e:
+            # The status is out already; the missing final "response" event tells the client it is incomplete
+            line = json.dumps({"error": f"Upstream failure: {type(e).__name__}: {e}"}).encode("utf-8") + b"\n"
+            await send({"type": "http.response.body", "body": line, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _read_json(receive: ASGIReceive) -> dict:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "Client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        try:
+            body = json.loads(b"".join(chunks) or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}") from e
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+
+app = ServingApp()
+
+
+def main(port: int = PORT) -> None:
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise ImportError("Serving over HTTP needs an ASGI server: pip install uvicorn") from e
+    uvicorn.run(app, host=HOST, port=port, lifespan="on")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else PORT)
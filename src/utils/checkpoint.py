@@ -0,0 +1,122 @@
+"""
+checkpoint.py
+Append-only progress files so long pipeline runs can resume after a crash.
+
+The first line is a header with the fingerprint of the settings that decide
+the stage's output (model, params, prompt, see `fingerprint`); a progress
+file written with other settings is discarded on open instead of resumed,
+so changing the model or prompt never reuses stale labels. Each finished
+post is then appended (and flushed) as `{"id": <post id>, "record": {...}}`.
+
+On restart the file is scanned once and only the ids are kept in memory,
+with the offset of their entry: a resumed record is read back from disk
+when it is asked for, so memory does not grow with the records' size.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Union
+
+
+def post_id(post: dict) -> str:
+    """Stable id derived from the post content (normalized trend + text)."""
+    key = f"{post.get('trend', '').strip().lower()}\x1f{post.get('text', '')}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def fingerprint(**settings) -> str:
+    """Digest of the settings a stage's records depend on (model, params, prompt...)."""
+    canonical = json.dumps(settings, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class Checkpoint:
+    def __init__(self, path: Union[str, Path], resume: bool = True, fingerprint: Optional[str] = None):
+        self.path = Path(path)
+        self.resume = resume
+        self.fingerprint = fingerprint
+        self.done: Dict[bytes, int] = {}  # binary post id -> byte offset of its entry
+        self._file: Optional[BinaryIO] = None
+        self._reader: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "Checkpoint":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def open(self) -> None:
+        if self.resume and self._header_matches():
+            self._terminate_torn_line()
+            self.done = self._load()
+        else:
+            self._start()
+        self._file = open(self.path, "ab")
+
+    def _header_matches(self) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                header = json.loads(f.readline())
+        except FileNotFoundError:
+            return False
+        except json.JSONDecodeError:
+            header = None
+        if isinstance(header, dict) and "id" not in header and header.get("fingerprint") == self.fingerprint:
+            return True
+        print(f"♻️ {self.path} was written with other settings (model, params or prompt); starting from scratch")
+        return False
+
+    def _start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(self._line({"fingerprint": self.fingerprint}))
+
+    def _load(self) -> Dict[bytes, int]:
+        done: Dict[bytes, int] = {}
+        with open(self.path, "rb") as f:
+            offset = len(f.readline())  # the header
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    entry = None  # torn write from a crash; that post is simply redone
+                if entry is not None:
+                    done[bytes.fromhex(entry["id"])] = offset
+                offset += len(line)
+        return done
+
+    def _terminate_torn_line(self) -> None:
+        """Make sure appended entries start on a fresh line after a crash mid-write."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with open(self.path, "rb+") as f:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    @staticmethod
+    def _line(entry: dict) -> bytes:
+        return (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def get(self, post: dict) -> Optional[dict]:
+        offset = self.done.get(bytes.fromhex(post_id(post)))
+        if offset is None:
+            return None
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(offset)
+        return json.loads(self._reader.readline())["record"]
+
+    def add(self, post: dict, record: dict) -> None:
+        pid = post_id(post)
+        self.done[bytes.fromhex(pid)] = self._file.tell()
+        self._file.write(self._line({"id": pid, "record": record}))
+        self._file.flush()
+
+    def close(self) -> None:
+        for f in (self._file, self._reader):
+            if f is not None:
+                f.close()
+        self._file = self._reader = None
@@ -1,56 +1,128 @@
-import json
 from pathlib import Path
-from typing import List
-from src.utils.utilities import load_json_data, clean_text
+from typing import Iterable, Iterator, List, Optional
+from src.configs.paths import CLEAN_INPUT_PATHS, CLEANED_POSTS_PATH, NEAR_DUPLICATES_PATH
+from src.utils.record_io import RecordWriter, iter_records
+from src.utils.text_normalizer import clean_text
 from pydantic import BaseModel
 
+# Posts at least this similar (MinHash-estimated Jaccard over character shingles)
+# to an earlier post of the same trend are dropped; None keeps near duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
 
 class CleanedPost(BaseModel):
     trend: str
     text: str
 
 
-def clean_and_validate_posts(raw_posts: List[dict]) -> List[CleanedPost]:
-    cleaned = []
+class NearDuplicateFilter:
+    """
+    Keeps one representative per cluster of near-identical posts of a trend and
+    logs every dropped post with its representative to `path`, so the
+    classification stages can copy the representative's labels over
+    (see near_duplicates.propagate_labels). The log is rewritten on every run,
+    and left empty when `threshold` is None.
+
+    Usage:
+        with NearDuplicateFilter() as near_duplicates:
+            post = clean_post(item, seen, near_duplicates)
+    """
+
+    def __init__(self, path: Path = NEAR_DUPLICATES_PATH, threshold: Optional[float] = NEAR_DUPLICATE_THRESHOLD):
+        self.index = None
+        if threshold is not None:
+            from src.utils.near_duplicates import NearDuplicateIndex
+            self.index = NearDuplicateIndex(threshold=threshold)
+        self.log = RecordWriter(path)
+
+    def __enter__(self) -> "NearDuplicateFilter":
+        self.log.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.log.close()
+
+    @property
+    def dropped(self) -> int:
+        return self.log.count
+
+    def keep(self, post: CleanedPost) -> bool:
+        if self.index is None:
+            return True
+        representative = self.index.add((post.trend, post.text), post.text, scope=post.trend.lower())
+        if representative is None:
+            return True
+        self.log.write({
+            "trend": post.trend,
+            "text": post.text,
+            "duplicate_of": {"trend": representative[0], "text": representative[1]},
+        })
+        return False
+
+
+def clean_post(item: dict, seen: set, near_duplicates: Optional[NearDuplicateFilter] = None) -> Optional[CleanedPost]:
+    """
+    Clean one raw post; None if it is too short, invalid, already in `seen`
+    or a near duplicate of an earlier post (when `near_duplicates` is given).
+    """
+    try:
+        trend = item.get("trend", "").strip()
+        text = clean_text(item.get("text", "").strip())
+
+        if not trend or not text or len(text) < 15:
+            return None
+
+        key = (trend.lower(), text)
+        if key in seen:
+            return None
+
+        seen.add(key)
+        post = CleanedPost(trend=trend, text=text)
+        if near_duplicates is not None and not near_duplicates.keep(post):
+            return None
+        return post
+
+    except Exception as e:
+        print(f"❌ Error processing item: {item} → {e}")
+        return None
+
+
+def iter_clean_posts(
+    raw_posts: Iterable[dict], near_duplicates: Optional[NearDuplicateFilter] = None
+) -> Iterator[CleanedPost]:
+    """Yield cleaned, de-duplicated posts one at a time."""
     seen = set()
 
     for item in raw_posts:
-        try:
-            trend = item.get("trend", "").strip()
-            text = clean_text(item.get("text", "").strip())
+        post = clean_post(item, seen, near_duplicates)
+        if post is not None:
+            yield post
 
-            if not trend or not text or len(text) < 15:
-                continue
 
-            key = (trend.lower(), text)
-            if key in seen:
-                continue
+def clean_and_validate_posts(raw_posts: Iterable[dict]) -> List[CleanedPost]:
+    return list(iter_clean_posts(raw_posts))
 
-            seen.add(key)
-            cleaned.append(CleanedPost(trend=trend, text=text))
 
+def iter_raw_posts(paths: Iterable[str]) -> Iterable[dict]:
+    """Lazily chain the records of several .json / .jsonl files."""
+    for path in paths:
+        print(f"📂 Loading file: {path}")
+        try:
+            yield from iter_records(path)
         except Exception as e:
-            print(f"❌ Error processing item: {item} → {e}")
+            print(f"❌ Error loading JSON file '{path}': {e}")
 
-    return cleaned
 
-
-def save_cleaned_json(posts: List[CleanedPost], path: Path):
-    with path.open("w", encoding="utf-8") as f:
-        json.dump([p.model_dump() for p in posts], f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved {len(posts)} cleaned posts to {path}")
+def save_cleaned_json(posts: Iterable[CleanedPost], path: Path):
+    """Write cleaned posts; a .jsonl path writes one record per line."""
+    with RecordWriter(path) as writer:
+        for p in posts:
+            writer.write(p.model_dump())
+    print(f"✅ Saved {writer.count} cleaned posts to {path}")
 
 
 if __name__ == "__main__":
-    input_paths = [
-        "src/data/generated_posts.json",
-        "src/data/generate_post_output_gpt-4.1-mini.json"
-    ]
-
-    all_raw = []
-    for path in input_paths:
-        print(f"📂 Loading file: {path}")
-        all_raw.extend(load_json_data(path))
-
-    final = clean_and_validate_posts(all_raw)
-    save_cleaned_json(final, Path("src/data/cleaned_posts.json"))
+    with NearDuplicateFilter() as near_duplicates:
+        final = iter_clean_posts(iter_raw_posts(CLEAN_INPUT_PATHS), near_duplicates)
+        save_cleaned_json(final, CLEANED_POSTS_PATH)
+    print(f"🧬 Dropped {near_duplicates.dropped} near duplicates (logged to {NEAR_DUPLICATES_PATH})")
@@ -0,0 +1,157 @@
+"""
+columnar.py
+Parquet backend of record_io (`.parquet` paths); needs the optional pyarrow.
+
+Records are buffered into row groups of ROW_GROUP_SIZE and written through a
+temporary file that is renamed on close, so readers never see a half-written
+file. The label columns (`trend`, `emotion` and the elements of the `sdg`
+list) are dictionary-encoded on disk and read back as Arrow dictionary
+arrays, which makes per-label aggregates a matter of counting small integer
+codes. Reads can be projected to the columns a query needs:
+
+    from src.utils.columnar import value_counts
+    value_counts(EMOTION_OUTPUT_PATH, "sdg")  # reads only the sdg column
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+PathLike = Union[str, Path]
+
+ROW_GROUP_SIZE = 65_536
+# Column -> Parquet leaf path of the values to dictionary-encode
+DICTIONARY_COLUMNS = {"trend": "trend", "emotion": "emotion", "sdg": "sdg.list.element"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Reading or writing .parquet record files needs pyarrow: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def is_parquet(path: PathLike) -> bool:
+    return Path(path).suffix.lower() == ".parquet"
+
+
+def _known_types(pa) -> dict:
+    # Fixed so that a first row group with only nulls in a column does not pin it to the null type
+    return {
+        "trend": pa.string(),
+        "text": pa.string(),
+        "sdg": pa.list_(pa.string()),
+        "emotion": pa.string(),
+    }
+
+
+class ParquetRecordWriter:
+    """
+    Backend of RecordWriter for `.parquet` paths. The columns are fixed by the
+    first row group: every key that appears in any of its records, in order of
+    first appearance. Records missing a column get null; a key that first
+    shows up in a later row group raises ValueError rather than being dropped.
+    """
+
+    def __init__(self, path: PathLike, row_group_size: int = ROW_GROUP_SIZE):
+        self.path = Path(path)
+        self.row_group_size = row_group_size
+        self._rows: List[dict] = []
+        self._schema = None
+        self._writer = None
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+
+    def open(self) -> None:
+        _pyarrow()  # fail before any work is done when pyarrow is missing
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, record: dict) -> None:
+        self._rows.append(record)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        pa, pq = _pyarrow()
+        keys = dict.fromkeys(key for row in self._rows for key in row)
+        if self._schema is None:
+            known = _known_types(pa)
+            fields = []
+            for key in keys:
+                column_type = known.get(key) or pa.array([row.get(key) for row in self._rows]).type
+                fields.append(pa.field(key, pa.string() if pa.types.is_null(column_type) else column_type))
+            self._schema = pa.schema(fields)
+            self._writer = pq.ParquetWriter(
+                self._tmp_path,
+                self._schema,
+                use_dictionary=[leaf for name, leaf in DICTIONARY_COLUMNS.items() if name in self._schema.names],
+            )
+        else:
+            unknown = [key for key in keys if key not in self._schema.names]
+            if unknown:
+                raise ValueError(
+                    f"Record keys {unknown} are not columns of '{self.path}' (fixed by the first "
+                    f"{self.row_group_size} records: {self._schema.names})"
+                )
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self._schema))
+        self._rows = []
+
+    def close(self) -> None:
+        if self._rows or self._writer is None:
+            if self._rows:
+                self._flush()
+            else:  # no records at all: an empty file with no columns
+                pa, pq = _pyarrow()
+                self._writer = pq.ParquetWriter(self._tmp_path, pa.schema([]))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._tmp_path.replace(self.path)
+
+
+def column_names(path: PathLike) -> List[str]:
+    """Columns of the file, from its footer alone."""
+    _, pq = _pyarrow()
+    return pq.read_schema(path).names
+
+
+def read_table(path: PathLike, columns: Optional[Sequence[str]] = None):
+    """The file as an Arrow table (only `columns` when given), label columns as dictionary arrays."""
+    pa, pq = _pyarrow()
+    schema_names = pq.read_schema(path).names
+    wanted = columns if columns is not None else schema_names
+    return pq.read_table(
+        path,
+        columns=list(columns) if columns is not None else None,
+        read_dictionary=[leaf for name, leaf in DICTIONARY_COLUMNS.items() if name in wanted and name in schema_names],
+    )
+
+
+def iter_records(path: PathLike, columns: Optional[Sequence[str]] = None) -> Iterator[dict]:
+    """Lazily yield records (dicts), one row group batch at a time."""
+    pa, pq = _pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=ROW_GROUP_SIZE, columns=list(columns) if columns else None):
+        yield from batch.to_pylist()
+
+
+def value_counts(path: PathLike, column: str) -> Counter:
+    """
+    Label -> count for one column, reading only that column; list columns
+    (`sdg`) count every element. Nulls are not counted, and a file without
+    the column (e.g. one written with no records) gives an empty Counter.
+    """
+    pa, _ = _pyarrow()
+    import pyarrow.compute as pc
+
+    if column not in column_names(path):
+        return Counter()
+    values = read_table(path, [column])[column]
+    if pa.types.is_list(values.type):
+        values = pc.list_flatten(values)
+    counter = Counter()
+    for item in pc.value_counts(values).to_pylist():
+        if item["values"] is not None:
+            counter[item["values"]] += item["counts"]
+    return counter
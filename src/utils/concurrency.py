@@ -0,0 +1,218 @@
+import asyncio
+from collections import deque
+from typing import (
+    AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+K = TypeVar("K", bound=Hashable)
+
+
+async def _aiter(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def map_ordered(
+    func: Callable[[T], Awaitable[R]],
+    items: Union[Iterable[T], AsyncIterable[T]],
+    limit: int,
+) -> AsyncIterator[R]:
+    """
+    Run `func` over `items` with at most `limit` calls in flight and yield the
+    results in input order as soon as they are ready.
+
+    Unlike `asyncio.gather`, items are pulled lazily and only a small window of
+    pending tasks is kept, so memory stays constant for arbitrarily long inputs.
+    """
+    sem = asyncio.Semaphore(limit)
+    window = max(1, limit * 4)
+    pending: deque = deque()
+
+    async def run(item: T) -> R:
+        async with sem:
+            return await func(item)
+
+    try:
+        async for item in _aiter(items):
+            pending.append(asyncio.ensure_future(run(item)))
+            if len(pending) >= window:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def batched(items: Union[Iterable[T], AsyncIterable[T]], size: int) -> AsyncIterator[List[T]]:
+    """Group a (possibly async) stream into lists of at most `size` items."""
+    batch: List[T] = []
+    async for item in _aiter(items):
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def iterate_in_thread(items: Iterable[T]) -> AsyncIterator[T]:
+    """Advance a blocking iterator (e.g. chunked CSV reads) in a worker thread so the loop stays free."""
+    iterator = iter(items)
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+class _Failure:
+    """Wraps an iterator's exception on its way through `merge`'s queue."""
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+async def merge(iterators: Iterable[AsyncIterator[T]], return_exceptions: bool = False) -> AsyncIterator[T]:
+    """
+    Consume several async iterators concurrently and yield their items in
+    arrival order. A failing iterator raises here (cancelling the others), or,
+    with `return_exceptions=True`, yields its exception as an item while the
+    others keep going.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def pump(iterator: AsyncIterator[T]) -> None:
+        try:
+            async for item in iterator:
+                queue.put_nowait(item)
+        except Exception as e:
+            queue.put_nowait(e if return_exceptions else _Failure(e))
+        finally:
+            queue.put_nowait(done)
+
+    tasks = [asyncio.ensure_future(pump(iterator)) for iterator in iterators]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Let the cancelled iterators run their own cleanup (closing streams) before we return
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class MicroBatcher(Generic[K, R]):
+    """
+    Collect items submitted concurrently (e.g. by independent HTTP requests)
+    into batches for `process(items) -> results`, which runs once `max_size`
+    items are waiting or `max_wait` seconds after the first of them arrived.
+    Identical items that are waiting or in flight share one result instead of
+    being processed twice.
+
+        batcher = MicroBatcher(classifier.classify_batch, max_size=10, max_wait=0.02)
+        result = await batcher.submit(text)
+
+    A failing batch raises its exception in every submitter of that batch.
+    Cancelling one submitter does not cancel the batch or the others.
+    """
+
+    def __init__(self, process: Callable[[List[K]], Awaitable[List[R]]], max_size: int = 10, max_wait: float = 0.02):
+        self.process = process
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self.coalesced = 0
+        self._futures: Dict[K, asyncio.Future] = {}  # waiting or in flight
+        self._waiting: List[K] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: K) -> R:
+        future = self._futures.get(item)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = self._futures[item] = loop.create_future()
+            future.add_done_callback(_consume_exception)
+            self._waiting.append(item)
+            if len(self._waiting) >= self.max_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self.flush)
+        return await asyncio.shield(future)
+
+    def flush(self) -> None:
+        """Start processing the waiting items now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._waiting:
+            return
+        batch, self._waiting = self._waiting, []
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[K]) -> None:
+        futures = [self._futures[item] for item in batch]
+        try:
+            results = await self.process(batch)
+            if len(results) != len(batch):
+                raise ValueError(f"Batch of {len(batch)} items returned {len(results)} results")
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            for item in batch:
+                self._futures.pop(item, None)
+
+    async def close(self) -> None:
+        """Process whatever is still waiting and wait for the batches in flight."""
+        self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "coalesced": self.coalesced,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # The submitters may all be gone (cancelled); don't log "exception was never retrieved"
+    if not future.cancelled():
+        future.exception()
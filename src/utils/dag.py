@@ -0,0 +1,263 @@
+"""
+dag.py
+Small asyncio DAG runner for the pipeline stages.
+
+Every stage is an async generator function `run(source) -> records`: it reads
+the records of its upstream stages from `source` and yields its own. Records
+flow between stages through bounded in-memory queues, so all stages of a run
+execute concurrently: a downstream stage starts on the first record its
+upstream yields, and stages that do not depend on each other simply overlap.
+Each stage's records are also written to its `output` file as they are
+produced, so the standalone scripts keep working on the same files.
+
+A stage is skipped when its fingerprint (name, config, external input files,
+upstream fingerprints) matches the last successful run recorded in the
+manifest and its output file is untouched since. A skipped stage whose records
+are needed downstream is replayed from its output file.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from src.utils.metrics import SIZE_BUCKETS, metrics
+from src.utils.record_io import RecordWriter, aiter_records
+
+PathLike = Union[str, Path]
+StageFunc = Callable[[AsyncIterator[dict]], AsyncIterator[dict]]
+
+QUEUE_SIZE = 1_000  # records buffered per edge before a fast producer waits for its consumer
+
+_END = object()
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        run: StageFunc,
+        deps: Sequence[str] = (),
+        output: Optional[PathLike] = None,
+        inputs: Sequence[PathLike] = (),
+        config: Optional[dict] = None,
+    ):
+        """
+        - deps: upstream stage names; their records are merged into `source`.
+        - output: file the stage's records are written to (required for skipping).
+        - inputs: external files the stage reads itself (fingerprinted).
+        - config: settings that change the result (model, batch size, ...).
+        """
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.output = Path(output) if output else None
+        self.inputs = [Path(path) for path in inputs]
+        self.config = config or {}
+
+
+def _file_state(path: Path) -> Optional[List[int]]:
+    """(size, mtime_ns): cheap change detection, even for multi-GB inputs."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Pipeline:
+    def __init__(self, stages: Iterable[Stage], manifest_path: PathLike, queue_size: int = QUEUE_SIZE):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.manifest_path = Path(manifest_path)
+        self.queue_size = queue_size
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if name not in self.stages:
+                raise ValueError(f"Stage '{path[-1]}' depends on unknown stage '{name}'")
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + (name,))}")
+            state[name] = "visiting"
+            for dep in self.stages[name].deps:
+                visit(dep, path + (name,))
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    # -------------------------------------------------------------------------
+    # Change detection
+    # -------------------------------------------------------------------------
+
+    def fingerprints(self) -> Dict[str, str]:
+        fingerprints: Dict[str, str] = {}
+        for name in self.order:
+            stage = self.stages[name]
+            payload = {
+                "name": name,
+                "config": stage.config,
+                "inputs": {str(path): _file_state(path) for path in stage.inputs},
+                "deps": [fingerprints[dep] for dep in stage.deps],
+            }
+            canonical = json.dumps(payload, sort_keys=True, default=str)
+            fingerprints[name] = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return fingerprints
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self, manifest: dict) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        tmp.replace(self.manifest_path)
+
+    def _is_fresh(self, stage: Stage, fingerprint: str, manifest: dict) -> bool:
+        entry = manifest.get(stage.name)
+        if not entry or stage.output is None:
+            return False
+        return entry.get("fingerprint") == fingerprint and entry.get("output") == _file_state(stage.output)
+
+    def plan(self, targets: Optional[Iterable[str]] = None, force: Iterable[str] = ()) -> Tuple[List[str], List[str]]:
+        """
+        (stages to run, skipped stages to replay from their output file), both
+        in topological order. `targets` limits the run to those stages and
+        their ancestors; a stage runs when it is forced, stale, or fed by a
+        stage that runs.
+        """
+        selected: Set[str] = set()
+        pending = list(targets) if targets is not None else list(self.stages)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.stages[name].deps)
+
+        force = set(force)
+        unknown = force - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {sorted(unknown)}")
+
+        fingerprints = self.fingerprints()
+        manifest = self._load_manifest()
+        run: List[str] = []
+        for name in self.order:
+            if name not in selected:
+                continue
+            stage = self.stages[name]
+            if (
+                name in force
+                or not self._is_fresh(stage, fingerprints[name], manifest)
+                or any(dep in run for dep in stage.deps)
+            ):
+                run.append(name)
+
+        replay = [
+            name for name in self.order
+            if name not in run and any(name in self.stages[r].deps for r in run)
+        ]
+        return run, replay
+
+    # -------------------------------------------------------------------------
+    # Execution
+    # -------------------------------------------------------------------------
+
+    async def run(self, targets: Optional[Iterable[str]] = None, force: Iterable[str] = ()) -> Dict[str, dict]:
+        """Run the plan; returns per-stage stats (status, records, seconds)."""
+        run, replay = self.plan(targets, force)
+        fingerprints = self.fingerprints()
+        manifest = self._load_manifest()
+        stats: Dict[str, dict] = {
+            name: {"status": "skipped", "records": manifest.get(name, {}).get("records"), "seconds": 0.0}
+            for name in self.order if name not in run
+        }
+        if not run:
+            return stats
+
+        inboxes = {name: asyncio.Queue(maxsize=self.queue_size) for name in run}
+        consumers = {
+            name: [r for r in run if name in self.stages[r].deps]
+            for name in run + replay
+        }
+
+        async def source(name: str) -> AsyncIterator[dict]:
+            remaining = len(self.stages[name].deps)
+            inbox = inboxes[name]
+            while remaining:
+                record = await inbox.get()
+                if record is _END:
+                    remaining -= 1
+                else:
+                    yield record
+
+        async def publish(name: str, records: AsyncIterator[dict], writer: Optional[RecordWriter]) -> int:
+            count = 0
+            async for record in records:
+                if writer is not None:
+                    writer.write(record)
+                for consumer in consumers[name]:
+                    inbox = inboxes[consumer]
+                    metrics.observe("pipeline_queue_depth", inbox.qsize(), SIZE_BUCKETS, stage=consumer)
+                    await inbox.put(record)
+                count += 1
+            # On failure there is no end marker: the whole run is cancelled instead
+            for consumer in consumers[name]:
+                await inboxes[consumer].put(_END)
+            return count
+
+        async def run_stage(name: str) -> None:
+            stage = self.stages[name]
+            start = time.perf_counter()
+            if stage.output is not None:
+                with RecordWriter(stage.output) as writer:
+                    count = await publish(name, stage.run(source(name)), writer)
+            else:
+                count = await publish(name, stage.run(source(name)), None)
+            seconds = time.perf_counter() - start
+            stats[name] = {"status": "ran", "records": count, "seconds": round(seconds, 3)}
+            metrics.record_stage(name, count, seconds)
+            if stage.output is not None:
+                manifest[name] = {
+                    "fingerprint": fingerprints[name],
+                    "output": _file_state(stage.output),
+                    "records": count,
+                }
+                self._save_manifest(manifest)
+
+        async def replay_stage(name: str) -> None:
+            start = time.perf_counter()
+            count = await publish(name, aiter_records(self.stages[name].output), None)
+            stats[name] = {"status": "replayed", "records": count, "seconds": round(time.perf_counter() - start, 3)}
+
+        tasks = [asyncio.ensure_future(replay_stage(name)) for name in replay]
+        tasks += [asyncio.ensure_future(run_stage(name)) for name in run]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()  # re-raise the first failure
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return stats
@@ -0,0 +1,116 @@
+"""
+http_pool.py
+Process-wide registry of pooled httpx.AsyncClient instances.
+
+Every LLMClient talking to the same endpoint with the same API key shares one
+keep-alive connection pool (HTTP/2 when the optional `h2` package is
+installed) instead of opening its own. Pools are reference counted: the last
+`release` closes the pool. httpx clients are bound to the event loop they run
+on, so the loop is part of the key.
+"""
+
+import asyncio
+import importlib.util
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+POOL_SETTINGS = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "http2": importlib.util.find_spec("h2") is not None,  # pip install httpx[http2]
+}
+
+
+def configure_pool(**settings) -> None:
+    """Override pool limits (max_connections, max_keepalive_connections, keepalive_expiry, http2)."""
+    unknown = set(settings) - set(POOL_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown pool settings: {sorted(unknown)}")
+    POOL_SETTINGS.update(settings)
+
+
+class _PoolEntry:
+    __slots__ = ("client", "loop", "refs")
+
+    def __init__(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        self.client = client
+        self.loop = loop
+        self.refs = 0
+
+
+class ClientRegistry:
+    def __init__(self):
+        self._pools: Dict[Tuple[int, str, str], _PoolEntry] = {}
+
+    @staticmethod
+    def _key(loop: asyncio.AbstractEventLoop, base_url: str, api_key: str) -> Tuple[int, str, str]:
+        parts = urlsplit(base_url)
+        return id(loop), f"{parts.scheme}://{parts.netloc}", api_key
+
+    def acquire(self, base_url: str, api_key: str, headers: Optional[dict] = None) -> httpx.AsyncClient:
+        """Shared client for (running loop, endpoint origin, key); must be called inside a loop."""
+        loop = asyncio.get_running_loop()
+        key = self._key(loop, base_url, api_key)
+        entry = self._pools.get(key)
+        if entry is None or entry.client.is_closed:
+            limits = httpx.Limits(
+                max_connections=POOL_SETTINGS["max_connections"],
+                max_keepalive_connections=POOL_SETTINGS["max_keepalive_connections"],
+                keepalive_expiry=POOL_SETTINGS["keepalive_expiry"],
+            )
+            client = httpx.AsyncClient(headers=headers, limits=limits, http2=POOL_SETTINGS["http2"])
+            entry = self._pools[key] = _PoolEntry(client, loop)
+        entry.refs += 1
+        return entry.client
+
+    def _drop(self, client: httpx.AsyncClient) -> Optional[_PoolEntry]:
+        """Drop one reference; returns the entry (now unregistered) if it was the last one."""
+        for key, entry in list(self._pools.items()):
+            if entry.client is client:
+                entry.refs -= 1
+                if entry.refs <= 0:
+                    return self._pools.pop(key)
+                return None
+        return None
+
+    async def release(self, client: httpx.AsyncClient) -> None:
+        """Drop one reference; the pool is closed once nobody holds it any more."""
+        entry = self._drop(client)
+        if entry is not None:
+            await self._close(entry)
+
+    def release_stale(self, client: httpx.AsyncClient) -> None:
+        """
+        `release` for a client of a loop that is no longer running (nothing can
+        be awaited on it); an unreferenced pool is unregistered and left to GC.
+        """
+        self._drop(client)
+
+    async def close_all(self) -> None:
+        entries = list(self._pools.values())
+        self._pools.clear()
+        for entry in entries:
+            await self._close(entry)
+
+    @staticmethod
+    async def _close(entry: _PoolEntry) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        # A pool whose loop is gone (e.g. after asyncio.run returned) cannot be awaited; let GC reclaim it
+        if running is entry.loop:
+            await entry.client.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "pools": len(self._pools),
+            "references": sum(entry.refs for entry in self._pools.values()),
+            "http2": POOL_SETTINGS["http2"],
+        }
+
+
+registry = ClientRegistry()
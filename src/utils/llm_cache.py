@@ -0,0 +1,165 @@
+"""
+llm_cache.py
+Persistent, content-addressed cache for LLM completions.
+
+Entries are keyed by a SHA-256 of the full request payload (model, sampling
+params and messages), stored in SQLite, expire after a TTL and are evicted
+least-recently-used once the cache holds more than `max_entries` rows.
+Callers pass `validate` to `LLMClient.call` so that only completions they
+could parse are stored (a malformed one is requested again, not replayed).
+
+Set LLM_CACHE_DISABLED=1 (or pass enabled=False / use_cache=False to
+`LLMClient.call`) to bypass the cache entirely.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).parents[1] / "data" / "cache" / "llm_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+class LLMCache:
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        enabled: Optional[bool] = None,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        if enabled is None:
+            enabled = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                " key TEXT PRIMARY KEY,"
+                " content TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_completions_last_access ON completions(last_access)"
+            )
+            self._conn.commit()
+            self._size = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def make_key(payload: dict) -> str:
+        """Hash of the canonical JSON payload (model + params + prompt)."""
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT content, created_at FROM completions WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+        content, created_at = row
+        if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+            conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            conn.commit()
+            self._size -= 1
+            self.misses += 1
+            return None
+        conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+        conn.commit()
+        self.hits += 1
+        return content
+
+    def set(self, key: str, content: str) -> None:
+        if not self.enabled:
+            return
+        conn = self._connect()
+        now = time.time()
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO completions (key, content, created_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, content, now, now),
+        )
+        if cursor.rowcount:
+            self._size += 1
+        else:
+            conn.execute(
+                "UPDATE completions SET content = ?, created_at = ?, last_access = ? WHERE key = ?",
+                (content, now, now, key),
+            )
+        if self._size > self.max_entries:
+            self._evict(conn, self._size - self.max_entries)
+        conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, count: int) -> None:
+        """Drop the `count` least recently used entries."""
+        conn.execute(
+            "DELETE FROM completions WHERE key IN "
+            "(SELECT key FROM completions ORDER BY last_access ASC LIMIT ?)",
+            (count,),
+        )
+        self._size -= count
+
+    def purge_expired(self) -> int:
+        if self.ttl_seconds is None:
+            return 0
+        conn = self._connect()
+        cursor = conn.execute(
+            "DELETE FROM completions WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        conn.commit()
+        self._size -= cursor.rowcount
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM completions")
+        conn.commit()
+        self._size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_default_cache: Optional[LLMCache] = None
+
+
+def get_default_cache() -> LLMCache:
+    """Process-wide cache shared by every client that opts in."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMCache()
+    return _default_cache
@@ -1,19 +1,48 @@
+import asyncio
+import os
+import time
 import httpx
-from typing import Optional
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
 from pydantic import BaseModel
+from src.utils.http_pool import registry
+from src.utils.llm_cache import LLMCache
+from src.utils.metrics import metrics
 from src.utils.model_loader import get_model_config
+from src.utils.request_scheduler import (
+    RateLimitError,
+    RequestScheduler,
+    RetryableError,
+    get_scheduler,
+    parse_retry_after,
+)
 import json
 
 
+# Override to point every client at another OpenAI-compatible server (e.g. src/benchmarks/mock_openrouter.py)
+DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+
+
 class LLMResponse(BaseModel):
     role: str
     content: str
 
 
+class StreamInterruptedError(Exception):
+    """A stream failed after some deltas were already yielded, so it cannot be retried transparently."""
+
+
 class LLMClient:
-    def __init__(self, api_key: str, model: str):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        cache: Optional[LLMCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.api_key = api_key
         self.model = model
+        self.cache = cache  # None disables caching for this client
+        self.scheduler = scheduler or get_scheduler(model)  # shared per model by default
         self.config = get_model_config(model)
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -21,10 +50,43 @@ class LLMClient:
             "HTTP-Referer": "https://github.com/mahgol/social-computing-project",
             "X-Title": "social_computing_project"
         }
-        self.base_url = f"https://openrouter.ai/api/v1/{self.config['endpoint']}"
-        self.client = httpx.AsyncClient(headers=self.headers)
+        base_url = os.getenv("OPENROUTER_BASE_URL") or DEFAULT_BASE_URL
+        self.base_url = f"{base_url.rstrip('/')}/{self.config['endpoint']}"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pooled = False
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared connection pool from the registry, acquired lazily on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or (self._pooled and self._client_loop is not loop):
+            if self._client is not None:
+                registry.release_stale(self._client)  # bound to a previous loop (e.g. an earlier asyncio.run)
+            self._client = registry.acquire(self.base_url, self.api_key, self.headers)
+            self._client_loop = loop
+            self._pooled = True
+        return self._client
 
-    async def call(self, prompt: str, **overrides) -> Optional[str]:
+    @client.setter
+    def client(self, client: httpx.AsyncClient) -> None:
+        # Explicitly injected clients (custom transports, tests) are owned by this LLMClient
+        self._client = client
+        self._client_loop = None
+        self._pooled = False
+
+    @staticmethod
+    def _parse_content(content: str):
+        try:
+            return json.loads(content.strip())  #   Parse JSON response
+        except json.JSONDecodeError:
+            return content.strip()  # Return raw content if JSON parsing fails
+
+    @property
+    def supports_streaming(self) -> bool:
+        return bool(self.config.get("supports_streaming"))
+
+    def _build_payload(self, prompt: str, overrides: dict) -> dict:
         payload = {"model": self.model, "messages": [{"role": "user", "content": prompt}]}
         for key in self.config.get("supported_params", []):
             default_key = f"default_{key}"
@@ -32,25 +94,236 @@ class LLMClient:
             value = overrides.get(key, default)
             if value is not None:
                 payload[key] = value
+        return payload
+
+    def _is_valid(self, content: str, validate: Optional[Callable[[Any], Any]]) -> bool:
+        """Whether the caller accepts `content` (`validate` raises on the parsed content otherwise)."""
+        if validate is None:
+            return True
         try:
-            resp = await self.client.post(self.base_url, json=payload, timeout=30)
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            try:
-                return json.loads(content.strip())  #   Parse JSON response
-            except json.JSONDecodeError:
-                return content.strip()  # Return raw content if JSON parsing fails
+            validate(self._parse_content(content))
+        except Exception:
+            return False
+        return True
+
+    def _lookup_cache(
+        self, payload: dict, use_cache: bool, validate: Optional[Callable[[Any], Any]] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """(cache key, cached completion); the key is None when caching is off for this call."""
+        if self.cache is None or not use_cache or not self.cache.enabled:
+            return None, None
+        cache_key = self.cache.make_key(payload)
+        cached = self.cache.get(cache_key)
+        if cached is not None and not self._is_valid(cached, validate):
+            cached = None  # stored before completions were validated; ask again
+        if cached is not None:
+            metrics.inc("llm_cache_hits_total", model=self.model)
+        else:
+            metrics.inc("llm_cache_misses_total", model=self.model)
+        return cache_key, cached
+
+    async def call(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        validate: Optional[Callable[[Any], Any]] = None,
+        **overrides
+    ) -> Optional[str]:
+        """
+        Completion for `prompt` (parsed as JSON when possible), or None on error.
+
+        `validate` is called with the parsed completion and raises if the
+        caller cannot use it; only completions that pass are cached, so a
+        malformed answer is requested again on the next call instead of
+        being replayed from the cache.
+        """
+        payload = self._build_payload(prompt, overrides)
+        start = time.perf_counter()
+        cache_key, cached = self._lookup_cache(payload, use_cache, validate)
+        if cached is not None:
+            self._record_call(start, "cache")
+            return self._parse_content(cached)
+
+        try:
+            content = await self.scheduler.run(
+                lambda: self._post(payload),
+                estimated_tokens=self._estimate_tokens(prompt),
+            )
+            if cache_key is not None and self._is_valid(content, validate):
+                self.cache.set(cache_key, content)
+            self._record_call(start, "ok")
+            return self._parse_content(content)
         except Exception as e:
+            self._record_call(start, "error")
             print(f"❌ LLM call error: {e}")
             return None
 
+    async def stream(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        validate: Optional[Callable[[Any], Any]] = None,
+        **overrides
+    ) -> AsyncIterator[str]:
+        """
+        Yield the completion as text deltas while the model is still generating.
+
+        Shares the cache, the scheduler (window, budgets, retries) and the
+        metrics of `call`. A failure before the first delta is retried as
+        usual; one after it raises StreamInterruptedError, since the partial
+        text was already consumed. Unlike `call`, errors are raised instead of
+        returned as None. Models without `supports_streaming` and cache hits
+        yield the whole completion as a single delta. As with `call`, the
+        full completion is only cached if `validate` accepts it.
+        """
+        payload = self._build_payload(prompt, overrides)
+        start = time.perf_counter()
+        cache_key, cached = self._lookup_cache(payload, use_cache, validate)
+        if cached is not None:
+            self._record_call(start, "cache")
+            yield cached
+            return
+
+        deltas: asyncio.Queue = asyncio.Queue()
+
+        async def request() -> str:
+            if self.supports_streaming:
+                return await self._post_stream(payload, deltas.put_nowait)
+            content = await self._post(payload)
+            deltas.put_nowait(content)
+            return content
+
+        task = asyncio.ensure_future(
+            self.scheduler.run(request, estimated_tokens=self._estimate_tokens(prompt))
+        )
+        task.add_done_callback(lambda _: deltas.put_nowait(None))  # after the last delta
+        first = True
+        try:
+            while True:
+                delta = await deltas.get()
+                if delta is None:
+                    break
+                if first:
+                    metrics.observe("llm_first_token_seconds", time.perf_counter() - start, model=self.model)
+                    first = False
+                yield delta
+            content = task.result()
+        except Exception:
+            self._record_call(start, "error")
+            raise
+        finally:
+            task.cancel()  # no-op once finished; stops the request if the consumer bails out early
+
+        if cache_key is not None and self._is_valid(content, validate):
+            self.cache.set(cache_key, content)
+        self._record_call(start, "ok")
+
+    def _record_call(self, start: float, result: str) -> None:
+        metrics.inc("llm_calls_total", model=self.model, result=result)
+        metrics.observe("llm_call_seconds", time.perf_counter() - start, model=self.model, result=result)
+
+    @staticmethod
+    def _estimate_tokens(prompt: str) -> int:
+        return len(prompt) // 4 + 1  # ~4 characters per token
+
+    async def _post(self, payload: dict) -> str:
+        """Send one request, turning throttling and transient failures into retryable errors."""
+        start = time.perf_counter()
+        try:
+            resp = await self.client.post(self.base_url, json=payload, timeout=30)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            self._record_request(start, type(e).__name__)
+            raise RetryableError(f"{type(e).__name__}: {e}") from e
+        self._record_request(start, str(resp.status_code))
+        self._check_status(resp)
+
+        data = resp.json()
+        self._record_usage(payload, data.get("usage"))
+        return data["choices"][0]["message"]["content"]
+
+    async def _post_stream(self, payload: dict, emit: Callable[[str], None]) -> str:
+        """
+        Send one streaming request, passing each content delta of the
+        server-sent events to `emit`; returns the full completion.
+        """
+        start = time.perf_counter()
+        parts = []
+        usage = None
+        resp = None
+        try:
+            async with self.client.stream("POST", self.base_url, json={**payload, "stream": True}, timeout=30) as resp:
+                self._record_request(start, str(resp.status_code))
+                self._check_status(resp)
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue  # blank separators, ": keep-alive" comments
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    if chunk.get("error"):
+                        raise RetryableError(f"Provider error mid-stream for {self.model}: {chunk['error']}")
+                    usage = chunk.get("usage") or usage
+                    for choice in chunk.get("choices") or []:
+                        delta = (choice.get("delta") or {}).get("content")
+                        if delta:
+                            parts.append(delta)
+                            emit(delta)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            if resp is None:
+                self._record_request(start, type(e).__name__)  # failed before any response headers
+            if parts:
+                raise StreamInterruptedError(f"Stream from {self.model} broke after partial output: {e}") from e
+            raise RetryableError(f"{type(e).__name__}: {e}") from e
+        except RetryableError as e:
+            if parts:
+                raise StreamInterruptedError(f"Stream from {self.model} broke after partial output: {e}") from e
+            raise
+
+        self._record_usage(payload, usage)
+        return "".join(parts)
+
+    def _check_status(self, resp: httpx.Response) -> None:
+        if resp.status_code == 429:
+            raise RateLimitError(
+                f"Rate limited by provider for {self.model}",
+                retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+            )
+        if resp.status_code >= 500 or resp.status_code == 408:
+            raise RetryableError(f"HTTP {resp.status_code} from provider for {self.model}")
+        resp.raise_for_status()
+
+    def _record_usage(self, payload: dict, usage: Optional[dict]) -> None:
+        usage = usage or {}
+        for direction in ("prompt", "completion"):
+            if usage.get(f"{direction}_tokens") is not None:
+                metrics.inc("llm_tokens_total", usage[f"{direction}_tokens"], model=self.model, direction=direction)
+        self.scheduler.record_usage(
+            self._estimate_tokens(payload["messages"][-1]["content"]),
+            usage.get("total_tokens"),
+        )
+
+    def _record_request(self, start: float, status: str) -> None:
+        metrics.inc("llm_requests_total", model=self.model, status=status)
+        metrics.observe("llm_request_seconds", time.perf_counter() - start, model=self.model)
+
     async def close(self):
-        await self.client.aclose()
+        """Release this client's reference to the shared pool (or close an injected client)."""
+        client, self._client = self._client, None
+        if client is None:
+            return
+        if self._pooled:
+            await registry.release(client)
+        else:
+            await client.aclose()
 
     def call_sync(self, prompt: str, **kwargs) -> str:
-        import asyncio
-        return asyncio.run(self.call(prompt, **kwargs))
+        async def run():
+            try:
+                return await self.call(prompt, **kwargs)
+            finally:
+                await self.close()  # the pool belongs to this short-lived loop
+        return asyncio.run(run())
 
     def close_sync(self):
-        import asyncio
         asyncio.run(self.close())
\ No newline at end of file
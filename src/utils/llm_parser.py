@@ -66,3 +66,132 @@ def normalize_output(data: dict, fields_to_listify: List[str]) -> dict:
         if key in data and not isinstance(data[key], list):
             data[key] = [data[key]]
     return data
+
+
+def extract_json_array(response) -> Optional[list]:
+    """
+    Pull a JSON array out of an LLM response that may already be parsed,
+    wrapped in a ```json fence, or surrounded by explanatory text.
+    """
+    if isinstance(response, list):
+        return response
+    if isinstance(response, dict):
+        # Some models wrap the array: {"results": [...]}
+        for value in response.values():
+            if isinstance(value, list):
+                return value
+        return None
+    if not isinstance(response, str):
+        return None
+
+    cleaned = clean_json_string(response)
+    start, end = cleaned.find("["), cleaned.rfind("]") + 1
+    if start < 0 or end <= start:
+        return None
+    try:
+        parsed = json.loads(cleaned[start:end])
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
+def extract_json_object(response) -> Optional[dict]:
+    """Pull a single JSON object out of an LLM response (already parsed or raw text)."""
+    if isinstance(response, dict):
+        return response
+    if not isinstance(response, str):
+        return None
+
+    cleaned = clean_json_string(response)
+    start, end = cleaned.find("{"), cleaned.rfind("}") + 1
+    if start < 0 or end <= start:
+        return None
+    try:
+        parsed = json.loads(cleaned[start:end])
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def align_batch_items(items: list, size: int, id_key: str = "id") -> List[Optional[dict]]:
+    """
+    Map the elements of a batched (numbered) LLM answer back to input positions.
+
+    Elements carrying a 1-based `id` are placed by id; if the model dropped the
+    ids but returned exactly `size` objects, they are taken in order. Missing or
+    malformed positions are None.
+    """
+    aligned: List[Optional[dict]] = [None] * size
+    dicts = [item for item in items if isinstance(item, dict)]
+    if all(isinstance(item.get(id_key), int) for item in dicts) and dicts:
+        for item in dicts:
+            idx = item[id_key] - 1
+            if 0 <= idx < size and aligned[idx] is None:
+                aligned[idx] = item
+    elif len(items) == size:
+        aligned = [item if isinstance(item, dict) else None for item in items]
+    return aligned
+
+
+def check_complete(results: list) -> None:
+    """Raise ValueError if a batched answer left any position missing or invalid (for `LLMClient.call(validate=...)`)."""
+    missing = sum(1 for result in results if result is None)
+    if missing:
+        raise ValueError(f"{missing} of {len(results)} batch items missing or invalid")
+
+
+class JSONStringArrayStream:
+    """
+    Incremental parser for a streamed JSON array of strings.
+
+    Feed completion deltas as they arrive; every string element of the
+    top-level array is returned as soon as its closing quote is seen. Text
+    before the first opening bracket (a ```json fence, a preamble) is skipped,
+    and strings inside nested arrays or objects are ignored.
+
+        parser = JSONStringArrayStream()
+        for delta in deltas:
+            for text in parser.feed(delta):
+                ...
+    """
+
+    def __init__(self):
+        self.stack: List[str] = []  # open brackets; ["["] means directly inside the top-level array
+        self.closed = False  # top-level array finished, the rest is ignored
+        self.in_string = False
+        self.escaped = False
+        self.literal: List[str] = []  # current top-level string, raw JSON incl. quotes
+
+    def feed(self, chunk: str) -> List[str]:
+        elements = []
+        for char in chunk:
+            if self.closed:
+                break
+            top_level = len(self.stack) == 1
+            if self.in_string:
+                if top_level:
+                    self.literal.append(char)
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if top_level:
+                        try:
+                            elements.append(json.loads("".join(self.literal)))
+                        except json.JSONDecodeError:
+                            pass
+                        self.literal = []
+            elif not self.stack:
+                if char == "[":
+                    self.stack.append(char)
+            elif char == '"':
+                self.in_string = True
+                self.literal = [char] if top_level else []
+            elif char in "[{":
+                self.stack.append(char)
+            elif char in "]}":
+                self.stack.pop()
+                self.closed = not self.stack
+        return elements
@@ -0,0 +1,274 @@
+"""
+metrics.py
+Process-wide counters, gauges and latency histograms.
+
+The LLM client, the request scheduler and the pipeline runner record into the
+shared `metrics` object; every entry point dumps it at the end of a run as
+JSON (with p50/p95/p99 per histogram) and as Prometheus text exposition, and
+prints a one-line-per-model summary.
+
+    from src.utils.metrics import metrics
+    metrics.inc("llm_cache_hits_total", model=model)
+    with metrics.timer("llm_call_seconds", model=model):
+        ...
+    metrics.dump(LOGS_DIR / "sdg_metrics")  # -> sdg_metrics.json + sdg_metrics.prom
+"""
+
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Seconds; covers cache hits (sub-ms) up to slow completions with retries
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Queue depths / counts
+SIZE_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+HELP = {
+    "llm_call_seconds": "End-to-end LLMClient.call latency incl. queueing and retries",
+    "llm_request_seconds": "Latency of a single HTTP attempt (up to the response headers when streaming)",
+    "llm_first_token_seconds": "Time from LLMClient.stream to its first delta, incl. queueing and retries",
+    "llm_queue_wait_seconds": "Time a request waited for a concurrency slot or rate budget",
+    "llm_tokens_total": "Tokens reported by the provider",
+    "llm_requests_total": "HTTP attempts by outcome",
+    "llm_calls_total": "LLMClient.call invocations by result",
+    "llm_retries_total": "Retried attempts",
+    "llm_rate_limited_total": "HTTP 429 responses",
+    "llm_cache_hits_total": "Completions served from the LLM cache",
+    "llm_cache_misses_total": "Completions not found in the LLM cache",
+    "llm_in_flight": "Requests currently holding a scheduler slot",
+    "llm_waiting": "Requests waiting for a scheduler slot",
+    "llm_concurrency_window": "Current AIMD concurrency window",
+    "pipeline_queue_depth": "Depth of a stage's input queue, sampled on every put",
+    "pipeline_stage_records": "Records produced by a stage",
+    "pipeline_stage_seconds": "Wall time of a stage",
+    "pipeline_stage_records_per_second": "Stage throughput",
+    "http_request_seconds": "Latency of the serving app's requests by endpoint",
+    "http_requests_total": "Serving app requests by endpoint and status",
+    "response_cache_lookups_total": "ResponseCache lookups by result (hit, generic fallback, miss)",
+    "incremental_responses_regenerated_total": "Responses regenerated by run_incremental_update (the rest were carried over)",
+}
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else min(self.min, self.bounds[0])
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "min": round(self.min, 6) if self.count else None,
+            "max": round(self.max, 6) if self.count else None,
+            **{f"p{int(q * 100)}": _round(self.quantile(q)) for q in (0.5, 0.95, 0.99)},
+            "buckets": {
+                _format_value(bound): sum(self.counts[: i + 1])
+                for i, bound in enumerate(self.bounds + (math.inf,))
+            },
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 6) if value is not None else None
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_stage(self, stage: str, records: int, seconds: float) -> None:
+        self.set("pipeline_stage_records", records, stage=stage)
+        self.set("pipeline_stage_seconds", round(seconds, 6), stage=stage)
+        self.set("pipeline_stage_records_per_second", round(records / seconds, 3) if seconds > 0 else 0.0, stage=stage)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    # -------------------------------------------------------------------------
+    # Export
+    # -------------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self.counters.items()
+                },
+                "gauges": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self.gauges.items()
+                },
+                "histograms": {
+                    name: [{"labels": dict(key), **histogram.summary()} for key, histogram in series.items()]
+                    for name, series in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for kind, families in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in sorted(families.items()):
+                    if name in HELP:
+                        lines.append(f"# HELP {name} {HELP[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in series.items():
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self.histograms.items()):
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.bounds + (math.inf,), histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path_stem: Union[str, Path]) -> Tuple[Path, Path]:
+        """Write `<stem>.json` and `<stem>.prom`; returns both paths."""
+        path_stem = Path(path_stem)
+        path_stem.parent.mkdir(parents=True, exist_ok=True)
+        json_path = path_stem.with_name(path_stem.name + ".json")
+        prom_path = path_stem.with_name(path_stem.name + ".prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+    def _total(self, name: str, **labels) -> float:
+        wanted = set(_labels(labels))
+        return sum(value for key, value in self.counters.get(name, {}).items() if wanted <= set(key))
+
+    def model_summary(self) -> List[str]:
+        """One human-readable line per model: calls, latency percentiles, tokens, retries, cache hit rate."""
+        lines = []
+        with self._lock:
+            calls = self.histograms.get("llm_call_seconds", {})
+            for model in sorted({dict(key).get("model", "") for key in calls}):
+                merged = Histogram()
+                for key, histogram in calls.items():
+                    if dict(key).get("model") == model:
+                        merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                        merged.count += histogram.count
+                        merged.sum += histogram.sum
+                        merged.min = min(merged.min, histogram.min)
+                        merged.max = max(merged.max, histogram.max)
+
+                hits = self._total("llm_cache_hits_total", model=model)
+                lookups = hits + self._total("llm_cache_misses_total", model=model)
+                line = (
+                    f"{model}: {merged.count} calls, "
+                    f"p50 {merged.quantile(0.5):.2f}s p95 {merged.quantile(0.95):.2f}s, "
+                    f"tokens in/out {int(self._total('llm_tokens_total', model=model, direction='prompt'))}"
+                    f"/{int(self._total('llm_tokens_total', model=model, direction='completion'))}, "
+                    f"retries {int(self._total('llm_retries_total', model=model))}"
+                )
+                if lookups:
+                    line += f", cache hit rate {hits / lookups:.0%}"
+                lines.append(line)
+        return lines
+
+    def report(self, path_stem: Union[str, Path]) -> None:
+        """End-of-run hook for the entry points: print the per-model summary and dump both formats."""
+        for line in self.model_summary():
+            print(f"📈 {line}")
+        json_path, prom_path = self.dump(path_stem)
+        print(f"📈 Metrics saved to {json_path} and {prom_path}")
+
+metrics = Metrics()
@@ -1,12 +1,26 @@
 # src/utils/model_loader.py
 import json
+import os
 from pathlib import Path
+from typing import Dict, Tuple
 
 CONFIG_PATH = Path(__file__).parents[1] / "configs" / "model_configs.json"
 
+# path -> (mtime_ns, parsed configs); re-parsed only when the file changes
+_CONFIG_CACHE: Dict[Path, Tuple[int, dict]] = {}
+
+
+def load_model_configs(path: Path = CONFIG_PATH) -> dict:
+    mtime = os.stat(path).st_mtime_ns
+    cached = _CONFIG_CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = _CONFIG_CACHE[path] = (mtime, json.load(f))
+    return cached[1]
+
+
 def get_model_config(model_name: str) -> dict:
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        configs = json.load(f)
+    configs = load_model_configs()
     if model_name not in configs:
         raise ValueError(f"Model config for '{model_name}' not found.")
     return configs[model_name]
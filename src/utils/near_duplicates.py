@@ -0,0 +1,155 @@
+"""
+near_duplicates.py
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+Every text is normalized with `clean_text` and cut into shingles (overlapping
+5-character windows); NUM_PERM min-hashes of the shingle set form its signature,
+and the share of equal positions in two signatures estimates their Jaccard
+similarity. The signature is split into BANDS bands of NUM_PERM / BANDS rows,
+and only texts that share at least one identical band (within the same scope,
+e.g. a trend) are compared at all. Only cluster representatives are indexed,
+so an insert costs one signature and a few bucket lookups however many texts
+came before.
+
+    index = NearDuplicateIndex(threshold=0.8)
+    index.add(key, text, scope=trend)  # None: new representative, else the representative's key
+
+With 128 permutations in 32 bands of 4 rows, pairs at Jaccard 0.6 become
+candidates ~99% of the time and pairs at 0.3 ~23%; candidates are then checked
+against `threshold` on the full signature.
+"""
+
+from pathlib import Path
+from typing import AsyncIterator, Dict, Hashable, List, Optional, Sequence, Set, Tuple, Union
+
+from src.utils.record_io import in_progress_marker, iter_records
+from src.utils.text_normalizer import clean_text
+
+SHINGLE_SIZE = 5  # characters; tweets are too short for word shingles
+NUM_PERM = 128
+BANDS = 32
+DEFAULT_THRESHOLD = 0.8  # estimated Jaccard similarity of the shingle sets
+
+
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        shingle_size: int = SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        import numpy as np  # imported lazily: only needed when near-duplicate filtering is on
+
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        if not 1 <= shingle_size <= 8:
+            raise ValueError(f"shingle_size must be 1..8 characters to pack into 64 bits, got {shingle_size}")
+        self._np = np
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Multiply-shift hashing, h(x) = (a * x + b) >> 32 with odd a, in wrapping 64-bit arithmetic
+        rng = np.random.default_rng(seed)
+        self._a = (rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1))[:, None]
+        self._b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)[:, None]
+        self._high_bits = np.uint64(32)
+        self._shifts = [np.uint64(8 * i) for i in range(shingle_size)]
+
+        self.keys: List[Hashable] = []  # representative id -> caller's key
+        self.signatures: List = []  # representative id -> signature
+        self.buckets: Dict[Tuple[str, int, bytes], List[int]] = {}
+        self.duplicates = 0
+
+    def signature(self, text: str):
+        np = self._np
+        data = clean_text(text).encode("ascii").ljust(self.shingle_size)
+        values = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+        n_shingles = len(values) - self.shingle_size + 1
+        shingles = values[:n_shingles].copy()  # each window's bytes packed into one integer
+        for i in range(1, self.shingle_size):
+            shingles |= values[i:i + n_shingles] << self._shifts[i]
+        # Repeated shingles do not change the minimum, so no set is needed
+        return ((self._a * shingles + self._b) >> self._high_bits).min(axis=1)
+
+    def similarity(self, a, b) -> float:
+        return float(self._np.count_nonzero(a == b)) / len(a)
+
+    def add(self, key: Hashable, text: str, scope: str = "") -> Optional[Hashable]:
+        """
+        Index `text` under `key` unless it is a near duplicate of an indexed
+        text in the same scope; returns that representative's key, else None.
+        """
+        signature = self.signature(text)
+        bands = [
+            (scope, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+        best, best_similarity = None, self.threshold
+        checked = set()
+        for bucket in bands:
+            for rep in self.buckets.get(bucket, ()):
+                if rep in checked:
+                    continue
+                checked.add(rep)
+                similarity = self.similarity(self.signatures[rep], signature)
+                if similarity >= best_similarity:
+                    best, best_similarity = rep, similarity
+        if best is not None:
+            self.duplicates += 1
+            return self.keys[best]
+
+        rep = len(self.keys)
+        self.keys.append(key)
+        self.signatures.append(signature)
+        for bucket in bands:
+            self.buckets.setdefault(bucket, []).append(rep)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+def _post_key(record: dict) -> Tuple[str, str]:
+    return record["trend"].strip().lower(), record["text"]
+
+
+async def propagate_labels(
+    records: AsyncIterator[dict],
+    duplicates_path: Union[str, Path],
+    fields: Sequence[str] = ("sdg", "emotion"),
+) -> AsyncIterator[dict]:
+    """
+    Pass labelled `records` through, then yield every near duplicate logged in
+    `duplicates_path` (by the cleaner) with its representative's `fields`
+    copied over, instead of sending it to the LLM. Duplicates whose
+    representative was not labelled (a field is None) are left out.
+
+    When the log is already complete (the cleaner ran as its own step), it is
+    read first and only the labels of its representatives are kept. While the
+    cleaner is still writing it (the streamed run_pipeline), any post may yet
+    become a representative, so the labels of all posts are kept until the end.
+    """
+    duplicates_path = Path(duplicates_path)
+    wanted: Optional[Set[Tuple[str, str]]] = None
+    if duplicates_path.exists() and not in_progress_marker(duplicates_path).exists():
+        wanted = {_post_key(duplicate["duplicate_of"]) for duplicate in iter_records(duplicates_path)}
+
+    labels: Dict[Tuple[str, str], dict] = {}
+    async for record in records:
+        key = _post_key(record)
+        if wanted is None or key in wanted:
+            label = {field: record.get(field) for field in fields}
+            if all(value is not None for value in label.values()):
+                labels[key] = label
+        yield record
+
+    if not labels or not duplicates_path.exists():
+        return
+    for duplicate in iter_records(duplicates_path):  # complete now: the cleaner finished before `records` did
+        label = labels.get(_post_key(duplicate["duplicate_of"]))
+        if label is not None:
+            yield {"trend": duplicate["trend"], "text": duplicate["text"], **label}
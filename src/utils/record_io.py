@@ -0,0 +1,256 @@
+"""
+record_io.py
+Shared record read/write layer for every pipeline stage.
+
+The format is picked from the file suffix:
+- `.jsonl`: one JSON object per line, appended and flushed as each record
+  completes, read back lazily with a generator. While a writer is open a
+  `<file>.inprogress` marker sits next to the file, so a downstream stage can
+  follow the file and start before the upstream stage finishes. The marker
+  is created before the file, and a follower waits until the file is being
+  (or has been) written after the follower started, so it never takes the
+  previous run's file, or a just-created empty one, for the finished output.
+  A marker whose file has not changed for FOLLOW_STALE_SECONDS is taken to
+  be left over from a writer that crashed, and the follower raises.
+- `.json`: the classic indent=2 array, also written incrementally (but only
+  readable once the writer has closed).
+- `.parquet`: columnar, dictionary-encoded label columns, written in row
+  groups and only readable once the writer has closed; needs the optional
+  pyarrow (see columnar.py).
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator, List, Union
+
+from src.utils import columnar
+
+PathLike = Union[str, Path]
+
+FOLLOW_POLL_SECONDS = 0.5
+# A followed file whose marker is still there but that has not changed for this long has lost its writer
+FOLLOW_STALE_SECONDS = 600.0
+
+
+class StaleWriterError(Exception):
+    """A followed file's `.inprogress` marker outlived its writer (e.g. the upstream stage crashed)."""
+
+
+def is_jsonl(path: PathLike) -> bool:
+    return Path(path).suffix.lower() == ".jsonl"
+
+
+def in_progress_marker(path: PathLike) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + ".inprogress")
+
+
+class RecordWriter:
+    """
+    Append records to a `.json` or `.jsonl` file as they are produced.
+
+    Usage:
+        with RecordWriter("out.jsonl") as writer:
+            writer.write({"trend": ..., "text": ...})
+    """
+
+    def __init__(self, path: PathLike, append: bool = False):
+        self.path = Path(path)
+        self.jsonl = is_jsonl(self.path)
+        self.append = append and self.jsonl  # a JSON array or Parquet file cannot be appended to
+        self.count = 0
+        self._file = None
+        self._parquet = columnar.ParquetRecordWriter(self.path) if columnar.is_parquet(self.path) else None
+
+    def __enter__(self) -> "RecordWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def open(self) -> None:
+        if self._parquet is not None:
+            self._parquet.open()
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.jsonl:
+            if not self.append:
+                self.path.unlink(missing_ok=True)  # no follower may read the previous run's records
+            in_progress_marker(self.path).touch()  # before the file exists, so EOF is never mistaken for the end
+        self._file = open(self.path, "a" if self.append else "w", encoding="utf-8")
+        if not self.jsonl:
+            self._file.write("[")
+
+    def write(self, record: dict) -> None:
+        if self._parquet is not None:
+            self._parquet.write(record)
+        elif self.jsonl:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+        else:
+            # Same layout as json.dump(..., indent=2) without holding the records in memory
+            item = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            self._file.write(("\n  " if self.count == 0 else ",\n  ") + item)
+        self.count += 1
+
+    def write_all(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+            return
+        if self._file is None:
+            return
+        if not self.jsonl:
+            self._file.write("\n]" if self.count else "]")
+        self._file.close()
+        self._file = None
+        if self.jsonl:
+            in_progress_marker(self.path).unlink(missing_ok=True)
+
+
+def write_records(path: PathLike, records: Iterable[dict]) -> int:
+    """Write all records to `path` and return how many were written."""
+    with RecordWriter(path) as writer:
+        writer.write_all(records)
+    return writer.count
+
+
+def _parse_line(line: str, path: Path, line_no: int):
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON on line {line_no} of '{path}': {e}") from e
+
+
+def _written_since(path: Path, since: float) -> bool:
+    """Whether a writer has `path` open, or finished writing it at or after `since`."""
+    try:
+        modified = path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return in_progress_marker(path).exists() or modified >= since
+
+
+def _writer_active(path: Path) -> bool:
+    """
+    Whether a writer still has `path` open (its marker exists); raises
+    StaleWriterError when neither the file nor the marker changed within
+    FOLLOW_STALE_SECONDS, so a follower does not poll a dead writer forever.
+    """
+    marker = in_progress_marker(path)
+    try:
+        last_change = marker.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    try:
+        last_change = max(last_change, path.stat().st_mtime)
+    except FileNotFoundError:
+        pass
+    idle = time.time() - last_change
+    if idle > FOLLOW_STALE_SECONDS:
+        raise StaleWriterError(
+            f"{path} has not changed for {idle:.0f}s although {marker.name} is still there; its writer "
+            f"probably crashed (remove the marker, or raise FOLLOW_STALE_SECONDS for a slower writer)"
+        )
+    return True
+
+
+def _waiting_message(path: Path) -> str:
+    return f"⏳ Waiting for a writer of {path} (follow=True reads only output written after it started)"
+
+
+def iter_records(path: PathLike, follow: bool = False) -> Iterator:
+    """
+    Lazily yield records from a `.jsonl` file (or all items of a `.json` array).
+
+    With follow=True a `.jsonl` file is tailed until its writer has closed,
+    which lets a stage consume the output of one that is still running. The
+    follower first waits for a writer that opened the file after the follower
+    started (or is still open), so start it before or alongside the upstream
+    stage; read a finished file with follow=False. Raises StaleWriterError if
+    the writer stops writing without closing (see FOLLOW_STALE_SECONDS).
+    """
+    started = time.time()
+    path = Path(path)
+    if columnar.is_parquet(path):
+        yield from columnar.iter_records(path)
+        return
+    if not is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError("JSON content must be a list.")
+        yield from data
+        return
+
+    if follow and not _written_since(path, started):
+        print(_waiting_message(path))
+        while not _written_since(path, started):
+            time.sleep(FOLLOW_POLL_SECONDS)
+
+    with open(path, "r", encoding="utf-8") as f:
+        line_no = 0
+        buffer = ""
+        while True:
+            line = f.readline()
+            if line:
+                buffer += line
+                if not buffer.endswith("\n"):
+                    continue  # partially flushed line, wait for the rest
+                line_no += 1
+                if buffer.strip():
+                    yield _parse_line(buffer, path, line_no)
+                buffer = ""
+            elif follow and _writer_active(path):
+                time.sleep(FOLLOW_POLL_SECONDS)
+            else:
+                if buffer.strip():
+                    yield _parse_line(buffer, path, line_no + 1)
+                return
+
+
+async def aiter_records(path: PathLike, follow: bool = False) -> AsyncIterator:
+    """Async counterpart of `iter_records` that polls without blocking the event loop."""
+    import asyncio  # only needed by async callers, which have it loaded already
+
+    started = time.time()
+    path = Path(path)
+    if not is_jsonl(path):
+        for record in iter_records(path):
+            yield record
+        return
+
+    if follow and not _written_since(path, started):
+        print(_waiting_message(path))
+        while not _written_since(path, started):
+            await asyncio.sleep(FOLLOW_POLL_SECONDS)
+
+    with open(path, "r", encoding="utf-8") as f:
+        line_no = 0
+        buffer = ""
+        while True:
+            line = f.readline()
+            if line:
+                buffer += line
+                if not buffer.endswith("\n"):
+                    continue
+                line_no += 1
+                if buffer.strip():
+                    yield _parse_line(buffer, path, line_no)
+                buffer = ""
+            elif follow and _writer_active(path):
+                await asyncio.sleep(FOLLOW_POLL_SECONDS)
+            else:
+                if buffer.strip():
+                    yield _parse_line(buffer, path, line_no + 1)
+                return
+
+
+def load_records(path: PathLike) -> List:
+    """Eagerly load every record (for stages that need the full dataset)."""
+    return list(iter_records(path))
@@ -0,0 +1,247 @@
+"""
+request_scheduler.py
+Rate-limit-aware scheduling for LLM requests.
+
+One `RequestScheduler` is shared per model. It
+- admits requests through an AIMD concurrency window: +1 slot per window of
+  successes, halved on every 429,
+- honours `Retry-After` by pausing all requests for that model,
+- retries 429 / 5xx / transport errors with jittered exponential backoff,
+- enforces requests-per-minute and tokens-per-minute budgets taken from the
+  `rate_limits` block of model_configs.json.
+"""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from src.utils.metrics import metrics
+from src.utils.model_loader import get_model_config
+
+T = TypeVar("T")
+
+DEFAULT_RATE_LIMITS = {
+    "initial_concurrency": 4,
+    "max_concurrency": 32,
+    "requests_per_minute": None,
+    "tokens_per_minute": None,
+}
+
+
+class RetryableError(Exception):
+    """Transient failure (5xx, timeout, connection reset) worth retrying."""
+
+
+class RateLimitError(RetryableError):
+    """HTTP 429 from the provider; `retry_after` is in seconds when the server sent one."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Continuous-refill bucket holding at most `per_minute` units."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount  # may go negative when actual usage exceeds the estimate
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        decrease_factor: float = 0.5,
+        name: str = "",
+    ):
+        self.name = name  # metrics label, the model id for per-model schedulers
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.window = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.decrease_factor = decrease_factor
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+        self.retries = 0
+        self.rate_limited = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_model_config(cls, model: str) -> "RequestScheduler":
+        limits = {**DEFAULT_RATE_LIMITS, **get_model_config(model).get("rate_limits", {})}
+        return cls(**limits, name=model)
+
+    @property
+    def concurrency(self) -> int:
+        return int(self.window)
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Bound to the running loop; call_sync() runs every request on a fresh loop
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    def _publish_gauges(self) -> None:
+        metrics.set("llm_in_flight", self.in_flight, model=self.name)
+        metrics.set("llm_waiting", self.waiting, model=self.name)
+        metrics.set("llm_concurrency_window", round(self.window, 3), model=self.name)
+
+    async def _acquire(self, estimated_tokens: int) -> None:
+        start = time.perf_counter()
+        condition = self._get_condition()
+        self.waiting += 1
+        self._publish_gauges()
+        try:
+            async with condition:
+                await condition.wait_for(lambda: self.in_flight < self.concurrency)
+                self.in_flight += 1
+        finally:
+            self.waiting -= 1
+
+        try:
+            while True:
+                delay = self.paused_until - time.monotonic()
+                if self.request_bucket:
+                    delay = max(delay, self.request_bucket.wait_time(1))
+                if self.token_bucket and estimated_tokens:
+                    delay = max(delay, self.token_bucket.wait_time(estimated_tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+        except BaseException:
+            await self._release()  # cancelled while waiting for budget
+            raise
+
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.token_bucket and estimated_tokens:
+            self.token_bucket.consume(estimated_tokens)
+        metrics.observe("llm_queue_wait_seconds", time.perf_counter() - start, model=self.name)
+        self._publish_gauges()
+
+    async def _release(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+        self._publish_gauges()
+
+    def _on_success(self) -> None:
+        # Additive increase: roughly one extra slot per full window of successes
+        self.window = min(self.max_concurrency, self.window + 1.0 / self.window)
+
+    def _on_rate_limited(self, retry_after: Optional[float]) -> None:
+        self.rate_limited += 1
+        metrics.inc("llm_rate_limited_total", model=self.name)
+        self.window = max(self.min_concurrency, self.window * self.decrease_factor)
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retrying clients from synchronising
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Reconcile the token budget once the real usage of a request is known."""
+        if self.token_bucket and actual_tokens is not None:
+            self.token_bucket.consume(actual_tokens - estimated_tokens)
+
+    async def run(self, request: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        """Run `request` within the window and budgets, retrying transient failures."""
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens)
+            try:
+                result = await request()
+            except RateLimitError as e:
+                self._on_rate_limited(e.retry_after)
+                error, wait = e, e.retry_after
+            except RetryableError as e:
+                error, wait = e, None
+            else:
+                self._on_success()
+                return result
+            finally:
+                await self._release()
+
+            if attempt >= self.max_retries:
+                raise error
+            self.retries += 1
+            metrics.inc("llm_retries_total", model=self.name)
+            await asyncio.sleep(wait if wait is not None else self._backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+
+
+_schedulers: Dict[str, RequestScheduler] = {}
+
+
+def get_scheduler(model: str) -> RequestScheduler:
+    """Process-wide scheduler per model, so every client of a model shares its budget."""
+    if model not in _schedulers:
+        _schedulers[model] = RequestScheduler.from_model_config(model)
+    return _schedulers[model]
+
+
+def set_scheduler(model: str, scheduler: RequestScheduler) -> None:
+    """Replace a model's shared scheduler, e.g. with looser limits for load tests against a mock server."""
+    _schedulers[model] = scheduler
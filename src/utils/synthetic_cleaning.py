@@ -1,19 +1,16 @@
 import json
+from src.configs.paths import INPUT_DIR
+from src.utils.record_io import load_records
+from src.utils.text_normalizer import filter_complete_posts
 
-with open("src/data/generated_posts.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
+INPUT_PATH = INPUT_DIR / "generated_posts.json"
+OUTPUT_PATH = INPUT_DIR / "generated_posts_cleaned.json"
 
-def is_valid(post):
-    text = post["text"].strip()
-    return (
-        len(text) > 20
-        and text[-1] in ".!?\""
-        and not text.endswith(("Just", "only", "but", "so", "and", "that", "with"))
-    )
 
-cleaned = [p for p in data if is_valid(p)]
+if __name__ == "__main__":
+    cleaned = filter_complete_posts(load_records(INPUT_PATH))
 
-with open("src/data/generated_posts_cleaned.json", "w", encoding="utf-8") as f:
-    json.dump(cleaned, f, indent=2, ensure_ascii=False)
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(cleaned, f, indent=2, ensure_ascii=False)
 
-print(f"✅ Cleaned: {len(cleaned)} posts saved.")
+    print(f"✅ Cleaned: {len(cleaned)} posts saved.")
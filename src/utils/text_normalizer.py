@@ -0,0 +1,73 @@
+"""
+text_normalizer.py
+The one text-normalization implementation shared by every cleaner.
+
+`clean_text` lowercases, drops URLs and @mentions, keeps hashtag words without
+the '#', removes every character outside a-z, 0-9 and whitespace (emojis,
+punctuation, accented letters) and collapses whitespace, exactly like the
+original five sequential `re.sub` passes. Instead of those passes it runs:
+- one precompiled pattern for URLs and mentions, skipped when the text holds
+  no "http", "www" or "@",
+- one `bytes.translate` deleting the unwanted ASCII characters, after non-ASCII
+  characters were dropped by an `encode("ascii", "ignore")` (the precompiled
+  character class is only used for text with non-ASCII whitespace),
+- one split/join for the whitespace.
+
+    from src.utils.text_normalizer import clean_text, clean_texts
+    clean_text("Loving #SDG13 🌍 https://t.co/x @un")  # -> "loving sdg13"
+"""
+
+import re
+from typing import TYPE_CHECKING, Iterable, List, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# URLs, and @mentions stopping before an embedded URL (as the sequential passes did)
+_URL_OR_MENTION = re.compile(r"http\S+|www\S+|@(?:(?!http\S|www\S)\w)+")
+_DISALLOWED = re.compile(r"[^a-z0-9\s]")
+_DISALLOWED_ASCII = bytes(i for i in range(128) if _DISALLOWED.match(chr(i)))
+_NON_ASCII_SPACE = re.compile(r"[^\S\x00-\x7f]")
+
+# Generated posts cut off mid-sentence usually end on one of these
+_DANGLING_ENDINGS = ("Just", "only", "but", "so", "and", "that", "with")
+_TERMINAL_CHARS = '.!?"'
+
+
+def clean_text(text) -> str:
+    """Normalized form of one post; non-strings (e.g. NaN cells) are converted with str()."""
+    if not isinstance(text, str):
+        text = str(text)
+    text = text.lower()
+    if "http" in text or "www" in text or "@" in text:
+        text = _URL_OR_MENTION.sub("", text)
+    if not text.isascii():
+        if _NON_ASCII_SPACE.search(text) is not None:
+            return " ".join(_DISALLOWED.sub("", text).split())  # keep e.g. NBSP as a word break
+        text = text.encode("ascii", "ignore").decode("ascii")  # every non-ASCII character goes
+    return " ".join(text.encode("ascii").translate(None, _DISALLOWED_ASCII).decode("ascii").split())
+
+
+def clean_texts(texts: Union[Iterable, "pd.Series"]) -> List[str]:
+    """`clean_text` over a list, any iterable or a pandas Series (taken as a plain list, no per-row access)."""
+    if hasattr(texts, "tolist"):
+        texts = texts.tolist()
+    return [clean_text(text) for text in texts]
+
+
+def is_complete_post(text: str) -> bool:
+    """
+    Heuristic for generated posts: long enough and ending like a finished
+    sentence rather than being cut off by the token limit.
+    """
+    text = text.strip()
+    return (
+        len(text) > 20
+        and text[-1] in _TERMINAL_CHARS
+        and not text.endswith(_DANGLING_ENDINGS)
+    )
+
+
+def filter_complete_posts(posts: Iterable[dict]) -> List[dict]:
+    """Posts whose "text" passes `is_complete_post`."""
+    return [post for post in posts if is_complete_post(post["text"])]
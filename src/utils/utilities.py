@@ -1,5 +1,4 @@
-import pandas as pd
-import re
+from src.utils.text_normalizer import clean_text, clean_texts  # re-exported for existing callers
 
 
 
@@ -22,6 +21,8 @@ def load_column_from_csv(path_map: dict, source: str, column: str, dropna: bool
 
     csv_path = path_map[source]
 
+    import pandas as pd  # imported lazily: most callers only need the text helpers
+
     try:
         df = pd.read_csv(csv_path)
         if column not in df.columns:
@@ -45,54 +46,31 @@ def load_column_from_csv(path_map: dict, source: str, column: str, dropna: bool
 
 
 
-def clean_text(text: str) -> str:
-    """
-    Clean a single text string by applying:
-    - Lowercasing
-    - URL removal
-    - Mention (@user) removal
-    - Hashtag symbol removal (but keep the word)
-    - Emoji and special character removal
-    - Extra whitespace normalization
-    """
-    text = text.lower()
-    text = re.sub(r'http\S+|www\S+', '', text)  # Remove URLs
-    text = re.sub(r'@\w+', '', text)            # Remove mentions
-    text = re.sub(r'#(\w+)', r'\1', text)       # Keep hashtag word
-    text = re.sub(r'[^a-zA-Z0-9\s]', '', text)  # Remove emojis and punctuation
-    text = re.sub(r'\s+', ' ', text).strip()    # Normalize whitespace
-    return text
-
-
-
-
-
 def preprocess_text_list(texts: list[str]) -> list[str]:
     """
     Apply `clean_text` to a list of strings.
     """
-    return [clean_text(t) for t in texts]
+    return clean_texts(texts)
 
 
 
 import json
+from src.utils.record_io import load_records
 
 def load_json_data(path: str) -> list:
     """
     Load a JSON file containing either a list of dictionaries or a list of strings.
+    `.jsonl` files (one record per line) are supported too; use
+    `record_io.iter_records` to read them lazily instead.
 
     Parameters:
-        path (str): Path to the JSON file.
+        path (str): Path to the JSON or JSON Lines file.
 
     Returns:
         List: The loaded data, either as list[dict] or list[str].
     """
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list):
-            raise ValueError("JSON content must be a list.")
-        return data
+        return load_records(path)
     except Exception as e:
         print(f"❌ Error loading JSON file '{path}': {e}")
         return []
@@ -0,0 +1,46 @@
+import json
+
+import httpx
+import pytest
+
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_client import LLMClient
+from src.utils.request_scheduler import RequestScheduler
+
+
+class FakeProvider:
+    """OpenAI-compatible endpoint behind httpx.MockTransport: answers with queued completions, records prompts."""
+
+    def __init__(self):
+        self.answers = []
+        self.prompts = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.prompts.append(payload["messages"][-1]["content"])
+        content = self.answers.pop(0)
+        if payload.get("stream"):
+            events = "".join(
+                f"data: {json.dumps({'choices': [{'delta': {'content': content[i:i + 8]}}]})}\n\n"
+                for i in range(0, len(content), 8)
+            )
+            return httpx.Response(200, text=events + "data: [DONE]\n\n", headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+    def client(self, model: str, cache=None) -> LLMClient:
+        client = LLMClient(api_key="test-key", model=model, cache=cache,
+                           scheduler=RequestScheduler.from_model_config(model))
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+        return client
+
+
+@pytest.fixture
+def provider() -> FakeProvider:
+    return FakeProvider()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(tmp_path / "llm_cache.sqlite3", enabled=True)
+    yield cache
+    cache.close()
@@ -0,0 +1,129 @@
+import json
+import random
+from collections import Counter
+
+from src.analysis.aggregate_state import AggregateState, seen_path
+from src.modules.responders.generate_response import FAILED_RESPONSE_MESSAGE, _reusable, build_trend_index
+from src.schemas.models import Post, ResponseForTrend
+from src.utils.record_io import RecordWriter, write_records
+
+SDGS = ["Climate Action", "Zero Hunger", "Quality Education", "No Poverty"]
+EMOTIONS = ["Joy", "Fear", "Anger", "Hope"]
+
+
+def make_posts(n: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "trend": rng.choice(["Floods", " floods ", "Fuel Prices", "School Fees", "Heatwave"]),
+            "text": f"post {i}",
+            "sdg": rng.sample(SDGS, rng.randint(0, 2)),
+            "emotion": rng.choice(EMOTIONS + [None]),
+        }
+        for i in range(n)
+    ]
+
+
+def assert_matches_full_rebuild(state: AggregateState, posts: list) -> None:
+    full = build_trend_index([Post(**post) for post in posts])
+    assert list(state.trends) == list(full)
+    for trend, stats in full.items():
+        # Insertion order too: it decides ties in most_common
+        assert list(state.trends[trend].sdg_counts.items()) == list(stats.sdg_counts.items())
+        assert {sdg: list(c.items()) for sdg, c in state.trends[trend].emotions_by_sdg.items()} == \
+            {sdg: list(c.items()) for sdg, c in stats.emotions_by_sdg.items()}
+    assert state.sdg_counts == Counter(sdg for post in posts for sdg in post["sdg"])
+    assert state.posts == len(posts)
+
+
+def test_split_batches_match_a_full_rebuild(tmp_path):
+    posts = make_posts(400)
+    state_path = tmp_path / "state.json"
+    for i, start in enumerate(range(0, len(posts), 100)):
+        batch = tmp_path / f"batch_{i}.jsonl"
+        write_records(batch, posts[start:start + 100])
+        state = AggregateState.load(state_path)
+        assert state.merge_file(batch)
+        state.save(state_path)
+        state.close()
+        reloaded = AggregateState.load(state_path)
+        assert_matches_full_rebuild(reloaded, posts[:start + 100])
+        reloaded.close()
+    assert "seen" not in json.loads(state_path.read_text())  # the post keys live in SQLite
+
+
+def test_same_file_is_merged_once(tmp_path):
+    posts = make_posts(50)
+    batch = tmp_path / "batch.json"
+    write_records(batch, posts)
+    state = AggregateState()
+    assert state.merge_file(batch)
+    assert state.merge_file(batch) is None
+    assert_matches_full_rebuild(state, posts)
+
+
+def test_rewritten_cumulative_file_only_adds_new_posts(tmp_path):
+    posts = make_posts(300)
+    output = tmp_path / "emotion_output.json"
+    state = AggregateState()
+    write_records(output, posts[:200])
+    state.merge_file(output)
+    write_records(output, posts)  # the next pipeline run rewrites the whole file
+    touched = state.merge_file(output)
+    assert set(touched) == {post["trend"].strip().lower() for post in posts[200:]}
+    assert_matches_full_rebuild(state, posts)
+
+
+def test_appended_jsonl_is_read_from_the_last_offset(tmp_path):
+    posts = make_posts(300)
+    output = tmp_path / "emotion_output.jsonl"
+    state = AggregateState()
+    write_records(output, posts[:200])
+    state.merge_file(output)
+    offset = state.inputs[str(output.resolve())]["offset"]
+    assert offset == output.stat().st_size
+
+    with RecordWriter(output, append=True) as writer:
+        writer.write_all(posts[200:])
+    with open(output, "r+b") as f:  # breaks the first record: the merged part must not be read again
+        f.write(b" ")
+    touched = state.merge_file(output)
+    assert set(touched) == {post["trend"].strip().lower() for post in posts[200:]}
+    assert_matches_full_rebuild(state, posts)
+    assert state.merge_file(output) is None
+
+
+def test_keys_of_a_save_that_did_not_finish_are_dropped(tmp_path):
+    posts = make_posts(100)
+    state_path = tmp_path / "state.json"
+    write_records(tmp_path / "a.json", posts[:50])
+    write_records(tmp_path / "b.json", posts[50:])
+
+    state = AggregateState.load(state_path)
+    state.merge_file(tmp_path / "a.json")
+    state.save(state_path)
+    state.merge_file(tmp_path / "b.json")
+    state.seen.commit()  # the keys were committed, then the process died before the state file was replaced
+    state.close()
+
+    state = AggregateState.load(state_path)
+    assert len(state.seen) == 50
+    state.merge_file(tmp_path / "b.json")
+    assert_matches_full_rebuild(state, posts)
+    state.close()
+    assert seen_path(state_path).exists()
+
+
+def test_failed_responses_are_not_reused():
+    def response(trend: str, message: str) -> ResponseForTrend:
+        return ResponseForTrend(
+            trend=trend, sdg="Climate Action", emotion="Fear",
+            response={"message": message, "type": "emotional_support", "sdg_link": None},
+        )
+
+    ok, failed = response("Floods", "Stay safe."), response("Heatwave", FAILED_RESPONSE_MESSAGE)
+    assert list(_reusable([ok, failed])) == [("floods", "Climate Action", "Fear")]
+
+    state = AggregateState()
+    state.set_responses(["floods", "heatwave"], [ok, failed])
+    assert state.failed_trends() == ["heatwave"]
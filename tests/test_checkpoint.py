@@ -0,0 +1,44 @@
+from src.utils.checkpoint import Checkpoint, fingerprint
+
+POSTS = [{"trend": "Floods", "text": f"post {i}"} for i in range(5)]
+
+
+def record(post: dict, sdg: str = "Climate Action") -> dict:
+    return {**post, "sdg": [sdg]}
+
+
+def test_resume_reads_finished_records_back_from_disk(tmp_path):
+    path = tmp_path / "progress.jsonl"
+    settings = fingerprint(model="m", params={"temperature": 0.1}, prompt="p")
+    with Checkpoint(path, fingerprint=settings) as checkpoint:
+        for post in POSTS[:3]:
+            checkpoint.add(post, record(post))
+        assert checkpoint.get(POSTS[1]) == record(POSTS[1])
+    with open(path, "ab") as f:
+        f.write(b'{"id": "torn')  # crash mid-write
+
+    with Checkpoint(path, fingerprint=settings) as checkpoint:
+        assert len(checkpoint.done) == 3
+        assert all(isinstance(offset, int) for offset in checkpoint.done.values())  # no records in memory
+        assert [checkpoint.get(post) for post in POSTS[:4]] == [record(post) for post in POSTS[:3]] + [None]
+        checkpoint.add(POSTS[3], record(POSTS[3]))
+        assert checkpoint.get(POSTS[3]) == record(POSTS[3])
+
+    with Checkpoint(path, fingerprint=settings) as checkpoint:
+        assert len(checkpoint.done) == 4
+
+
+def test_other_settings_start_from_scratch(tmp_path):
+    path = tmp_path / "progress.jsonl"
+    with Checkpoint(path, fingerprint=fingerprint(model="old-model")) as checkpoint:
+        checkpoint.add(POSTS[0], record(POSTS[0]))
+
+    with Checkpoint(path, fingerprint=fingerprint(model="new-model")) as checkpoint:
+        assert checkpoint.get(POSTS[0]) is None
+        checkpoint.add(POSTS[0], record(POSTS[0], "No Poverty"))
+    with Checkpoint(path, fingerprint=fingerprint(model="new-model")) as checkpoint:
+        assert checkpoint.get(POSTS[0]) == record(POSTS[0], "No Poverty")
+
+    with Checkpoint(path, resume=False, fingerprint=fingerprint(model="new-model")) as checkpoint:
+        assert not checkpoint.done
+    assert len(path.read_text().splitlines()) == 1  # only the header is left
@@ -0,0 +1,41 @@
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.analysis.analyze_sdg_distribution import count_sdgs_in_file
+from src.utils.columnar import ParquetRecordWriter
+from src.utils.record_io import iter_records, write_records
+
+RECORDS = [
+    {"trend": "Floods", "text": "first post"},
+    {"trend": "Floods", "text": "second post", "sdg": ["Climate Action"], "emotion": "Fear"},
+    {"trend": "Fuel", "text": "third post", "sdg": ["No Poverty", "Climate Action"], "emotion": "Anger",
+     "error": "timeout"},
+]
+
+
+def test_columns_are_the_union_of_the_first_row_group(tmp_path):
+    path = tmp_path / "posts.parquet"
+    write_records(path, RECORDS)
+    records = list(iter_records(path))
+    assert records[0] == {"trend": "Floods", "text": "first post", "sdg": None, "emotion": None, "error": None}
+    assert records[2] == RECORDS[2]
+    assert count_sdgs_in_file(path) == Counter({"Climate Action": 2, "No Poverty": 1})
+
+
+def test_key_first_seen_in_a_later_row_group_raises(tmp_path):
+    writer = ParquetRecordWriter(tmp_path / "posts.parquet", row_group_size=1)
+    writer.open()
+    writer.write(RECORDS[0])
+    with pytest.raises(ValueError, match="not columns"):
+        writer.write(RECORDS[1])
+
+
+def test_empty_file_counts_nothing(tmp_path):
+    for name in ("empty.parquet", "empty.json"):
+        path = tmp_path / name
+        write_records(path, [])
+        assert list(iter_records(path)) == []
+        assert count_sdgs_in_file(path) == Counter()
@@ -0,0 +1,41 @@
+import asyncio
+import json
+
+from src.modules.classifiers import combined_classifier
+from src.modules.classifiers.combined_classifier import CombinedClassifier
+
+POSTS = [{"trend": "Floods", "text": "the river took our house"}, {"trend": "Fuel", "text": "petrol doubled again"}]
+
+
+def make_classifier(monkeypatch, provider, cache) -> CombinedClassifier:
+    monkeypatch.setattr(combined_classifier, "get_api_key", lambda: "test-key")
+    monkeypatch.setattr(combined_classifier, "get_default_cache", lambda: cache)
+    classifier = CombinedClassifier()
+    classifier.client = provider.client(classifier.model_name, cache)
+    return classifier
+
+
+def test_an_item_without_sdg_is_retried_and_the_batch_is_not_cached(monkeypatch, provider, cache):
+    classifier = make_classifier(monkeypatch, provider, cache)
+    provider.answers = [
+        json.dumps([{"id": 1, "sdg": ["Climate Action"], "emotion": "Fear"}, {"id": 2, "emotion": "Anger"}]),
+        json.dumps({"sdg": ["No Poverty"], "emotion": "Anger"}),
+    ]
+    results = asyncio.run(classifier.classify_batch(POSTS))
+    assert [(post.sdg, post.emotion) for post in results] == [(["Climate Action"], "Fear"), (["No Poverty"], "Anger")]
+    assert len(provider.prompts) == 2
+    assert cache.stats()["entries"] == 1  # only the per-post answer
+
+    # a rerun asks for the batch again instead of replaying the incomplete answer
+    provider.answers = [json.dumps([{"id": 1, "sdg": [], "emotion": "Joy"}, {"id": 2, "sdg": [], "emotion": "Joy"}])]
+    results = asyncio.run(classifier.classify_batch(POSTS))
+    assert [post.emotion for post in results] == ["Joy", "Joy"]
+    assert len(provider.prompts) == 3
+
+
+def test_a_malformed_single_answer_is_not_cached(monkeypatch, provider, cache):
+    classifier = make_classifier(monkeypatch, provider, cache)
+    provider.answers = ['{"emotion": "Fear"', json.dumps({"sdg": ["Climate Action"], "emotion": "Fear"})]
+    assert asyncio.run(classifier.classify(POSTS[0])) is None
+    assert asyncio.run(classifier.classify(POSTS[0])).sdg == ["Climate Action"]
+    assert len(provider.prompts) == 2
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import llm_cache
+from src.utils.llm_cache import LLMCache
+
+MODEL = "openai/gpt-4.1-mini"  # supports_streaming
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3", ttl_seconds=60, enabled=True)
+    cache.set("k", "v")
+    clock.now += 59
+    assert cache.get("k") == "v"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats() == {"enabled": True, "entries": 0, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    cache.set("old", "v")
+    clock.now += 61
+    cache.set("new", "v")
+    assert cache.purge_expired() == 1
+    assert cache.stats()["entries"] == 1
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMCache(tmp_path / "cache.sqlite3", max_entries=2, enabled=True)
+    for key in ("a", "b"):
+        cache.set(key, key)
+        clock.now += 1
+    assert cache.get("a") == "a"  # "b" is now the least recently used
+    clock.now += 1
+    cache.set("c", "c")
+    assert [cache.get(key) for key in ("a", "b", "c")] == ["a", None, "c"]
+    assert cache.stats()["entries"] == 2
+    cache.close()
+
+    reopened = LLMCache(tmp_path / "cache.sqlite3", max_entries=2, enabled=True)
+    assert reopened.get("c") == "c"
+    assert reopened.stats()["entries"] == 2
+    reopened.close()
+
+
+def test_the_environment_disables_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_DISABLED", "1")
+    cache = LLMCache(tmp_path / "cache.sqlite3")
+    cache.set("k", "v")
+    assert cache.get("k") is None
+    assert not (tmp_path / "cache.sqlite3").exists()
+
+
+def test_use_cache_false_bypasses_the_cache(provider, cache):
+    client = provider.client(MODEL, cache)
+    provider.answers = ['{"emotion": "Fear"}', '{"emotion": "Joy"}']
+    assert asyncio.run(client.call("post", use_cache=False)) == {"emotion": "Fear"}
+    assert asyncio.run(client.call("post", use_cache=False)) == {"emotion": "Joy"}
+    assert cache.stats()["entries"] == 0
+    assert cache.hits + cache.misses == 0
+
+
+def test_call_caches_only_valid_completions(provider, cache):
+    client = provider.client(MODEL, cache)
+
+    def validate(response):
+        if "emotion" not in response:
+            raise ValueError("no emotion")
+
+    provider.answers = ['{"sdg": []}', '{"emotion": "Fear"}']
+    assert asyncio.run(client.call("post", validate=validate)) == {"sdg": []}
+    assert cache.stats()["entries"] == 0
+    assert asyncio.run(client.call("post", validate=validate)) == {"emotion": "Fear"}
+    assert asyncio.run(client.call("post", validate=validate)) == {"emotion": "Fear"}  # from the cache
+    assert len(provider.prompts) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # an entry stored before it was validated is a miss, not a replay
+    provider.answers = ['{"emotion": "Joy"}']
+    key = cache.make_key(client._build_payload("other post", {}))
+    cache.set(key, "not json")
+    assert asyncio.run(client.call("other post", validate=validate)) == {"emotion": "Joy"}
+    assert cache.get(key) == '{"emotion": "Joy"}'
+
+
+def test_stream_caches_only_valid_completions(provider, cache):
+    client = provider.client(MODEL, cache)
+
+    def validate(response):
+        if not isinstance(response, list):
+            raise ValueError("not a list")
+
+    async def collect():
+        return "".join([delta async for delta in client.stream("post", validate=validate)])
+
+    truncated = '["first post", "second'
+    complete = json.dumps(["first post", "second post"])
+    provider.answers = [truncated, complete]
+    assert asyncio.run(collect()) == truncated
+    assert cache.stats()["entries"] == 0
+    assert asyncio.run(collect()) == complete
+    assert asyncio.run(collect()) == complete  # a single delta from the cache
+    assert len(provider.prompts) == 2
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from src.utils.llm_parser import JSONStringArrayStream, align_batch_items, check_complete
+
+POSTS = ["Floods again, \"stay safe\" they say", "Prices up 30%\\n unreal", "ça coûte cher 😤", "[not, a] {list}"]
+
+
+def feed_in_chunks(text: str, size: int) -> list:
+    parser = JSONStringArrayStream()
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return elements
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_stream_yields_each_string_whatever_the_chunking(size):
+    text = "```json\n" + json.dumps(POSTS, ensure_ascii=False, indent=2) + "\n```"
+    assert feed_in_chunks(text, size) == POSTS
+
+
+def test_stream_yields_an_element_as_soon_as_it_closes():
+    parser = JSONStringArrayStream()
+    assert parser.feed('Sure! ["first", "sec') == ["first"]
+    assert parser.feed('ond"') == ["second"]
+    assert parser.feed('] trailing ["ignored"]') == []
+
+
+def test_stream_ignores_nested_values():
+    text = '["kept", ["nested"], {"key": "value"}, "also kept"]'
+    assert feed_in_chunks(text, 4) == ["kept", "also kept"]
+
+
+def test_batch_items_are_aligned_by_id_and_checked():
+    items = [{"id": 2, "sdg": ["No Poverty"]}, {"id": 1, "sdg": []}, {"id": 9, "sdg": []}]
+    aligned = align_batch_items(items, 3)
+    assert aligned == [{"id": 1, "sdg": []}, {"id": 2, "sdg": ["No Poverty"]}, None]
+    with pytest.raises(ValueError, match="1 of 3"):
+        check_complete(aligned)
+    check_complete(aligned[:2])
@@ -0,0 +1,46 @@
+import asyncio
+
+from src.modules.classifiers.local_classifier import HashedLogisticRegression, TieredSDGClassifier, predict_sdgs
+
+TRAIN = [
+    ("the river flooded our street after the rain", ["Climate Action"]),
+    ("heavy rain and floods again", ["Climate Action"]),
+    ("no food and no money for the family", ["No Poverty", "Zero Hunger"]),
+    ("poor families are going hungry this winter", ["No Poverty", "Zero Hunger"]),
+    ("the school has no teachers for the exam", ["Quality Education"]),
+    ("students cannot afford school books", ["Quality Education"]),
+]
+
+
+class NoLLM:
+    client = None
+
+    async def classify_batch(self, texts):
+        return [None for _ in texts]
+
+
+def trained_model() -> HashedLogisticRegression:
+    texts, labels = zip(*TRAIN * 5)
+    return HashedLogisticRegression(epochs=60).fit(texts, labels)
+
+
+def test_a_two_sdg_post_is_answered_locally_with_both_labels():
+    model = trained_model()
+    labels, confidence = predict_sdgs(model, "poor families have no food")
+    assert sorted(labels) == ["No Poverty", "Zero Hunger"]
+    assert confidence >= 0.9
+
+    labels, confidence = predict_sdgs(model, "floods after heavy rain")
+    assert labels == ["Climate Action"]
+    assert confidence >= 0.9
+
+    tiered = TieredSDGClassifier(NoLLM(), model)
+    results = asyncio.run(tiered.classify_batch(["poor families have no food", "floods after heavy rain"]))
+    assert [sorted(result.sdg) for result in results] == [["No Poverty", "Zero Hunger"], ["Climate Action"]]
+    assert tiered.stats.report()["answered_locally"] == 2
+
+
+def test_an_unsure_post_is_escalated():
+    tiered = TieredSDGClassifier(NoLLM(), trained_model())
+    assert asyncio.run(tiered.classify_batch(["completely unrelated words here"])) == [None]
+    assert tiered.stats.escalated == 1
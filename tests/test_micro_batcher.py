@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.utils.concurrency import MicroBatcher
+
+
+class Recorder:
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.batches = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [item.upper() for item in items]
+
+
+def test_concurrent_items_share_batches_and_duplicates_are_coalesced():
+    process = Recorder()
+
+    async def run():
+        batcher = MicroBatcher(process, max_size=4, max_wait=0.05)
+        results = await asyncio.gather(*(batcher.submit(text) for text in ["a", "b", "a", "c", "d", "e", "b"]))
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == ["A", "B", "A", "C", "D", "E", "B"]
+    assert process.batches == [["a", "b", "c", "d"], ["e"]]
+    assert stats == {"batches": 2, "items": 5, "coalesced": 2, "mean_batch_size": 2.5}
+
+
+def test_a_failing_batch_fails_every_submitter():
+    async def run():
+        batcher = MicroBatcher(Recorder(fail=True), max_size=10, max_wait=0.01)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert [str(result) for result in asyncio.run(run())] == ["upstream down", "upstream down"]
+
+
+def test_result_count_must_match_the_batch():
+    async def short(items):
+        return items[:-1]
+
+    async def run():
+        batcher = MicroBatcher(short, max_size=2, max_wait=0.01)
+        await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+
+    with pytest.raises(ValueError, match="returned 1 results"):
+        asyncio.run(run())
+
+
+def test_cancelling_one_submitter_keeps_the_batch_for_the_others():
+    process = Recorder(delay=0.05)
+
+    async def run():
+        batcher = MicroBatcher(process, max_size=10, max_wait=0.01)
+        first = asyncio.ensure_future(batcher.submit("a"))
+        second = asyncio.ensure_future(batcher.submit("a"))
+        await asyncio.sleep(0.02)  # the batch is in flight
+        first.cancel()
+        result = await second
+        await batcher.close()
+        return first.cancelled(), result
+
+    assert asyncio.run(run()) == (True, "A")
+    assert process.batches == [["a"]]
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.utils.near_duplicates import NearDuplicateIndex, propagate_labels
+from src.utils.record_io import in_progress_marker, write_records
+
+TEXT = "The floods in the north destroyed hundreds of homes and nobody from the government showed up"
+
+
+def test_near_duplicates_map_to_their_representative():
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add("a", TEXT, scope="floods") is None
+    assert index.add("b", TEXT + "!!", scope="floods") == "a"
+    assert index.add("c", TEXT.replace("north", "n0rth"), scope="floods") == "a"
+    assert index.add("d", "Fuel prices doubled overnight and the buses stopped running in the city", "fuel") is None
+    assert index.add("e", TEXT, scope="other trend") is None  # only compared within a scope
+    assert len(index) == 3
+    assert index.duplicates == 2
+
+
+def test_unrelated_texts_are_kept():
+    index = NearDuplicateIndex(threshold=0.8)
+    texts = [
+        "School fees went up again and my sister had to drop out this term",
+        "Power cuts every evening, the shop loses half its stock in the freezer",
+        "Finally the clinic has doctors on weekends, queues are so much shorter",
+        "Nobody talks about how expensive bread has become since the drought",
+        "The new bus lanes actually work, got to the office in twenty minutes",
+    ]
+    assert all(index.add(i, text) is None for i, text in enumerate(texts))
+    assert index.duplicates == 0
+
+
+def run_propagation(records, log_path):
+    async def source():
+        for record in records:
+            yield record
+
+    async def collect():
+        return [record async for record in propagate_labels(source(), log_path)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("log_complete", [True, False])
+def test_propagate_labels_skips_unlabelled_representatives(tmp_path, log_complete):
+    records = [
+        {"trend": "Floods", "text": "a", "sdg": ["Climate Action"], "emotion": "Fear"},
+        {"trend": "Floods", "text": "b", "sdg": ["Climate Action"], "emotion": None},
+    ]
+    log = tmp_path / "near_duplicates.jsonl"
+    write_records(log, [
+        {"trend": "Floods", "text": "a2", "duplicate_of": {"trend": "floods", "text": "a"}},
+        {"trend": "Floods", "text": "b2", "duplicate_of": {"trend": "Floods", "text": "b"}},
+    ])
+    if not log_complete:
+        in_progress_marker(log).touch()  # as while run_pipeline's cleaner is still writing it
+
+    out = run_propagation(records, log)
+    assert out[:2] == records
+    assert out[2:] == [{"trend": "Floods", "text": "a2", "sdg": ["Climate Action"], "emotion": "Fear"}]
@@ -0,0 +1,48 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.utils import record_io
+from src.utils.record_io import RecordWriter, StaleWriterError, in_progress_marker, iter_records
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(record_io, "FOLLOW_POLL_SECONDS", 0.01)
+
+
+def test_follower_reads_records_until_the_writer_closes(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    writer = RecordWriter(path)
+    writer.open()
+
+    def produce():
+        for i in range(3):
+            time.sleep(0.02)
+            writer.write({"text": f"post {i}"})
+        writer.close()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    assert [record["text"] for record in iter_records(path, follow=True)] == ["post 0", "post 1", "post 2"]
+    thread.join()
+    assert not in_progress_marker(path).exists()
+
+
+def test_follower_gives_up_on_a_crashed_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(record_io, "FOLLOW_STALE_SECONDS", 60)
+    path = tmp_path / "posts.jsonl"
+    writer = RecordWriter(path)
+    writer.open()
+    writer.write({"text": "post 0"})  # then the process dies without closing: the marker stays
+    writer._file.close()
+
+    an_hour_ago = time.time() - 3600
+    for stale in (path, in_progress_marker(path)):
+        os.utime(stale, (an_hour_ago, an_hour_ago))
+    records = iter_records(path, follow=True)
+    assert next(records) == {"text": "post 0"}
+    with pytest.raises(StaleWriterError, match="crashed"):
+        next(records)